@@ -1,23 +1,33 @@
 # suno-prompt-analyzer/analyzer.py
 
+# The analysis core is framework-independent: it never imports Streamlit, and the
+# heavy optional backends (networkx, google-genai) are imported lazily where used.
+
 import math
 import logging
-import streamlit as st
-import re
-import networkx as nx
-
 import os
-from google import genai
-from google.genai import types
-from google.genai import errors
+import pickle
+import threading
+from collections.abc import Mapping
+from functools import cached_property
+import numpy as np
 
-from itertools import combinations
-from collections import defaultdict
-from typing import List, Set, Dict, Any, Optional
+from pathlib import Path
+from typing import Callable, List, Set, Dict, Any, Optional, Tuple
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 from style_definitions import STYLE_PERSONALITY_DICT
+from keyword_matcher import KeywordMatcher, KeywordSpan, get_keyword_matcher
+from derived_cache import get_derived
+from bridges import faction_bridge_scores
+from cooccurrence import get_cooccurrence_index
+from embeddings import get_style_embeddings
+from expansion import ExpansionSettings, expand_neighbourhood
+from fusion import fuse_styles
+from pagerank import pagerank_scores
+from factions import CohesionScores, KeywordLinks, analyse_keyword_links
+from result_cache import ResultCache, cached, dataset_version
+from gemini_service import GeminiService, GenerationStream
+from gemini_cache import GeminiResponseCache
 
 # --- Constants ---
 PRIMARY_NODE_COLOR = "#FF6347"  # Tomato
@@ -27,6 +37,12 @@ NEGATIVE_NODE_COLOR = "#8B0000"  # DarkRed
 TAINTED_NODE_COLOR = "#FFA500"  # Orange
 BRIDGE_NODE_COLOR = "#32CD32"  # LimeGreen
 ACRONYMS = {"r&b", "k-pop", "j-pop", "edm"}  # Styles to be fully uppercased
+COHESION_MODES = ("binary", "weighted")  # "weighted" adds `cohesion_scores` to analysis results
+FINGERPRINT_MODES = ("influence", "pagerank")  # "pagerank" ranks the fingerprint by personalised PageRank
+MAX_FUSION_STYLES = 5  # Most styles `analyze_fusion_styles` fuses at once
+FUSION_COUNT_WORDS = {2: "two", 3: "three", 4: "four", 5: "five"}
+DEGREE_NAMES = {2: "Second", 3: "Third", 4: "Fourth"}
+SIMILAR_STYLES_SHOWN = 8  # Embedding neighbours listed in Explorer results
 
 # --- Prompt Starter Kit Constants (Optimized) ---
 MOOD_KEYWORDS = {
@@ -87,92 +103,38 @@ GEMINI_SYSTEM_INSTRUCTION = """You are an expert AI music prompt engineer specia
 7.  **Handle Creative Constraints**: When the brief provides a "Creative Goal" to steer away from certain qualities, your task is not simply to omit words. You must actively construct the narrative prompt using contrasting and opposing descriptive language. Use the "Emphasize" list to build the core of your prompt and the "Steer Away From" list as a guide for what sonic textures to describe in opposition.
 """
 
+# Identical briefs are answered from this on-disk cache instead of calling Gemini again.
+GEMINI_CACHE_PATH = Path(os.getenv("GEMINI_CACHE_PATH", Path(__file__).parent / ".cache" / "gemini_responses.sqlite3"))
+# Alternative Gemini endpoint, e.g. a local `fake_gemini_server.py` for load tests.
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL") or None
+
+_GEMINI_SERVICE: Optional[GeminiService] = None
+_GEMINI_SERVICE_LOCK = threading.Lock()
+
+def get_gemini_service() -> GeminiService:
+    """Returns the shared Gemini service (one pooled client per API key), creating it on first use."""
+    global _GEMINI_SERVICE
+    with _GEMINI_SERVICE_LOCK:
+        if _GEMINI_SERVICE is None:
+            _GEMINI_SERVICE = GeminiService(
+                system_instruction=GEMINI_SYSTEM_INSTRUCTION,
+                base_url=GEMINI_BASE_URL,
+                response_cache=GeminiResponseCache(GEMINI_CACHE_PATH),
+            )
+        return _GEMINI_SERVICE
+
 def generate_polished_prompt_with_gemini(creative_brief: str, api_key: str) -> str:
     """
     Calls the Gemini API to generate a polished Suno prompt, with robust error handling
     and all safety filters disabled as per the application's design.
-    """
-    try:
-        client = genai.Client(api_key=api_key)
-        logging.info("Attempting to generate content with Gemini 2.5 Pro.")
-        logging.warning("All Gemini API safety filters are being disabled for this call.")
-
-        # CORRECTED: Use snake_case for all parameters in GenerateContentConfig.
-        # CORRECTED: Completed the list of safety categories to include all five adjustable filters.
-        # This ensures all safety measures are explicitly set to BLOCK_NONE.
-        safety_settings = [
-            types.SafetySetting(category=types.HarmCategory.HARM_CATEGORY_HARASSMENT, threshold=types.HarmBlockThreshold.BLOCK_NONE),
-            types.SafetySetting(category=types.HarmCategory.HARM_CATEGORY_HATE_SPEECH, threshold=types.HarmBlockThreshold.BLOCK_NONE),
-            types.SafetySetting(category=types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT, threshold=types.HarmBlockThreshold.BLOCK_NONE),
-            types.SafetySetting(category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT, threshold=types.HarmBlockThreshold.BLOCK_NONE),
-            types.SafetySetting(category=types.HarmCategory.HARM_CATEGORY_CIVIC_INTEGRITY, threshold=types.HarmBlockThreshold.BLOCK_NONE),
-        ]
-
-        # CORRECTED: All parameters now use snake_case as required by the Python SDK documentation.
-        generation_config = types.GenerateContentConfig(
-            system_instruction=GEMINI_SYSTEM_INSTRUCTION,
-            temperature=0.7, # Add a little creativity
-            safety_settings=safety_settings,
-            # This is set correctly to disable tool use, as we only need text generation.
-            automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True)
-        )
 
-        # Add retry logic for 500 errors
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # The model is correctly set to 'gemini-2.5-pro' per the user's instructions.
-                response = client.models.generate_content(
-                    model="gemini-2.5-pro",
-                    contents=creative_brief,
-                    config=generation_config,
-                )
-                break  # Success, exit retry loop
-            except errors.ServerError as e:
-                if attempt < max_retries - 1:
-                    wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
-                    logging.warning(f"Gemini API 500 error (attempt {attempt + 1}/{max_retries}). Retrying in {wait_time}s...")
-                    import time
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    # Final attempt failed
-                    logging.error(f"Gemini API failed after {max_retries} attempts: {e}")
-                    return f"ERROR: Gemini API server error after {max_retries} attempts. The service may be temporarily unavailable."
-            except errors.BlockedPromptError as e:
-                # This handles cases where the response is blocked despite relaxed settings (e.g., core harms)
-                logging.error(f"Gemini API call failed: Prompt was blocked. Reason: {e}")
-                return f"ERROR: Your prompt was blocked for violating core safety policies which cannot be disabled. Reason: {e}"
-            except Exception as e:
-                # Non-retriable errors will be raised immediately
-                logging.error(f"A non-retriable Gemini API error occurred: {e}", exc_info=True)
-                return f"ERROR: A Gemini API error occurred: {str(e)}"
-
-        logging.info(f"Gemini API Response received successfully")
-
-        if not response.candidates:
-            logging.error("No candidates in response - unexpected with safety filters disabled")
-            return "ERROR: No response candidates generated. Please try modifying your creative brief."
-            
-        candidate = response.candidates[0]
-        
-        if candidate.finish_reason.name != "STOP":
-            logging.warning(f"Gemini response finished with reason: {candidate.finish_reason.name}")
-            return f"ERROR: The AI response was incomplete. Finish Reason: {candidate.finish_reason.name}. Please try again."
-
-        # SIMPLIFIED: Directly use the 'response.text' property as shown in all documentation examples.
-        # This is the idiomatic and most reliable way to get the full text output.
-        # The SDK handles aggregating the parts for you.
-        try:
-            return response.text
-        except Exception as e:
-            logging.error(f"Failed to access response.text: {e}", exc_info=True)
-            return f"ERROR: Failed to retrieve response content: {str(e)}"
-
-    except Exception as e:
-        logging.error(f"An unexpected error occurred during Gemini client setup or call: {e}", exc_info=True)
-        st.exception(e)
-        return f"ERROR: An unexpected application error occurred: {str(e)}"
+    The call runs on the shared asynchronous `GeminiService`, which reuses the client
+    for this API key and retries server errors with jittered backoff without blocking
+    other requests.
+    """
+    logging.info("Attempting to generate content with Gemini 2.5 Pro.")
+    logging.warning("All Gemini API safety filters are being disabled for this call.")
+    return get_gemini_service().generate(creative_brief, api_key)
 
 def orchestrate_gemini_prompt_generation(creative_brief: str, api_key: str) -> str:
     """
@@ -185,8 +147,70 @@ def orchestrate_gemini_prompt_generation(creative_brief: str, api_key: str) -> s
     # This function now exclusively handles the API call.
     return generate_polished_prompt_with_gemini(creative_brief, api_key)
 
+def stream_polished_prompt_with_gemini(creative_brief: str, api_key: str) -> GenerationStream:
+    """
+    Streaming counterpart of `generate_polished_prompt_with_gemini`: returns a
+    `GenerationStream` yielding text chunks as Gemini produces them. Once it is
+    exhausted, `stream.result` holds the full prompt or an "ERROR:" message.
+    """
+    logging.info("Attempting to stream content from Gemini 2.5 Pro.")
+    logging.warning("All Gemini API safety filters are being disabled for this call.")
+    return get_gemini_service().stream(creative_brief, api_key)
 
-
+def orchestrate_gemini_prompt_stream(creative_brief: str, api_key: str) -> GenerationStream:
+    """Streaming counterpart of `orchestrate_gemini_prompt_generation`."""
+    if not api_key:
+        return GenerationStream.finished("ERROR: Gemini API key not found. Please provide your API key in the app to generate a prompt.")
+    return stream_polished_prompt_with_gemini(creative_brief, api_key)
+
+
+
+
+# --- Result Cache ---
+# Analysis results are cached on normalised inputs plus the dataset's version
+# fingerprint, so lookups never hash the co-occurrence data itself.
+ANALYSIS_CACHE = ResultCache(max_entries=512, max_bytes=64 * 1024 * 1024)
+
+def _normalise_keywords(keywords: Optional[List[str]]) -> List[str]:
+    return sorted(set(keywords or []))
+
+def _normalise_direction(creative_direction: Optional[str]) -> str:
+    return (creative_direction or "").strip()
+
+# Applied before both the cache key and the computation, so one entry never
+# depends on which of several equivalent calls filled it.
+NORMALISED_INPUTS = {"negative_keywords": _normalise_keywords, "creative_direction": _normalise_direction}
+
+def _explorer_cache_key(primary_style: str, secondary_style: Optional[str], negative_keywords: Optional[List[str]], creative_direction: Optional[str], co_occurrence_data: Dict,
+                        expansion: Optional[ExpansionSettings] = None) -> tuple:
+    return (
+        primary_style,
+        secondary_style or None,
+        tuple(negative_keywords),
+        creative_direction,
+        dataset_version(co_occurrence_data),
+        None if secondary_style else (expansion or ExpansionSettings()),
+    )
+
+def _fusion_cache_key(styles: List[str], negative_keywords: Optional[List[str]], creative_direction: Optional[str], co_occurrence_data: Dict) -> tuple:
+    return (
+        "fusion",
+        tuple(dict.fromkeys(styles)),
+        tuple(negative_keywords),
+        creative_direction,
+        dataset_version(co_occurrence_data),
+    )
+
+def _analysis_cache_key(prompt_text: str, negative_keywords: List[str], default_styles: Set[str], co_occurrence_data: Dict,
+                        cohesion_mode: str = "binary", fingerprint_mode: str = "influence") -> tuple:
+    return (
+        prompt_text,
+        tuple(negative_keywords),
+        dataset_version(default_styles),
+        dataset_version(co_occurrence_data),
+        cohesion_mode,
+        fingerprint_mode,
+    )
 
 # --- Helper Functions ---
 
@@ -202,61 +226,108 @@ def _get_style_adjectives(styles: List[str]) -> Set[str]:
             adjectives.update(personality["adjectives"])
     return adjectives
 
-def create_annotated_prompt_html(prompt_text: str, recognized_keywords: List[str], co_occurrence_data: Dict) -> str:
-    """
-    Generates an HTML string of the prompt with keywords highlighted and tooltips.
-    """
-    sorted_keywords = sorted(recognized_keywords, key=len, reverse=True)
-    annotated_html = prompt_text
-    
-    for keyword in sorted_keywords:
-        top_associations = co_occurrence_data.get(keyword, {})
+def _keyword_tooltip(keyword: str, co_occurrence_data: Dict) -> str:
+    """Returns the tooltip text for a keyword, cached per keyword for the loaded dataset."""
+    tooltips = get_derived(co_occurrence_data, "keyword_tooltips", dict)
+    tooltip_content = tooltips.get(keyword)
+    if tooltip_content is None:
+        top_associations = get_cooccurrence_index(co_occurrence_data).top_k(keyword, 4)
         if top_associations:
-            sorted_assocs = sorted(top_associations.items(), key=lambda x: x[1], reverse=True)[:4]
-            tooltip_content = "&#10;".join([f"• {format_label(style)}: {weight:,}" for style, weight in sorted_assocs])
+            tooltip_content = "&#10;".join([f"• {format_label(style)}: {weight:,}" for style, weight in top_associations])
         else:
             tooltip_content = "No direct associations found."
+        tooltips[keyword] = tooltip_content
+    return tooltip_content
+
+def _resolve_overlapping_spans(spans: List[KeywordSpan]) -> List[KeywordSpan]:
+    """Keeps the longest span wherever spans overlap (the earliest one on ties), in text order."""
+    occupied = bytearray(max((span.end for span in spans), default=0))
+    kept = []
+    for span in sorted(spans, key=lambda s: (s.start - s.end, s.start)):
+        if not any(occupied[span.start:span.end]):
+            occupied[span.start:span.end] = b"\x01" * (span.end - span.start)
+            kept.append(span)
+    return sorted(kept)
+
+def create_annotated_prompt_html(prompt_text: str, recognized_keywords: List[str], co_occurrence_data: Dict, keyword_spans: Optional[List[KeywordSpan]] = None,
+                                 valid_styles_set: Optional[Set[str]] = None) -> str:
+    """
+    Generates an HTML string of the prompt with keywords highlighted and tooltips.
 
-        replacement_html = (
-            f'<span class="highlight-keyword" data-tooltip="{tooltip_content}">'
-            f'{keyword}'
+    The output is written in a single pass over the keyword spans, so annotation time
+    grows linearly with the prompt. Pass `keyword_spans` from the keyword scanner to
+    avoid rescanning; otherwise the prompt is scanned with the vocabulary's cached
+    matcher when `valid_styles_set` is given, or for exact `recognized_keywords` only.
+    """
+    recognized = set(recognized_keywords)
+    if keyword_spans is None:
+        matcher = get_keyword_matcher(valid_styles_set) if valid_styles_set is not None else KeywordMatcher(recognized)
+        keyword_spans = matcher.find_spans(prompt_text)
+    spans = _resolve_overlapping_spans([span for span in keyword_spans if span.style in recognized])
+
+    tooltips = {keyword: _keyword_tooltip(keyword, co_occurrence_data) for keyword in {span.style for span in spans}}
+    parts, cursor = [], 0
+    for span in spans:
+        parts.append(prompt_text[cursor:span.start])
+        parts.append(
+            f'<span class="highlight-keyword" data-tooltip="{tooltips[span.style]}">'
+            f'{span.style}'
             f'</span>'
         )
-        pattern = re.compile(r'\b(' + re.escape(keyword) + r')\b(?![^<]*>)', re.IGNORECASE)
-        annotated_html = pattern.sub(replacement_html, annotated_html)
-        
-    return annotated_html.replace("\n", "<br>")
+        cursor = span.end
+    parts.append(prompt_text[cursor:])
+
+    return "".join(parts).replace("\n", "<br>")
 
 # --- Core Logic Functions ---
 def extract_keywords(prompt_text: str, valid_styles_set: Set[str]) -> List[str]:
-    lower_prompt = prompt_text.lower()
-    found_keywords = set()
-    for style in valid_styles_set:
-        # Use regex with word boundaries (\b) for precise matching
-        if re.search(r'\b' + re.escape(style) + r'\b', lower_prompt):
-            found_keywords.add(style)
-    return sorted(list(found_keywords))
+    # A single pass of the vocabulary's precompiled automaton replaces one regex scan per style.
+    return get_keyword_matcher(valid_styles_set).extract(prompt_text)
+
+def similar_styles(style_or_prompt: str, k: int, default_styles: Set[str], co_occurrence_data: Dict) -> List[Tuple[str, float]]:
+    """
+    The `k` styles closest in the style embedding space to a style name or, for
+    any other text, to the styles recognised in it, as `(style, cosine similarity)`
+    pairs, best first. The query styles themselves are left out.
+    """
+    style = style_or_prompt.strip().lower()
+    styles = [style] if style in co_occurrence_data else extract_keywords(style_or_prompt, default_styles)
+    return get_style_embeddings(co_occurrence_data).similar_to(styles, k)
+
+def extract_keyword_spans(prompt_text: str, valid_styles_set: Set[str]) -> List[KeywordSpan]:
+    """Returns every recognised style with its character span in the original prompt."""
+    return get_keyword_matcher(valid_styles_set).find_spans(prompt_text)
 
 def calculate_influence_scores(keywords: List[str], co_occurrence_data: Dict) -> Dict[str, float]:
-    influence_scores = defaultdict(float)
-    for keyword in keywords:
-        if keyword in co_occurrence_data:
-            for associated_style, weight in co_occurrence_data[keyword].items():
-                influence_scores[associated_style] += float(weight)
-    return influence_scores
-
-def calculate_cohesion(keywords: List[str], co_occurrence_data: Dict) -> float:
-    if len(keywords) < 2:
-        return 100.0
-    connected_pairs = 0
-    total_pairs = list(combinations(keywords, 2))
-    for kw1, kw2 in total_pairs:
-        if kw2 in co_occurrence_data.get(kw1, {}) or kw1 in co_occurrence_data.get(kw2, {}):
-            connected_pairs += 1
-    return (connected_pairs / len(total_pairs)) * 100.0 if total_pairs else 100.0
+    # One sparse matrix-vector product sums the association rows of every keyword.
+    index = get_cooccurrence_index(co_occurrence_data)
+    return index.to_style_dict(index.influence(index.ids(keywords)))
+
+def calculate_pagerank_fingerprint(keywords: List[str], negative_keywords: List[str], co_occurrence_data: Dict,
+                                   top_n: int = 10) -> Dict[str, float]:
+    """
+    The `top_n` styles the keywords pull hardest towards by personalised PageRank,
+    as `{style: share of the walk's visits in percent}`, leaving out the keywords
+    themselves and the negative keywords.
+    """
+    index = get_cooccurrence_index(co_occurrence_data)
+    scores = pagerank_scores(keywords, co_occurrence_data)
+    excluded = index.ids(set(keywords) | set(negative_keywords))
+    candidates = np.setdiff1d(np.flatnonzero(scores > 0), excluded)
+    top = candidates[np.argsort(-scores[candidates], kind="stable")[:top_n]]
+    return {index.styles[i]: float(scores[i] * 100.0) for i in top}
+
+def calculate_cohesion(keywords: List[str], co_occurrence_data: Dict, keyword_links: Optional[KeywordLinks] = None) -> float:
+    # Pairs are tested in both directions on the keyword submatrix; unknown keywords count as unconnected.
+    return (keyword_links or analyse_keyword_links(keywords, co_occurrence_data)).cohesion
+
+def calculate_cohesion_scores(keywords: List[str], co_occurrence_data: Dict, keyword_links: Optional[KeywordLinks] = None) -> CohesionScores:
+    # Weighted mode: the binary score plus pair-strength and spanning-tree scores, from the same submatrix.
+    return (keyword_links or analyse_keyword_links(keywords, co_occurrence_data)).cohesion_scores
 
 # --- Suggestion Engine ---
-def generate_suggestions(cohesion_score: float, recognized_keywords: List[str], sorted_influences: List, co_occurrence_data: Dict) -> Dict:
+def generate_suggestions(cohesion_score: float, recognized_keywords: List[str], sorted_influences: List, co_occurrence_data: Dict,
+                         keyword_links: Optional[KeywordLinks] = None) -> Dict:
     # Return a structured dictionary for richer UI rendering
     suggestion = {"title": "", "type": "info", "body": {}}
 
@@ -264,39 +335,36 @@ def generate_suggestions(cohesion_score: float, recognized_keywords: List[str],
     if cohesion_score < 40 and len(recognized_keywords) > 1:
         suggestion["title"] = "Low Cohesion Detected"
         suggestion["type"] = "error"
-        
-        G = nx.Graph()
-        G.add_nodes_from(recognized_keywords)
-        for kw1, kw2 in combinations(recognized_keywords, 2):
-            if co_occurrence_data.get(kw1, {}).get(kw2): G.add_edge(kw1, kw2)
-        factions = sorted(list(nx.connected_components(G)), key=len, reverse=True)
+
+        # Factions are the connected groups of the same keyword-pair links that cohesion counts.
+        keyword_links = keyword_links or analyse_keyword_links(recognized_keywords, co_occurrence_data)
+        factions = keyword_links.factions
 
         if len(factions) > 1:
             faction_a, faction_b = factions[0], factions[1]
             
             # Strategy 1: Bridge the Gap
-            bridge_candidates = {style for style, score in sorted_influences[:50]}
-            bridge_scores = {}
-            for candidate in bridge_candidates:
-                affinity_a = sum(co_occurrence_data.get(kw, {}).get(candidate, 0) for kw in faction_a)
-                affinity_b = sum(co_occurrence_data.get(kw, {}).get(candidate, 0) for kw in faction_b)
-                if affinity_a > 0 and affinity_b > 0: bridge_scores[candidate] = affinity_a * affinity_b
-            
-            top_bridges = sorted(bridge_scores.items(), key=lambda x: x[1], reverse=True)[:3]
+            # Bridge scores come from the precomputed links of each cross-faction keyword pair
+            # (on small datasets, straight from the two factions' affinities).
+            index = get_cooccurrence_index(co_occurrence_data)
+            faction_a_ids = index.ids(faction_a)
+            bridge_scores = faction_bridge_scores(co_occurrence_data, faction_a_ids, index.ids(faction_b))
+            candidate_ids = index.ids(style for style, score in sorted_influences[:50])
+            bridge_vector = np.zeros(len(index))
+            bridge_vector[candidate_ids] = bridge_scores[candidate_ids]
+            top_bridges = index.top_entries(bridge_vector, 3)
 
             # Strategy 2: Strengthen the Core
             # Identify the keywords in the smaller faction as candidates for removal/replacement
             conflict_keywords = faction_b
             # Suggest replacements by finding keywords related to the main faction
-            main_faction_reinforcements = {
-                style for kw in faction_a for style in co_occurrence_data.get(kw, {})
-                if style not in recognized_keywords
-            }
+            main_faction_reinforcements = {index.styles[i] for i in index.successors(faction_a_ids).tolist()} - set(recognized_keywords)
             replacement_suggestions = sorted(main_faction_reinforcements)[:3]
 
             suggestion["body"] = {
                 "intro": f"Your prompt has two distinct stylistic groups:",
                 "clusters": [list(faction_a), list(faction_b)],
+                "faction_stats": [stats._asdict() for stats in keyword_links.faction_stats(2)],
                 "strategies": {
                     "Bridge the Gap (Create a Fusion)": [f"Add `{bridge[0]}` to connect your ideas." for bridge in top_bridges],
                     "Strengthen the Core (Focus)": [f"Consider replacing `{kw}` with terms like `{', '.join(replacement_suggestions)}`." for kw in conflict_keywords]
@@ -325,43 +393,56 @@ def generate_suggestions(cohesion_score: float, recognized_keywords: List[str],
         }
         return suggestion
 
-@st.cache_data
-def analyze_explorer_styles(primary_style: str, secondary_style: Optional[str], negative_keywords: Optional[List[str]], creative_direction: Optional[str], co_occurrence_data: Dict) -> Dict:
+def _constellation_graph(index, primary_style: str, expansion: ExpansionSettings) -> Dict[str, List]:
+    """The Explorer's association graph: a multi-hop expansion from the selected style."""
+    neighbourhood = expand_neighbourhood(index, index.ids([primary_style]), expansion)
+    nodes = []
+    incoming = {}
+    for source, target, weight in neighbourhood.edges:
+        incoming.setdefault(target, weight)
+    for style_id, level in zip(neighbourhood.node_ids, neighbourhood.levels):
+        style = index.styles[style_id]
+        if level == 0:
+            nodes.append({"id": style, "label": format_label(style), "size": 30, "color": PRIMARY_NODE_COLOR, "title": f"Selected Style: {format_label(style)}"})
+            continue
+        weight = _as_count(incoming[style_id])
+        degree = "Direct" if level == 1 else f"{DEGREE_NAMES.get(level, f'{level}th')}-Degree"
+        size, color = (18, SECONDARY_NODE_COLOR) if level == 1 else (max(14 - 2 * level, 6), TERTIARY_NODE_COLOR)
+        nodes.append({"id": style, "label": format_label(style), "size": size, "color": color, "title": f"{degree} Association Strength: {weight:,}"})
+
+    levels = dict(zip(neighbourhood.node_ids, neighbourhood.levels))
+    edges = []
+    for source, target, weight in neighbourhood.edges:
+        weight = _as_count(weight)
+        # Edges out of the selected style are drawn heavier than deeper ones.
+        scale = 2 if levels[source] == 0 else 1
+        edges.append({"from": index.styles[source], "to": index.styles[target], "value": math.log10(weight + 1) * scale, "title": f"Association Strength: {weight:,}"})
+    return {"nodes": nodes, "edges": edges}
+
+
+def _as_count(weight: float):
+    return int(weight) if float(weight).is_integer() else weight
+
+
+@cached(ANALYSIS_CACHE, _explorer_cache_key, NORMALISED_INPUTS)
+def analyze_explorer_styles(primary_style: str, secondary_style: Optional[str], negative_keywords: Optional[List[str]], creative_direction: Optional[str], co_occurrence_data: Dict,
+                            expansion: Optional[ExpansionSettings] = None) -> Dict:
     """
     Analyzes one or two styles for the Style Explorer mode.
     If a secondary style is provided, it performs a fusion analysis.
+    Single-style graphs follow `expansion` (default: two hops, 7 then 2 associations per style).
     """
     negative_keywords_set = set(negative_keywords) if negative_keywords else set()
     if not secondary_style:
         # --- SINGLE STYLE ANALYSIS (Original Logic) ---
-        direct_associations = co_occurrence_data.get(primary_style, {})
-        sorted_assocs = sorted(direct_associations.items(), key=lambda x: x[1], reverse=True)
+        index = get_cooccurrence_index(co_occurrence_data)
+        sorted_assocs = index.top_k(primary_style, 15)
         
         bar_chart_data = {
             style: math.log10(score + 1) for style, score in sorted_assocs[:15]
         }
 
-        nodes, edges, node_ids = [], [], set()
-        nodes.append({"id": primary_style, "label": format_label(primary_style), "size": 30, "color": PRIMARY_NODE_COLOR, "title": f"Selected Style: {format_label(primary_style)}"})
-        node_ids.add(primary_style)
-
-        first_degree_nodes = sorted_assocs[:7]
-        for style, weight in first_degree_nodes:
-            if style not in node_ids:
-                nodes.append({"id": style, "label": format_label(style), "size": 18, "color": SECONDARY_NODE_COLOR, "title": f"Direct Association Strength: {weight:,}"})
-                node_ids.add(style)
-            edges.append({"from": primary_style, "to": style, "value": math.log10(weight + 1) * 2, "title": f"Association Strength: {weight:,}"})
-
-        for first_degree_style, _ in first_degree_nodes:
-            second_degree_assocs = sorted(co_occurrence_data.get(first_degree_style, {}).items(), key=lambda x: x[1], reverse=True)[:2]
-            for second_degree_style, weight in second_degree_assocs:
-                if second_degree_style not in node_ids:
-                    nodes.append({"id": second_degree_style, "label": format_label(second_degree_style), "size": 10, "color": TERTIARY_NODE_COLOR, "title": f"Second-Degree Association Strength: {weight:,}"})
-                    node_ids.add(second_degree_style)
-                if second_degree_style in node_ids:
-                     edges.append({"from": first_degree_style, "to": second_degree_style, "value": math.log10(weight + 1), "title": f"Association Strength: {weight:,}"})
-
-        graph_data = {"nodes": nodes, "edges": edges}
+        graph_data = _constellation_graph(index, primary_style, expansion or ExpansionSettings())
 
         # --- PROMPT STARTER KIT (Single Style) - COMPILE ENHANCED BRIEF FOR GEMINI ---
         positive_adjectives = _get_style_adjectives([primary_style])
@@ -396,158 +477,305 @@ def analyze_explorer_styles(primary_style: str, secondary_style: Optional[str],
 
     else:
         # --- FUSION ANALYSIS ---
-        assocs_a = co_occurrence_data.get(primary_style, {})
-        assocs_b = co_occurrence_data.get(secondary_style, {})
-        
-        # 1. Bar Chart Data (with Synergy Boost)
-        combined_scores = defaultdict(float)
-        all_keys = set(assocs_a.keys()) | set(assocs_b.keys())
-        for key in all_keys:
-            score_a = assocs_a.get(key, 0)
-            score_b = assocs_b.get(key, 0)
-            combined_scores[key] = score_a + score_b
-            # Synergy Boost for shared associates
-            if score_a > 0 and score_b > 0:
-                combined_scores[key] *= 1.5
-
-        sorted_combined_assocs = sorted(combined_scores.items(), key=lambda x: x[1], reverse=True)
-        bar_chart_data = {style: math.log10(score + 1) for style, score in sorted_combined_assocs[:15]}
-        
-        # 2. Network Graph Data
-        nodes, edges, node_ids = [], [], set()
-        top_assocs_a = {style for style, score in sorted(assocs_a.items(), key=lambda x:x[1], reverse=True)[:15]}
-        top_assocs_b = {style for style, score in sorted(assocs_b.items(), key=lambda x:x[1], reverse=True)[:15]}
-        bridge_nodes = top_assocs_a.intersection(top_assocs_b)
-
-        # Add Primary Nodes
-        for style in [primary_style, secondary_style]:
-            nodes.append({"id": style, "label": format_label(style), "size": 30, "color": PRIMARY_NODE_COLOR, "title": f"Primary Style: {format_label(style)}"})
-            node_ids.add(style)
-
-        # Add Associated Nodes (Top 7 from each primary style)
-        for source_style, assocs in [(primary_style, assocs_a), (secondary_style, assocs_b)]:
-            top_7 = sorted(assocs.items(), key=lambda x: x[1], reverse=True)[:7]
-            for assoc_style, weight in top_7:
-                if assoc_style not in node_ids:
-                    is_bridge = assoc_style in bridge_nodes
-                    node_color = BRIDGE_NODE_COLOR if is_bridge else SECONDARY_NODE_COLOR
-                    title_prefix = "Bridge Style" if is_bridge else "Direct Association"
-                    nodes.append({"id": assoc_style, "label": format_label(assoc_style), "size": 18, "color": node_color, "title": f"{title_prefix}: {format_label(assoc_style)}<br>Strength: {weight:,}"})
-                    node_ids.add(assoc_style)
-                edges.append({"from": source_style, "to": assoc_style, "value": math.log10(weight + 1) * 2, "title": f"Association Strength: {weight:,}"})
-
-        graph_data = {"nodes": nodes, "edges": edges}
-
-        # --- PROMPT STARTER KIT (Fusion) - COMPILE BRIEF FOR GEMINI ---
-        positive_adjectives = _get_style_adjectives([primary_style, secondary_style])
-        creative_direction_section = f"\n        **Mandatory Creative Direction:** {creative_direction.strip()}" if creative_direction and creative_direction.strip() else ""
+        return {**_fusion_analysis([primary_style, secondary_style], negative_keywords, creative_direction, co_occurrence_data),
+                "secondary_style_analyzed": secondary_style}
 
-        if negative_keywords_set:
-            negative_adjectives = _get_style_adjectives(list(negative_keywords_set))
-            creative_brief = f"""
-        **Primary Style 1:** {primary_style}
-        **Primary Style 2:** {secondary_style}
-        **Creative Goal:** To fuse '{primary_style}' and '{secondary_style}' while actively avoiding the sensibilities of '{', '.join(negative_keywords_set)}'.
+    return {
+        "bar_chart_data": bar_chart_data,
+        "graph_data": graph_data,
+    "creative_brief": creative_brief,
+    "similar_styles": dict(get_style_embeddings(co_occurrence_data).similar_to([primary_style], SIMILAR_STYLES_SHOWN)),
+    "secondary_style_analyzed": secondary_style, # Pass this back for UI state
+    }
+
+
+@cached(ANALYSIS_CACHE, _fusion_cache_key, NORMALISED_INPUTS)
+def analyze_fusion_styles(styles: List[str], negative_keywords: Optional[List[str]], creative_direction: Optional[str], co_occurrence_data: Dict) -> Dict:
+    """
+    Fusion analysis of two to `MAX_FUSION_STYLES` styles for the Style Explorer.
+
+    Returns the same bar chart, graph and brief sections as `analyze_explorer_styles`,
+    plus the de-duplicated `fusion_styles`, or an `"error"` entry.
+    """
+    styles = list(dict.fromkeys(styles))
+    if not 2 <= len(styles) <= MAX_FUSION_STYLES:
+        return {"error": f"Choose between 2 and {MAX_FUSION_STYLES} different styles to fuse."}
+    unknown = [style for style in styles if style not in get_cooccurrence_index(co_occurrence_data)]
+    if unknown:
+        return {"error": f"Unknown styles: {', '.join(unknown)}."}
+    return _fusion_analysis(styles, negative_keywords, creative_direction, co_occurrence_data)
+
+
+def _join_styles(styles: List[str], quote: str = "") -> str:
+    quoted = [f"{quote}{style}{quote}" for style in styles]
+    return f"{', '.join(quoted[:-1])} and {quoted[-1]}"
+
+
+def _fusion_analysis(styles: List[str], negative_keywords: Optional[List[str]], creative_direction: Optional[str], co_occurrence_data: Dict) -> Dict:
+    negative_keywords_set = set(negative_keywords) if negative_keywords else set()
+    # 1. Bar Chart Data (combined scores with synergy for shared associates, over all seeds at once)
+    index = get_cooccurrence_index(co_occurrence_data)
+    seed_ids = index.ids(styles)
+    fusion = fuse_styles(index, seed_ids)
+    bar_chart_data = {style: math.log10(score + 1) for style, score in index.top_entries(fusion.combined, 15)}
+
+    # 2. Network Graph Data
+    nodes, edges, node_ids, edge_pairs = [], [], set(), set()
+    bridge_counts = fusion.bridge_counts
+    bridge_nodes = [index.styles[i] for i in fusion.bridge_ids.tolist()]
+
+    # Add Primary Nodes
+    for style in styles:
+        nodes.append({"id": style, "label": format_label(style), "size": 30, "color": PRIMARY_NODE_COLOR, "title": f"Primary Style: {format_label(style)}"})
+        node_ids.add(style)
+
+    def add_edge(source_style: str, assoc_style: str, weight: float):
+        if (source_style, assoc_style) not in edge_pairs:
+            edge_pairs.add((source_style, assoc_style))
+            edges.append({"from": source_style, "to": assoc_style, "value": math.log10(weight + 1) * 2, "title": f"Association Strength: {weight:,}"})
+
+    # Add Associated Nodes (Top 7 from each primary style)
+    for source_style in styles:
+        for assoc_style, weight in index.top_k(source_style, 7):
+            if assoc_style not in node_ids:
+                shared = int(bridge_counts[index.style_ids[assoc_style]])
+                is_bridge = shared >= 2
+                node_color = BRIDGE_NODE_COLOR if is_bridge else SECONDARY_NODE_COLOR
+                title_prefix = f"Bridge Style ({shared} of {len(styles)} styles)" if is_bridge else "Direct Association"
+                nodes.append({"id": assoc_style, "label": format_label(assoc_style), "size": 18, "color": node_color, "title": f"{title_prefix}: {format_label(assoc_style)}<br>Strength: {weight:,}"})
+                node_ids.add(assoc_style)
+            add_edge(source_style, assoc_style, weight)
+
+    # Link each drawn bridge to every seed it bridges, not only the seeds it is a top-7 association of.
+    drawn_bridges = [style for style in bridge_nodes if style in node_ids]
+    for source_style, source_id in zip(styles, seed_ids.tolist()):
+        for bridge in drawn_bridges:
+            weight = index.pair_weight(source_id, index.style_ids[bridge])
+            if weight > 0:
+                add_edge(source_style, bridge, int(weight) if weight.is_integer() else weight)
+
+    graph_data = {"nodes": nodes, "edges": edges}
+
+    # --- PROMPT STARTER KIT (Fusion) - COMPILE BRIEF FOR GEMINI ---
+    positive_adjectives = _get_style_adjectives(styles)
+    creative_direction_section = f"\n        **Mandatory Creative Direction:** {creative_direction.strip()}" if creative_direction and creative_direction.strip() else ""
+    style_count = FUSION_COUNT_WORDS.get(len(styles), str(len(styles)))
+
+    if negative_keywords_set:
+        negative_adjectives = _get_style_adjectives(list(negative_keywords_set))
+        style_lines = "\n".join(f"        **Primary Style {number}:** {style}" for number, style in enumerate(styles, 1))
+        creative_brief = f"""
+{style_lines}
+        **Creative Goal:** To fuse {_join_styles(styles, "'")} while actively avoiding the sensibilities of '{', '.join(negative_keywords_set)}'.
         **Emphasize These Combined Qualities:** {', '.join(positive_adjectives) or 'N/A'}
         **Steer Away From These Qualities:** {', '.join(negative_adjectives) or 'N/A'}{creative_direction_section}
-        **Task:** Based on the data above, write an optimal Suno 4.5+ style prompt. Your primary goal is to find a creative angle to fuse the two styles, resolving their contradictions into a believable and compelling musical idea, while actively contrasting with the specified negative qualities. Follow all rules from your system instruction.
+        **Task:** Based on the data above, write an optimal Suno 4.5+ style prompt. Your primary goal is to find a creative angle to fuse the {style_count} styles, resolving their contradictions into a believable and compelling musical idea, while actively contrasting with the specified negative qualities. Follow all rules from your system instruction.
             """.strip()
+    else:
+        # Brief for fusion without negative styles
+        style_sections = "\n\n".join(
+            f"        **Primary Style {number}:** {style}\n        *   **Personality:** {STYLE_PERSONALITY_DICT.get(style, {})}"
+            for number, style in enumerate(styles, 1)
+        )
+        if len(styles) > 2:
+            # Say how widely each bridge is shared once there are more than two seeds.
+            bridge_text = ', '.join(f"{style} ({int(bridge_counts[index.style_ids[style]])} of {len(styles)})" for style in bridge_nodes)
         else:
-            # Brief for fusion without negative styles
-            p1_personality = STYLE_PERSONALITY_DICT.get(primary_style, {})
-            p2_personality = STYLE_PERSONALITY_DICT.get(secondary_style, {})
-            creative_brief = f"""
-        **Primary Style 1:** {primary_style}
-        *   **Personality:** {p1_personality}
-
-        **Primary Style 2:** {secondary_style}
-        *   **Personality:** {p2_personality}
+            bridge_text = ', '.join(bridge_nodes)
+        creative_brief = f"""
+{style_sections}
 
-        **Contradiction to Resolve:** The core challenge is to blend the potentially conflicting personalities, moods, and aesthetics of {primary_style} and {secondary_style}.
+        **Contradiction to Resolve:** The core challenge is to blend the potentially conflicting personalities, moods, and aesthetics of {_join_styles(styles)}.
 
-        **Bridge Nodes (Shared Influences):** {', '.join(bridge_nodes) or 'None found, a true experimental fusion.'}
+        **Bridge Nodes (Shared Influences):** {bridge_text or 'None found, a true experimental fusion.'}
         **Combined Adjectives to Inspire Fusion:** {', '.join(positive_adjectives) or 'N/A'}{creative_direction_section}
 
-        **Task:** Based on the data above, write an optimal Suno 4.5+ style prompt following all rules from your system instruction. Your primary goal is to find a creative angle to fuse the two styles, resolving their contradictions into a believable and compelling musical idea.
+        **Task:** Based on the data above, write an optimal Suno 4.5+ style prompt following all rules from your system instruction. Your primary goal is to find a creative angle to fuse the {style_count} styles, resolving their contradictions into a believable and compelling musical idea.
         """.strip()
 
     return {
         "bar_chart_data": bar_chart_data,
         "graph_data": graph_data,
-    "creative_brief": creative_brief,
-    "secondary_style_analyzed": secondary_style, # Pass this back for UI state
+        "creative_brief": creative_brief,
+        "similar_styles": dict(get_style_embeddings(co_occurrence_data).similar_to(styles, SIMILAR_STYLES_SHOWN)),
+        "fusion_styles": styles,
     }
 # --- Main Orchestrator ---
-@st.cache_data
-def prepare_analysis_results(prompt_text: str, negative_keywords: List[str], default_styles: Set[str], co_occurrence_data: Dict) -> Dict[str, Any]:
-    positive_keywords = extract_keywords(prompt_text, default_styles)
-    negative_keywords_set = set(negative_keywords)
+class AnalysisResults(Mapping):
+    """
+    Analysis of one prompt, computed section by section on first access.
 
-    # Ensure keywords are not in both positive and negative lists (negative wins)
-    positive_keywords = [kw for kw in positive_keywords if kw not in negative_keywords_set]
+    Recognised keywords and the cohesion score (the metrics row) are computed up
+    front. The fingerprint, suggestion, annotated HTML and association graph are
+    built and memoised when first read, so the Streamlit tabs and API callers only
+    pay for the views they render. It reads like the dict it replaces; `to_dict()`
+    computes every section, and pickling yields that plain dict.
+    """
 
-    if not positive_keywords:
-        return {"recognized_keywords": [], "error": "No valid Suno styles were found in the prompt."}
+    def __init__(self, prompt_text: str, negative_keywords: List[str], keyword_spans: List[KeywordSpan],
+                 positive_keywords: List[str], co_occurrence_data: Dict, cohesion_mode: str = "binary",
+                 fingerprint_mode: str = "influence"):
+        self._prompt_text = prompt_text
+        self._fingerprint_mode = fingerprint_mode
+        self._negative_keywords_set = set(negative_keywords)
+        self._keyword_spans = keyword_spans
+        self._co_occurrence_data = co_occurrence_data
+        self._keyword_links = analyse_keyword_links(positive_keywords, co_occurrence_data)
+        self._values: Dict[str, Any] = {
+            "recognized_keywords": positive_keywords, # Renamed for backward compatibility with UI
+            "negative_keywords": negative_keywords,
+            "cohesion_score": calculate_cohesion(positive_keywords, co_occurrence_data, self._keyword_links),
+        }
+        self._builders = {
+            "fingerprint": self._build_fingerprint,
+            "graph_data": self._build_graph_data,
+            "annotated_html": self._build_annotated_html,
+            "suggestion": self._build_suggestion,
+        }
+        if cohesion_mode == "weighted":
+            self._builders["cohesion_scores"] = self._build_cohesion_scores
+        self._size_listeners: List[Callable[[], None]] = []
 
-    # 1. Analyze the positive prompt in its original state
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            if key not in self._builders:
+                raise
+        # Sections are deterministic, so a concurrent double build is harmless.
+        retained_before = self._retained_state().keys()
+        value = self._values[key] = self._builders[key]()
+        if self._size_listeners:
+            # Only the new section and the state first kept for it are measured.
+            added = {name: state for name, state in self._retained_state().items() if name not in retained_before}
+            added_bytes = len(pickle.dumps((value, added), protocol=pickle.HIGHEST_PROTOCOL))
+            for listener in list(self._size_listeners):
+                listener(added_bytes)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        # Mapping's default would build the section just to test for it.
+        return key in self._values or key in self._builders
+
+    def __iter__(self):
+        yield from ("recognized_keywords", "negative_keywords", "cohesion_score")
+        yield from self._builders
+
+    def __len__(self) -> int:
+        return 3 + len(self._builders)
+
+    def __reduce__(self):
+        return (dict, (self.to_dict(),))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Every section, computing the ones not read yet."""
+        return {key: self[key] for key in self}
+
+    def computed_sections(self) -> List[str]:
+        """Names of the sections built so far."""
+        return list(self._values)
+
+    def estimated_size(self) -> int:
+        """
+        Pickled size of the sections built so far and of the intermediate state kept
+        for later sections, for the result cache's byte budget.
+        """
+        retained = (self._values, self._keyword_spans, self._keyword_links.keywords, self._retained_state())
+        return len(pickle.dumps(retained, protocol=pickle.HIGHEST_PROTOCOL)) + self._keyword_links.links.nbytes
+
+    def add_size_listener(self, listener: Callable[[int], None]) -> None:
+        """Registers a callback run with the added bytes after each section build, so a cache can charge the growth."""
+        self._size_listeners.append(listener)
+
+    def _retained_state(self) -> Dict[str, Any]:
+        # Intermediate results memoised for later sections.
+        return {name: self.__dict__[name] for name in ("_influence_scores", "_sorted_influences") if name in self.__dict__}
 
     # NOTE: The "Repulsive Force" logic has been removed. All analysis now uses the original, un-penalized scores.
     # This provides a more accurate and less misleading representation of the data.
-    influence_scores = calculate_influence_scores(positive_keywords, co_occurrence_data)
-    
-    # Calculate cohesion score for suggestions
-    cohesion_score = calculate_cohesion(positive_keywords, co_occurrence_data)
-
-    # Filter out negative keywords from the final influence scores before display
-    for neg_kw in negative_keywords_set:
-        if neg_kw in influence_scores:
-            del influence_scores[neg_kw]
-
-    normalized_scores = {
-        style: math.log10(score + 1)
-        for style, score in influence_scores.items()
-        if style not in positive_keywords
-    }
-    
-    sorted_influences = sorted(normalized_scores.items(), key=lambda item: item[1], reverse=True)
-    top_10_fingerprint = dict(sorted_influences[:10]) # Bug Fix: Changed from top_20 to top_10
+    @cached_property
+    def _influence_scores(self) -> Dict[str, float]:
+        influence_scores = calculate_influence_scores(self["recognized_keywords"], self._co_occurrence_data)
+        # Filter out negative keywords from the final influence scores before display
+        for neg_kw in self._negative_keywords_set:
+            influence_scores.pop(neg_kw, None)
+        return influence_scores
+
+    @cached_property
+    def _sorted_influences(self) -> List:
+        positive_keywords = set(self["recognized_keywords"])
+        normalized_scores = {
+            style: math.log10(score + 1)
+            for style, score in self._influence_scores.items()
+            if style not in positive_keywords
+        }
+        return sorted(normalized_scores.items(), key=lambda item: item[1], reverse=True)
+
+    def _build_fingerprint(self) -> Dict[str, float]:
+        if self._fingerprint_mode == "pagerank":
+            return calculate_pagerank_fingerprint(self["recognized_keywords"], list(self._negative_keywords_set), self._co_occurrence_data)
+        return dict(self._sorted_influences[:10]) # Bug Fix: Changed from top_20 to top_10
+
+    def _build_suggestion(self) -> Dict:
+        return generate_suggestions(self["cohesion_score"], self["recognized_keywords"], self._sorted_influences,
+                                    self._co_occurrence_data, self._keyword_links)
+
+    def _build_annotated_html(self) -> str:
+        return create_annotated_prompt_html(self._prompt_text, self["recognized_keywords"], self._co_occurrence_data, self._keyword_spans)
+
+    def _build_cohesion_scores(self) -> Dict[str, float]:
+        return calculate_cohesion_scores(self["recognized_keywords"], self._co_occurrence_data, self._keyword_links)._asdict()
+
+    def _build_graph_data(self) -> Dict[str, List]:
+        positive_keywords, sorted_influences = self["recognized_keywords"], self._sorted_influences
+        co_occurrence_data, negative_keywords_set = self._co_occurrence_data, self._negative_keywords_set
+        nodes, edges = [], []
+        node_ids = set()
+        top_associated_styles_for_graph = {style for style, score in sorted_influences[:20]}
+
+        for keyword in positive_keywords:
+            if keyword not in node_ids:
+                nodes.append({"id": keyword, "label": format_label(keyword), "size": 25, "color": PRIMARY_NODE_COLOR, "title": f"Your Keyword: {format_label(keyword)}"})
+                node_ids.add(keyword)
+
+        min_log_score = sorted_influences[9][1] if len(sorted_influences) > 9 else 1
+        max_log_score = sorted_influences[0][1] if sorted_influences else 1
+
+        for style, score in sorted_influences:
+            if style in top_associated_styles_for_graph and style not in node_ids:
+                size_ratio = (score - min_log_score) / (max_log_score - min_log_score) if max_log_score > min_log_score else 0
+                node_size = 12 + (8 * size_ratio)
+                nodes.append({"id": style, "label": format_label(style), "size": node_size, "color": SECONDARY_NODE_COLOR, "title": f"Influence Score: {self._influence_scores.get(style, 0):,.0f}"})
+                node_ids.add(style)
 
-    # 4. Generate suggestions based on the final, penalized data
-    suggestion = generate_suggestions(cohesion_score, positive_keywords, sorted_influences, co_occurrence_data)
-    
-    # 5. Create annotated HTML for the prompt
-    annotated_html = create_annotated_prompt_html(prompt_text, positive_keywords, co_occurrence_data)
-    
-    nodes, edges = [], []
-    node_ids = set()
-    top_associated_styles_for_graph = {style for style, score in sorted_influences[:20]}
-
-    for keyword in positive_keywords:
-        if keyword not in node_ids:
-            nodes.append({"id": keyword, "label": format_label(keyword), "size": 25, "color": PRIMARY_NODE_COLOR, "title": f"Your Keyword: {format_label(keyword)}"})
-            node_ids.add(keyword)
-
-    min_log_score = sorted_influences[9][1] if len(sorted_influences) > 9 else 1
-    max_log_score = sorted_influences[0][1] if sorted_influences else 1
-
-    for style, score in sorted_influences:
-        if style in top_associated_styles_for_graph and style not in node_ids:
-            size_ratio = (score - min_log_score) / (max_log_score - min_log_score) if max_log_score > min_log_score else 0
-            node_size = 12 + (8 * size_ratio)
-            nodes.append({"id": style, "label": format_label(style), "size": node_size, "color": SECONDARY_NODE_COLOR, "title": f"Influence Score: {influence_scores.get(style, 0):,.0f}"})
-            node_ids.add(style)
-
-    for keyword in positive_keywords:
-        for associated_style, weight in co_occurrence_data.get(keyword, {}).items():
-            if associated_style in node_ids and associated_style != keyword and associated_style not in negative_keywords_set:
-                edges.append({"from": keyword, "to": associated_style, "value": math.log10(weight + 1), "title": f"Association Strength: {weight:,}"})
+        for keyword in positive_keywords:
+            for associated_style, weight in co_occurrence_data.get(keyword, {}).items():
+                if associated_style in node_ids and associated_style != keyword and associated_style not in negative_keywords_set:
+                    edges.append({"from": keyword, "to": associated_style, "value": math.log10(weight + 1), "title": f"Association Strength: {weight:,}"})
+        return {"nodes": nodes, "edges": edges}
 
-    return {
-        "recognized_keywords": positive_keywords, # Renamed for backward compatibility with UI
-        "negative_keywords": negative_keywords,
-        "cohesion_score": cohesion_score,
-        "fingerprint": top_10_fingerprint,
-        "graph_data": {"nodes": nodes, "edges": edges},
-        "annotated_html": annotated_html,
-        "suggestion": suggestion,
-    }
\ No newline at end of file
+
+@cached(ANALYSIS_CACHE, _analysis_cache_key, NORMALISED_INPUTS)
+def prepare_analysis_results(prompt_text: str, negative_keywords: List[str], default_styles: Set[str], co_occurrence_data: Dict,
+                             cohesion_mode: str = "binary", fingerprint_mode: str = "influence") -> Mapping[str, Any]:
+    """
+    Analyses a prompt. Returns an `AnalysisResults` mapping whose heavier sections
+    are computed on first access, or a plain dict with an "error" entry when the
+    prompt has no recognised styles.
+    """
+    if cohesion_mode not in COHESION_MODES:
+        raise ValueError(f"Unknown cohesion mode {cohesion_mode!r}; expected one of {', '.join(COHESION_MODES)}.")
+    if fingerprint_mode not in FINGERPRINT_MODES:
+        raise ValueError(f"Unknown fingerprint mode {fingerprint_mode!r}; expected one of {', '.join(FINGERPRINT_MODES)}.")
+    keyword_spans = extract_keyword_spans(prompt_text, default_styles)
+    positive_keywords = sorted({span.style for span in keyword_spans})
+    negative_keywords_set = set(negative_keywords)
+
+    # Ensure keywords are not in both positive and negative lists (negative wins)
+    positive_keywords = [kw for kw in positive_keywords if kw not in negative_keywords_set]
+
+    if not positive_keywords:
+        return {"recognized_keywords": [], "error": "No valid Suno styles were found in the prompt."}
+
+    return AnalysisResults(prompt_text, negative_keywords, keyword_spans, positive_keywords, co_occurrence_data, cohesion_mode,
+                           fingerprint_mode)
\ No newline at end of file
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# suno-prompt-analyzer/api_server.py
+
+"""
+JSON HTTP service over the analysis core, as an ASGI app (Starlette).
+
+Each worker process loads the co-occurrence data once at startup and keeps it
+warm; requests then hit the shared indexes and the analysis result cache.
+
+Endpoints:
+    GET  /health           Liveness and dataset size.
+    POST /analyze          {"prompt", "negative_keywords", "cohesion_mode", "fingerprint_mode", "summary", "sections"};
+                           "sections" lists the result sections to compute and return.
+    POST /analyze/batch    {"prompts": [{"id", "prompt", "negative_keywords"}, ...], "cohesion_mode", "fingerprint_mode"}
+    POST /explore          {"primary_style", "secondary_style", "fusion_styles", "negative_keywords", "creative_direction"};
+                           "fusion_styles" lists further styles for an N-way fusion with the primary;
+                           "expansion" ({"depth", "fan_out", "min_weight", "max_nodes"}) shapes a
+                           single style's graph and cannot be combined with a fusion.
+    POST /similar          {"query", "k"}; styles closest in the embedding space to a style or prompt.
+    POST /generate         {"creative_brief", "stream"}; the Gemini key comes from the
+                           `X-Gemini-Api-Key` header or the GEMINI_API_KEY variable.
+                           With "stream": true the prompt is sent as plain-text chunks.
+
+Configuration comes from the environment: SUNO_DATA_PATH (JSON or snapshot),
+SUNO_EMBEDDINGS_PATH (prebuilt style embeddings, see `embeddings.py`),
+GEMINI_API_KEY, and GEMINI_BASE_URL to point generation at another endpoint
+such as `fake_gemini_server.py` for load tests.
+
+Usage:
+    uvicorn api_server:app --workers 4
+    python api_server.py --port 8000 --workers 4
+"""
+
+import argparse
+import contextlib
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from analyzer import (
+    COHESION_MODES, FINGERPRINT_MODES, MAX_FUSION_STYLES, analyze_explorer_styles, analyze_fusion_styles, get_gemini_service,
+    prepare_analysis_results, similar_styles,
+)
+from batch_analyze import summarise_result
+from data_loader import load_suno_data
+from embeddings import get_style_embeddings
+from expansion import MAX_DEPTH, ExpansionSettings
+from gemini_service import GeminiService
+
+DEFAULT_DATA_PATH = Path(__file__).parent / "data" / "suno_logic.json"
+# Largest number of prompts accepted by one /analyze/batch request.
+MAX_BATCH_PROMPTS = 1000
+# Most neighbours one /similar request may ask for.
+MAX_SIMILAR_STYLES = 100
+
+MISSING_KEY_ERROR = "Gemini API key not found. Send it in the X-Gemini-Api-Key header or set GEMINI_API_KEY."
+
+
+class RequestError(ValueError):
+    """A malformed request body, answered with HTTP 400."""
+
+
+async def _read_json(request: Request) -> Dict[str, Any]:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise RequestError("The request body is not valid JSON.")
+    if not isinstance(body, dict):
+        raise RequestError("The request body must be a JSON object.")
+    return body
+
+
+def _string(body: Dict[str, Any], field: str, required: bool = True) -> Optional[str]:
+    value = body.get(field)
+    if value is None and not required:
+        return None
+    if not isinstance(value, str) or (required and not value.strip()):
+        raise RequestError(f"'{field}' must be a non-empty string.")
+    return value
+
+
+def _string_list(body: Dict[str, Any], field: str) -> List[str]:
+    """A comma-separated string or a list of strings, as stripped, lower-cased entries."""
+    value = body.get(field)
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise RequestError(f"'{field}' must be a comma-separated string or a list of strings.")
+    return [item.strip().lower() for item in value if item.strip()]
+
+
+def _cohesion_mode(body: Dict[str, Any]) -> str:
+    mode = body.get("cohesion_mode", "binary")
+    if mode not in COHESION_MODES:
+        raise RequestError(f"'cohesion_mode' must be one of: {', '.join(COHESION_MODES)}.")
+    return mode
+
+
+def _fingerprint_mode(body: Dict[str, Any]) -> str:
+    mode = body.get("fingerprint_mode", "influence")
+    if mode not in FINGERPRINT_MODES:
+        raise RequestError(f"'fingerprint_mode' must be one of: {', '.join(FINGERPRINT_MODES)}.")
+    return mode
+
+
+def _analyse(prompt: str, negatives: List[str], cohesion_mode: str, fingerprint_mode: str, data) -> Mapping[str, Any]:
+    default_styles, co_occurrence_data = data
+    return prepare_analysis_results(prompt, negatives, default_styles, co_occurrence_data, cohesion_mode=cohesion_mode,
+                                    fingerprint_mode=fingerprint_mode)
+
+
+def _expansion(body: Dict[str, Any]) -> Optional[ExpansionSettings]:
+    options = body.get("expansion")
+    if options is None:
+        return None
+    if not isinstance(options, dict) or not set(options) <= set(ExpansionSettings._fields):
+        raise RequestError(f"'expansion' must be an object with any of: {', '.join(ExpansionSettings._fields)}.")
+    fan_out = options.get("fan_out", ExpansionSettings().fan_out)
+    fan_out = tuple(fan_out) if isinstance(fan_out, list) else fan_out
+    settings = ExpansionSettings(**{**options, "fan_out": fan_out})
+    fan_outs = list(fan_out) if isinstance(fan_out, tuple) else [fan_out]
+    counts = [settings.depth, settings.max_nodes] + fan_outs
+    if (not fan_outs or not all(isinstance(count, int) and count > 0 for count in counts) or settings.depth > MAX_DEPTH
+            or not isinstance(settings.min_weight, (int, float))):
+        raise RequestError(f"'expansion' needs a depth of 1 to {MAX_DEPTH}, positive integer fan-outs and node budget, and a numeric min_weight.")
+    return settings
+
+
+def _select_sections(results: Mapping[str, Any], sections: Any) -> Dict[str, Any]:
+    # Only the requested sections of a lazy `AnalysisResults` get computed.
+    if sections is None or "error" in results:
+        return dict(results)
+    if not isinstance(sections, list) or not all(isinstance(section, str) for section in sections):
+        raise RequestError("'sections' must be a list of section names.")
+    unknown = [section for section in sections if section not in results]
+    if unknown:
+        raise RequestError(f"Unknown sections: {', '.join(unknown)}. Available: {', '.join(results)}.")
+    return {section: results[section] for section in sections}
+
+
+def create_app(data_path: Optional[str] = None, gemini_service: Optional[GeminiService] = None,
+               api_key: Optional[str] = None) -> Starlette:
+    """
+    Builds the service.
+
+    Args:
+        data_path: Dataset to load at startup (default: SUNO_DATA_PATH, else the bundled JSON).
+        gemini_service: Service used by /generate (default: the app-wide shared one).
+        api_key: Fallback Gemini key when a request sends none (default: GEMINI_API_KEY).
+    """
+    data_path = data_path or os.getenv("SUNO_DATA_PATH", str(DEFAULT_DATA_PATH))
+    api_key = api_key or os.getenv("GEMINI_API_KEY")
+    state: Dict[str, Any] = {}
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette):
+        # Loaded once per worker process, before the first request is accepted.
+        state["data"] = load_suno_data(data_path)
+        # Explorer results list similar styles, so the embeddings are built (or loaded
+        # from SUNO_EMBEDDINGS_PATH) here rather than by the first /explore request.
+        get_style_embeddings(state["data"][1])
+        yield
+
+    async def health(request: Request) -> JSONResponse:
+        default_styles, _ = state["data"]
+        return JSONResponse({"status": "ok", "styles": len(default_styles)})
+
+    async def analyze(request: Request) -> JSONResponse:
+        body = await _read_json(request)
+        prompt, negatives = _string(body, "prompt"), _string_list(body, "negative_keywords")
+        cohesion_mode, fingerprint_mode = _cohesion_mode(body), _fingerprint_mode(body)
+
+        def run() -> Dict[str, Any]:
+            results = _analyse(prompt, negatives, cohesion_mode, fingerprint_mode, state["data"])
+            if body.get("summary"):
+                return summarise_result(body.get("id"), results)
+            return _select_sections(results, body.get("sections"))
+
+        # A cache miss, or a lazy section built for the response, is CPU-bound work
+        # that would stall every other request on the event loop.
+        return JSONResponse(await run_in_threadpool(run))
+
+    async def analyze_batch(request: Request) -> JSONResponse:
+        body = await _read_json(request)
+        prompts = body.get("prompts")
+        if not isinstance(prompts, list) or not prompts:
+            raise RequestError("'prompts' must be a non-empty list.")
+        if len(prompts) > MAX_BATCH_PROMPTS:
+            raise RequestError(f"At most {MAX_BATCH_PROMPTS} prompts are accepted per batch.")
+        records = []
+        for number, record in enumerate(prompts):
+            if isinstance(record, str):
+                record = {"prompt": record}
+            if not isinstance(record, dict):
+                raise RequestError("Each entry of 'prompts' must be a string or an object.")
+            records.append((record.get("id", number), _string(record, "prompt"), _string_list(record, "negative_keywords")))
+        cohesion_mode, fingerprint_mode = _cohesion_mode(body), _fingerprint_mode(body)
+
+        def run() -> List[Dict[str, Any]]:
+            return [summarise_result(record_id, _analyse(prompt, negatives, cohesion_mode, fingerprint_mode, state["data"]))
+                    for record_id, prompt, negatives in records]
+
+        # Whole batches go to a thread so they do not stall other requests on the loop.
+        return JSONResponse({"results": await run_in_threadpool(run)})
+
+    async def explore(request: Request) -> JSONResponse:
+        body = await _read_json(request)
+        _, co_occurrence_data = state["data"]
+        primary_style = _string(body, "primary_style").strip().lower()
+        if primary_style not in co_occurrence_data:
+            raise RequestError(f"Unknown style '{primary_style}'.")
+        secondary_style = _string(body, "secondary_style", required=False)
+        secondary_style = secondary_style.strip().lower() if secondary_style and secondary_style.strip() else None
+        if secondary_style and secondary_style not in co_occurrence_data:
+            raise RequestError(f"Unknown style '{secondary_style}'.")
+        fusion_styles = body.get("fusion_styles")
+        if fusion_styles is not None:
+            if not isinstance(fusion_styles, list) or not all(isinstance(style, str) for style in fusion_styles):
+                raise RequestError("'fusion_styles' must be a list of style names.")
+            styles = list(dict.fromkeys([primary_style] + ([secondary_style] if secondary_style else [])
+                                        + [style.strip().lower() for style in fusion_styles]))
+            unknown = [style for style in styles if style not in co_occurrence_data]
+            if unknown:
+                raise RequestError(f"Unknown styles: {', '.join(unknown)}.")
+            if len(styles) > MAX_FUSION_STYLES:
+                raise RequestError(f"At most {MAX_FUSION_STYLES} styles can be fused.")
+        negatives = _string_list(body, "negative_keywords")
+        creative_direction = _string(body, "creative_direction", required=False)
+        expansion = _expansion(body)
+        if fusion_styles is not None and len(styles) > 1:
+            if expansion is not None:
+                raise RequestError("'expansion' shapes a single style's graph and cannot be combined with 'fusion_styles'.")
+            return JSONResponse(await run_in_threadpool(
+                analyze_fusion_styles, styles, negatives, creative_direction, co_occurrence_data,
+            ))
+        return JSONResponse(await run_in_threadpool(
+            analyze_explorer_styles, primary_style, secondary_style, negatives, creative_direction,
+            co_occurrence_data, expansion,
+        ))
+
+    async def similar(request: Request) -> JSONResponse:
+        body = await _read_json(request)
+        query = _string(body, "query")
+        k = body.get("k", 10)
+        if not isinstance(k, int) or not 1 <= k <= MAX_SIMILAR_STYLES:
+            raise RequestError(f"'k' must be an integer from 1 to {MAX_SIMILAR_STYLES}.")
+        default_styles, co_occurrence_data = state["data"]
+        neighbours = await run_in_threadpool(similar_styles, query, k, default_styles, co_occurrence_data)
+        return JSONResponse({"similar_styles": [{"style": style, "similarity": similarity} for style, similarity in neighbours]})
+
+    async def generate(request: Request):
+        body = await _read_json(request)
+        creative_brief = _string(body, "creative_brief")
+        key = request.headers.get("x-gemini-api-key") or api_key
+        if not key:
+            return JSONResponse({"error": MISSING_KEY_ERROR}, status_code=401)
+        service = gemini_service or get_gemini_service()
+        if not body.get("stream"):
+            prompt = await service.generate_async(creative_brief, key)
+            if prompt.startswith("ERROR:"):
+                return JSONResponse({"error": prompt[len("ERROR:"):].strip()}, status_code=502)
+            return JSONResponse({"prompt": prompt})
+
+        stream = await service.stream_async(creative_brief, key)
+
+        async def chunks():
+            async for chunk in stream:
+                yield chunk
+            # A failure mid-stream can only be reported in-band, after the text sent so far.
+            if stream.result and stream.result.startswith("ERROR:"):
+                yield f"\n{stream.result}"
+
+        return StreamingResponse(chunks(), media_type="text/plain; charset=utf-8")
+
+    async def request_error(request: Request, error: RequestError) -> JSONResponse:
+        return JSONResponse({"error": str(error)}, status_code=400)
+
+    return Starlette(
+        routes=[
+            Route("/health", health, methods=["GET"]),
+            Route("/analyze", analyze, methods=["POST"]),
+            Route("/analyze/batch", analyze_batch, methods=["POST"]),
+            Route("/explore", explore, methods=["POST"]),
+            Route("/similar", similar, methods=["POST"]),
+            Route("/generate", generate, methods=["POST"]),
+        ],
+        exception_handlers={RequestError: request_error},
+        lifespan=lifespan,
+    )
+
+
+# Module-level app for `uvicorn api_server:app`; the data loads in each worker's startup.
+app = create_app()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve prompt analysis and Gemini generation over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, each with its own warm copy of the data.")
+    parser.add_argument("--data", help="Path to suno_logic.json or a snapshot compiled from it (default: SUNO_DATA_PATH).")
+    args = parser.parse_args(argv)
+    if args.data:
+        os.environ["SUNO_DATA_PATH"] = args.data
+    uvicorn.run("api_server:app", host=args.host, port=args.port, workers=args.workers, log_level="warning")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -4,22 +4,28 @@ import streamlit as st
 import streamlit.components.v1 as components
 from pathlib import Path
 import os
+import logging
 from dotenv import load_dotenv
 
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
 # Load environment variables from .env file
 load_dotenv()
 
 # Import our custom modules
-from data_loader import load_suno_data
-from analyzer import prepare_analysis_results, analyze_explorer_styles, orchestrate_gemini_prompt_generation, format_label
-from visualizer import create_ranked_bar_chart, create_association_map
+from streamlit_adapters import load_app_data
+from analyzer import MAX_FUSION_STYLES, calculate_pagerank_fingerprint, prepare_analysis_results, analyze_explorer_styles, analyze_fusion_styles, orchestrate_gemini_prompt_stream, format_label
+from expansion import MAX_DEPTH, ExpansionSettings
+from visualizer import ThresholdSlider, create_ranked_bar_chart, ensure_vis_assets, render_association_map
 
 # --- 1. PAGE CONFIGURATION ---
 st.set_page_config(page_title="Suno Prompt Analyzer", layout="wide", initial_sidebar_state="collapsed")
 
 # --- 2. DATA LOADING ---
 DATA_FILE_PATH = Path(__file__).parent / "data" / "suno_logic.json"
-DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_suno_data(DATA_FILE_PATH)
+DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_app_data(DATA_FILE_PATH)
+ensure_vis_assets()  # vis-network for the association maps, served once from ./static
 
 # --- 3. UI LAYOUT ---
 st.title("🎵 Suno Prompt Analyzer")
@@ -104,35 +110,57 @@ with tab1:
             st.divider()
 
             # --- NEW LAYOUT: TABBED DETAILS ---
-            detail_tab1, detail_tab2, detail_tab3 = st.tabs(["📊 **Stylistic Fingerprint**", "🕸️ **Association Map**", "🤖 **Co-Pilot Suggestions**"])
-            with detail_tab1:
-                st.plotly_chart(create_ranked_bar_chart(
-                    results['fingerprint'], "Top 10 Stylistic Influences", "Normalized Influence Score (log scale)"
-                ), use_container_width=True)
-            
-            with detail_tab2:
-                edge_threshold = st.slider("Connection Strength:", 0.0, 15.0, 7.0, 0.5, key="analyzer_edge_slider")
-                filtered_graph_data = results['graph_data'].copy()
-                filtered_graph_data['edges'] = [edge for edge in filtered_graph_data['edges'] if edge['value'] >= edge_threshold]
-                components.html(create_association_map(filtered_graph_data).generate_html(), height=620, scrolling=True)
+            # Stateful tabs rerun on switch and report `.open`, so only the visible tab's
+            # sections of the lazy analysis results get computed and rendered.
+            detail_tab1, detail_tab2, detail_tab3 = st.tabs(
+                ["📊 **Stylistic Fingerprint**", "🕸️ **Association Map**", "🤖 **Co-Pilot Suggestions**"],
+                key="analyzer_detail_tabs", on_change="rerun",
+            )
+            if detail_tab1.open:
+                with detail_tab1:
+                    ranking = st.radio(
+                        "Ranking", ["Direct influence", "Gravitational pull"], horizontal=True, key="fingerprint_ranking",
+                        help="Gravitational pull ranks styles by a random walk from your keywords (personalised PageRank), so strong multi-step associations count too."
+                    )
+                    if ranking == "Gravitational pull":
+                        st.plotly_chart(create_ranked_bar_chart(
+                            calculate_pagerank_fingerprint(results['recognized_keywords'], results['negative_keywords'], CO_OCCURRENCE_DATA),
+                            "Top 10 Styles by Gravitational Pull", "Share of Random-Walk Visits (%)"
+                        ), use_container_width=True)
+                    else:
+                        st.plotly_chart(create_ranked_bar_chart(
+                            results['fingerprint'], "Top 10 Stylistic Influences", "Normalized Influence Score (log scale)"
+                        ), use_container_width=True)
 
-            with detail_tab3:
-                suggestion = results.get("suggestion")
-                if suggestion:
-                    st.subheader(suggestion['title'])
-                    body = suggestion.get('body', {})
-                    if body.get('intro'): st.write(body['intro'])
-                    if body.get('clusters'):
-                        for i, cluster in enumerate(body['clusters']):
-                            cluster_html = "".join([f"<span class='tag'>{kw}</span>" for kw in cluster])
-                            st.markdown(f"**Cluster {i+1}:** {cluster_html}", unsafe_allow_html=True)
-                    if body.get('strategies'):
-                        for title, points in body['strategies'].items():
-                            st.markdown(f"--- \n**{title}**")
-                            for point in points: st.markdown(f"- {point}")
-                    elif body.get('suggestions'): st.markdown(" ".join(body['suggestions']))
-                else:
-                    st.info("No specific suggestions for this prompt.")
+            if detail_tab2.open:
+                with detail_tab2:
+                    # The strength slider lives in the map page and filters edges in the browser.
+                    map_html = render_association_map(results['graph_data'], 7.0, slider=ThresholdSlider(), precomputed_layout=True)
+                    components.html(map_html, height=660, scrolling=True)
+
+            if detail_tab3.open:
+                with detail_tab3:
+                    suggestion = results.get("suggestion")
+                    if suggestion:
+                        st.subheader(suggestion['title'])
+                        body = suggestion.get('body', {})
+                        if body.get('intro'): st.write(body['intro'])
+                        if body.get('clusters'):
+                            faction_stats = body.get('faction_stats', [])
+                            for i, cluster in enumerate(body['clusters']):
+                                cluster_html = "".join([f"<span class='tag'>{kw}</span>" for kw in cluster])
+                                st.markdown(f"**Cluster {i+1}:** {cluster_html}", unsafe_allow_html=True)
+                                if i < len(faction_stats):
+                                    stats = faction_stats[i]
+                                    st.caption(f"Internal density: {stats['internal_density']:.0%} · "
+                                               f"Shared associations with the other clusters: {stats['cross_affinity']:.0%}")
+                        if body.get('strategies'):
+                            for title, points in body['strategies'].items():
+                                st.markdown(f"--- \n**{title}**")
+                                for point in points: st.markdown(f"- {point}")
+                        elif body.get('suggestions'): st.markdown(" ".join(body['suggestions']))
+                    else:
+                        st.info("No specific suggestions for this prompt.")
 
 with tab2:
     # --- STYLE EXPLORER MODE ---
@@ -163,16 +191,15 @@ with tab2:
         )
         col1_exp, col2_exp = st.columns(2)
         with col1_exp:
-            # Note: A secondary style selector inside a form can be tricky if its options depend on the primary style.
+            # Note: A fusion style selector inside a form can be tricky if its options depend on the primary style.
             # For a better UX, we'll keep the full list and let the analysis handle the case where they are the same.
-            secondary_style_options = [""] + all_styles_sorted
-            secondary_style = st.selectbox(
-                "**Secondary Style (for fusion):**",
-                options=secondary_style_options,
-                index=0,
-                placeholder="Select a style to blend... (Optional)"
+            fusion_styles_input = st.multiselect(
+                "**Fusion Styles (optional):**",
+                options=all_styles_sorted,
+                max_selections=MAX_FUSION_STYLES - 1,
+                placeholder="Select styles to blend... (Optional)",
+                help=f"Fuse the primary style with up to {MAX_FUSION_STYLES - 1} more styles."
             )
-            if secondary_style == "": secondary_style = None
         with col2_exp:
             negative_keywords_explorer_input = st.multiselect(
                 "**Negative Styles (to push away from):**",
@@ -184,6 +211,12 @@ with tab2:
             "**Note:** Negative styles guide the AI prompt generation. They do not filter or change the association analysis shown below.",
             icon="💡"
         )
+        with st.expander("Constellation Settings"):
+            depth_col, fan_out_col, budget_col, weight_col = st.columns(4)
+            expansion_depth = depth_col.slider("Hops", 1, MAX_DEPTH, 2, help="How many association steps the constellation follows from the primary style.")
+            expansion_fan_out = fan_out_col.slider("Links per style (beyond the first hop)", 1, 7, 2)
+            expansion_budget = budget_col.slider("Max styles", 10, 150, 60, step=10, help="The strongest new styles are kept when a hop would exceed this.")
+            expansion_min_weight = weight_col.number_input("Min. association strength", min_value=0, value=0, step=10)
         creative_direction_input = st.text_area(
             "**Additional Creative Direction (Optional):**",
             placeholder="e.g., Use a sitar as a lead instrument, theme of a lone wanderer, heavy use of delay effects...",
@@ -195,15 +228,21 @@ with tab2:
         # When a new style analysis is started, clear any previous generated prompt
         st.session_state.starter_prompt = None
 
-        if primary_style == secondary_style:
+        fusion_styles = [style for style in fusion_styles_input if style != primary_style]
+        if primary_style in fusion_styles_input and not fusion_styles:
             st.info(f"You've selected '{format_label(primary_style)}' for both styles. Showing analysis for a single style.")
-            secondary_style = None
 
         # Run only the local style analysis and store results in session state
         with st.spinner("Analyzing style associations..."):
-            explorer_results = analyze_explorer_styles(
-                primary_style, secondary_style, negative_keywords_explorer_input, creative_direction_input, CO_OCCURRENCE_DATA
-            )
+            if fusion_styles:
+                explorer_results = analyze_fusion_styles(
+                    [primary_style] + fusion_styles, negative_keywords_explorer_input, creative_direction_input, CO_OCCURRENCE_DATA
+                )
+            else:
+                expansion = ExpansionSettings(expansion_depth, (7, expansion_fan_out), float(expansion_min_weight), expansion_budget)
+                explorer_results = analyze_explorer_styles(
+                    primary_style, None, negative_keywords_explorer_input, creative_direction_input, CO_OCCURRENCE_DATA, expansion
+                )
             st.session_state.explorer_results = explorer_results
 
     # Render results if they exist in the session state
@@ -216,17 +255,21 @@ with tab2:
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("##### Top Associated Styles")
-                chart_title = f"Top Associations for '{format_label(primary_style)}'"
-                secondary_style_from_results = explorer_results.get('secondary_style_analyzed')
-                if secondary_style_from_results:
-                    chart_title += f" & '{format_label(secondary_style_from_results)}' Fusion"
+                fused_styles_from_results = explorer_results.get('fusion_styles')
+                if fused_styles_from_results:
+                    fused_labels = " & ".join(f"'{format_label(style)}'" for style in fused_styles_from_results)
+                    chart_title = f"Top Associations for {fused_labels} Fusion"
+                else:
+                    chart_title = f"Top Associations for '{format_label(primary_style)}'"
                 bar_fig = create_ranked_bar_chart(explorer_results['bar_chart_data'], chart_title, "Normalized Association Strength (log scale)")
                 st.plotly_chart(bar_fig, use_container_width=True)
+                if explorer_results.get('similar_styles'):
+                    st.markdown("##### Similar Styles")
+                    st.caption("Styles used in similar company, even where they are not directly associated.")
+                    st.markdown(" · ".join(f"**{format_label(style)}** ({similarity:.2f})" for style, similarity in explorer_results['similar_styles'].items()))
             with col2:
                 st.markdown("##### Association Constellation")
-                explorer_graph = create_association_map(explorer_results['graph_data'])
-                html_content = explorer_graph.generate_html()
-                components.html(html_content, height=620, scrolling=True)
+                components.html(render_association_map(explorer_results['graph_data'], precomputed_layout=True), height=620, scrolling=True)
             st.divider()
 
             st.subheader("Step 2: Creative Brief for Gemini Co-Pilot")
@@ -239,10 +282,17 @@ with tab2:
                     st.warning("Please provide your Gemini API key in the configuration expander to generate a prompt.")
                     st.session_state.starter_prompt = "ERROR: Gemini API key not provided."
                 else:
-                    with st.spinner("🤖 Calling the creative co-pilot..."):
-                        st.session_state.starter_prompt = orchestrate_gemini_prompt_generation(
-                            creative_brief_text, gemini_api_key
-                        )
+                    # Render chunks into Step 3 as they arrive; the placeholder is then
+                    # replaced by the regular Step 3 output below.
+                    live_output = st.empty()
+                    with live_output.container():
+                        st.divider()
+                        st.subheader("Step 3: Your Generated Creative Prompt")
+                        with st.spinner("🤖 Calling the creative co-pilot..."):
+                            prompt_stream = orchestrate_gemini_prompt_stream(creative_brief_text, gemini_api_key)
+                            st.write_stream(prompt_stream)
+                    live_output.empty()
+                    st.session_state.starter_prompt = prompt_stream.result
 
             if st.session_state.starter_prompt:
                 st.divider()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# suno-prompt-analyzer/batch_analyze.py
+
+"""
+Command-line batch analysis of Suno prompts.
+
+Streams prompts from a JSONL or CSV file (or stdin), analyses them across a
+process pool and writes one JSON result per line, in input order. Each worker
+loads the co-occurrence data once; only a bounded window of batches is in
+flight at any time, so memory stays flat regardless of input size.
+
+Input records:
+    JSONL: {"prompt": "...", "negative_keywords": [...], "id": ...} or a bare JSON string.
+           A line that cannot be read gets an error result under its line number.
+    CSV:   a header row with a `prompt` column and optional `negative_keywords`
+           (comma-separated) and `id` columns.
+
+Usage:
+    python batch_analyze.py prompts.jsonl -o results.jsonl --workers 8
+    cat prompts.csv | python batch_analyze.py - --format csv
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple, Union
+
+from analyzer import prepare_analysis_results
+from data_loader import DataLoadError, load_suno_data
+
+DEFAULT_DATA_PATH = Path(__file__).parent / "data" / "suno_logic.json"
+DEFAULT_BATCH_SIZE = 64
+# Batches queued per worker; bounds memory while keeping every worker busy.
+IN_FLIGHT_BATCHES_PER_WORKER = 4
+
+
+class InvalidRecord(NamedTuple):
+    """An input record that could not be read, reported as an error result."""
+    id: Any
+    error: str
+
+
+Record = Union[Tuple[Any, str, List[str]], InvalidRecord]
+
+# Loaded once per worker process by `_init_worker`.
+_WORKER_DATA = None
+
+
+def _init_worker(data_path: str) -> None:
+    global _WORKER_DATA
+    _WORKER_DATA = load_suno_data(data_path)
+
+
+def _split_negatives(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    elif not isinstance(value, list) or not all(isinstance(kw, str) for kw in value):
+        raise ValueError("'negative_keywords' must be a string or a list of strings")
+    return [kw.strip().lower() for kw in value if kw.strip()]
+
+
+def read_jsonl(stream: TextIO) -> Iterator[Record]:
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        record_id = line_number
+        try:
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"prompt": record}
+            if not isinstance(record, dict):
+                raise ValueError("expected a JSON object or string")
+            record_id = record.get("id", line_number)
+            prompt = record.get("prompt", "")
+            if not isinstance(prompt, str):
+                raise ValueError("'prompt' must be a string")
+            negatives = _split_negatives(record.get("negative_keywords"))
+        except ValueError as e:
+            yield InvalidRecord(record_id, f"Invalid record on line {line_number}: {e}")
+            continue
+        yield record_id, prompt, negatives
+
+
+def read_csv(stream: TextIO) -> Iterator[Record]:
+    for row_number, row in enumerate(csv.DictReader(stream), start=1):
+        yield row.get("id") or row_number, row.get("prompt") or "", _split_negatives(row.get("negative_keywords"))
+
+
+def summarise_result(record_id: Any, results: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduces full analysis results to the fields batch consumers need."""
+    if results.get("error"):
+        return {"id": record_id, "keywords": results.get("recognized_keywords", []), "error": results["error"]}
+    return {
+        "id": record_id,
+        "keywords": results["recognized_keywords"],
+        "cohesion": results["cohesion_score"],
+        "fingerprint": results["fingerprint"],
+        "suggestion": results["suggestion"],
+    }
+
+
+def analyse_batch(batch: List[Record]) -> List[str]:
+    """Analyses a batch in the current worker and returns serialised JSONL lines."""
+    default_styles, co_occurrence_data = _WORKER_DATA
+    lines = []
+    for record in batch:
+        if isinstance(record, InvalidRecord):
+            lines.append(json.dumps({"id": record.id, "keywords": [], "error": record.error}))
+            continue
+        record_id, prompt, negatives = record
+        # Batch prompts are seldom repeated, so the shared result cache is bypassed.
+        results = prepare_analysis_results.__wrapped__(prompt, negatives, default_styles, co_occurrence_data)
+        lines.append(json.dumps(summarise_result(record_id, results)))
+    return lines
+
+
+def _batches(records: Iterable[Record], batch_size: int) -> Iterator[List[Record]]:
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def run_batch_analysis(records: Iterable[Record], data_path: str, workers: int, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[str]:
+    """
+    Yields one JSONL result line per record, in input order.
+
+    With `workers` <= 1 everything runs in-process, which is handy for debugging.
+    """
+    if workers <= 1:
+        _init_worker(data_path)
+        for batch in _batches(records, batch_size):
+            yield from analyse_batch(batch)
+        return
+
+    max_in_flight = workers * IN_FLIGHT_BATCHES_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_path,)) as pool:
+        pending = deque()
+        for batch in _batches(records, batch_size):
+            pending.append(pool.submit(analyse_batch, batch))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+@contextlib.contextmanager
+def _open_input(path: str, encoding: str = "utf-8") -> Iterator[TextIO]:
+    if path != "-":
+        with open(path, "r", encoding=encoding, newline="") as stream:
+            yield stream
+        return
+    # Re-read stdin's bytes with our encoding, then detach so closing the wrapper leaves stdin open.
+    stream = io.TextIOWrapper(sys.stdin.buffer, encoding=encoding, newline="")
+    try:
+        yield stream
+    finally:
+        stream.detach()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyse Suno prompts in bulk and stream JSONL results.")
+    parser.add_argument("input", help="Input file (.jsonl or .csv), or '-' for stdin.")
+    parser.add_argument("-o", "--output", default="-", help="Output JSONL file (default: stdout).")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Input format (default: from the file extension, else jsonl).")
+    parser.add_argument("--data", default=str(DEFAULT_DATA_PATH), help="Path to suno_logic.json or a snapshot compiled from it.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 = in-process).")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Prompts sent to a worker at a time.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    input_format = args.format or ("csv" if args.input.lower().endswith(".csv") else "jsonl")
+    reader = read_csv if input_format == "csv" else read_jsonl
+
+    try:
+        load_suno_data(args.data)  # Fail fast in the parent before starting any workers.
+    except DataLoadError as e:
+        logging.error(f"FATAL: {e}")
+        return 1
+
+    started = time.perf_counter()
+    count = 0
+    with _open_input(args.input) as source:
+        output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        try:
+            for line in run_batch_analysis(reader(source), args.data, args.workers, args.batch_size):
+                output.write(line + "\n")
+                count += 1
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+    elapsed = time.perf_counter() - started
+    rate = count / elapsed if elapsed > 0 else 0.0
+    logging.info(f"Analysed {count} prompts in {elapsed:.2f}s ({rate:,.0f} prompts/sec) with {args.workers} worker(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
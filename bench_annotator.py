@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-keyword regex substitution vs. the span-based annotator on
+lyric-sheet prompts of growing length. Run with `python bench_annotator.py`.
+"""
+
+import timeit
+from pathlib import Path
+
+from analyzer import create_annotated_prompt_html, extract_keyword_spans, extract_keywords
+from data_loader import load_suno_data
+from test_annotator import regex_annotated_prompt_html
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+SECTION = (
+    "[Verse]\nA dark cinematic rock anthem with a piano intro and a soaring guitar.\n"
+    "[Chorus]\nEpic rock with pop hooks, jazz piano, funk bass and an orchestral swell.\n"
+)
+
+
+def main():
+    default_styles, co_occurrence_data = load_suno_data(DATA_FILE)
+    print(f"{'sections':>8} | {'chars':>7} | {'regex (ms)':>10} | {'spans (ms)':>10}")
+    for sections in (10, 100, 1_000):
+        prompt = SECTION * sections
+        keywords = extract_keywords(prompt, default_styles)
+        spans = extract_keyword_spans(prompt, default_styles)
+        regex_ms = timeit.timeit(lambda: regex_annotated_prompt_html(prompt, keywords, co_occurrence_data), number=3) / 3 * 1000
+        span_ms = timeit.timeit(lambda: create_annotated_prompt_html(prompt, keywords, co_occurrence_data, spans), number=3) / 3 * 1000
+        print(f"{sections:>8} | {len(prompt):>7} | {regex_ms:>10.2f} | {span_ms:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
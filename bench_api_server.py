@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Load test: requests per second of the HTTP analysis service.
+
+First times cached /analyze calls made straight into the ASGI app, which is
+the service's own cost per core. Then runs two setups against the same
+request mix:
+- in-process: the ASGI app driven through httpx's ASGI transport, no sockets;
+- http: a real uvicorn server in a subprocess, with /generate pointed at a
+  local `FakeGeminiServer`. On a single-core machine the load generator shares
+  the CPU with the server, so these figures understate the server.
+
+Each setup reports /analyze throughput for repeated prompts (result-cache hits)
+and distinct prompts, batch throughput, and streamed /generate time to first
+chunk. Run with `python bench_api_server.py [--concurrency 32] [--requests 5000]`.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from api_server import create_app
+from data_loader import load_suno_data
+from fake_gemini_server import FakeGeminiServer
+from gemini_service import GeminiService
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+HEADERS = {"X-Gemini-Api-Key": "load-test-key"}
+
+
+def make_prompts(count, keywords_per_prompt=(3, 8)):
+    styles = sorted(load_suno_data(DATA_FILE)[0])
+    rng = random.Random(0)
+    return [f"A song with {', '.join(rng.sample(styles, rng.randint(*keywords_per_prompt)))}." for _ in range(count)]
+
+
+async def requests_per_second(client, bodies, concurrency, path="/analyze"):
+    queue = list(reversed(bodies))
+
+    async def worker():
+        while queue:
+            response = await client.post(path, json=queue.pop())
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return len(bodies) / (time.perf_counter() - started)
+
+
+async def first_chunk_ms(client, briefs):
+    samples = []
+    for brief in briefs:
+        started = time.perf_counter()
+        async with client.stream("POST", "/generate", json={"creative_brief": brief, "stream": True}, headers=HEADERS) as response:
+            first = None
+            async for _ in response.aiter_raw():
+                first = first or (time.perf_counter() - started) * 1000
+            samples.append(first)
+    return statistics.median(samples)
+
+
+async def run_mix(client, prompts, args):
+    repeated = [{"prompt": prompts[i % 50], "summary": True} for i in range(args.requests)]
+    distinct = [{"prompt": prompt, "summary": True} for prompt in prompts[50:50 + args.requests // 5]]
+    batches = [{"prompts": prompts[i:i + 100]} for i in range(0, 1000, 100)]
+    await requests_per_second(client, repeated[:200], args.concurrency)  # warm-up
+    hits = await requests_per_second(client, repeated, args.concurrency)
+    misses = await requests_per_second(client, distinct, args.concurrency)
+    batch_prompts = 100 * await requests_per_second(client, batches, 2, path="/analyze/batch")
+    ttfc = await first_chunk_ms(client, [f"load test brief {i}" for i in range(20)])
+    return hits, misses, batch_prompts, ttfc
+
+
+async def direct_asgi_rps(app, body, count=5000):
+    """Cached /analyze calls straight into the ASGI app, with no client or server in the way."""
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+             "path": "/analyze", "raw_path": b"/analyze", "root_path": "", "query_string": b"",
+             "headers": [(b"content-type", b"application/json")], "server": ("service", 80), "client": ("bench", 1)}
+    payload = json.dumps(body).encode()
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        pass
+
+    for _ in range(100):
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(count):
+        await app(dict(scope), receive, send)
+    return count / (time.perf_counter() - started)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def main_async(args):
+    prompts = make_prompts(50 + args.requests // 5 + 1000)
+    with FakeGeminiServer(latency=0.05, stream_chunk_size=8, stream_chunk_delay=0.01) as gemini:
+        service = GeminiService(base_url=gemini.base_url)
+        app = create_app(str(DATA_FILE), gemini_service=service)
+        async with app.router.lifespan_context(app):
+            direct = await direct_asgi_rps(app, {"prompt": prompts[0], "summary": True}, args.requests)
+            print(f"direct ASGI calls, cached /analyze: {direct:,.0f} req/s per core\n")
+            print(f"{'setup':<14}{'cached req/s':>14}{'uncached req/s':>16}{'batch prompts/s':>17}{'stream TTFC ms':>16}")
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://service") as client:
+                print(f"{'in-process':<14}" + "{:>14,.0f}{:>16,.0f}{:>17,.0f}{:>16.1f}".format(*await run_mix(client, prompts, args)))
+        service.close()
+
+        port = free_port()
+        env = dict(os.environ, SUNO_DATA_PATH=str(DATA_FILE), GEMINI_BASE_URL=gemini.base_url, GEMINI_CACHE_PATH=":memory:")
+        server = subprocess.Popen([sys.executable, "-m", "uvicorn", "api_server:app", "--port", str(port), "--log-level", "warning",
+                                   "--workers", str(args.workers)], cwd=Path(__file__).parent, env=env)
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=60,
+                                         limits=httpx.Limits(max_connections=args.concurrency)) as client:
+                for _ in range(300):
+                    try:
+                        if (await client.get("/health")).status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        await asyncio.sleep(0.1)
+                print(f"{'http':<14}" + "{:>14,.0f}{:>16,.0f}{:>17,.0f}{:>16.1f}".format(*await run_mix(client, prompts, args)))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes for the http setup.")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
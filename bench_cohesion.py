@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cohesion latency by prompt size, binary versus weighted mode.
+
+Compares the original pair loop (`itertools.combinations` with two dict probes
+per pair) with the vectorised binary score and the weighted scores
+(`calculate_cohesion_scores`), all on the real dataset. Each timing builds the
+keyword submatrix from scratch. Run with `python bench_cohesion.py`.
+"""
+
+import random
+import statistics
+import time
+from itertools import combinations
+from pathlib import Path
+
+from analyzer import calculate_cohesion, calculate_cohesion_scores
+from data_loader import load_suno_data
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+PROMPTS = 200
+KEYWORD_COUNTS = (10, 25, 50, 100)
+
+
+def pair_loop_cohesion(keywords, co_occurrence_data):
+    """The original implementation: one pair at a time, binary only."""
+    if len(keywords) < 2:
+        return 100.0
+    total_pairs = len(keywords) * (len(keywords) - 1) / 2
+    connected_pairs = sum(
+        1 for kw1, kw2 in combinations(keywords, 2)
+        if co_occurrence_data.get(kw1, {}).get(kw2) or co_occurrence_data.get(kw2, {}).get(kw1)
+    )
+    return (connected_pairs / total_pairs) * 100
+
+
+def median_ms(func, prompts, co_occurrence_data):
+    samples = []
+    for keywords in prompts:
+        started = time.perf_counter()
+        func(keywords, co_occurrence_data)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    default_styles, co_occurrence_data = load_suno_data(DATA_FILE)
+    styles = sorted(default_styles)
+    rng = random.Random(0)
+    print(f"{'keywords':>8}{'pair loop ms':>14}{'binary ms':>12}{'weighted ms':>14}")
+    for count in KEYWORD_COUNTS:
+        prompts = [rng.sample(styles, count) for _ in range(PROMPTS)]
+        calculate_cohesion_scores(prompts[0], co_occurrence_data)
+        loop = median_ms(pair_loop_cohesion, prompts, co_occurrence_data)
+        binary = median_ms(calculate_cohesion, prompts, co_occurrence_data)
+        weighted = median_ms(calculate_cohesion_scores, prompts, co_occurrence_data)
+        print(f"{count:>8}{loop:>14.3f}{binary:>12.3f}{weighted:>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
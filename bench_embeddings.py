@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: style embeddings and similar-style search.
+
+Builds embeddings for the bundled dataset and for synthetic vocabularies of
+10k-50k styles (offline build time, file size), then times `similar_to`
+queries (brute-force cosine scan over float32 vectors) from one and from
+several styles. Run with `python bench_embeddings.py`.
+"""
+
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from cooccurrence import CooccurrenceIndex, get_cooccurrence_index
+from data_loader import load_suno_data
+from embeddings import StyleEmbeddings
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+SYNTHETIC_SIZES = (10_000, 50_000)
+ASSOCIATIONS_PER_STYLE = 20
+QUERIES = 500
+
+
+def synthetic_index(size: int, rng: np.random.Generator) -> CooccurrenceIndex:
+    rows = np.repeat(np.arange(size), ASSOCIATIONS_PER_STYLE)
+    # Styles mostly associate within a loose neighbourhood of ids, so there is structure to embed.
+    cols = (rows + rng.integers(-200, 200, len(rows))) % size
+    weights = sparse.csr_matrix((rng.integers(1, 5000, len(rows)).astype(np.float64), (rows, cols)), shape=(size, size))
+    weights.sum_duplicates()
+    return CooccurrenceIndex([f"style {i}" for i in range(size)], weights)
+
+
+def report(name: str, index: CooccurrenceIndex, rng: random.Random):
+    started = time.perf_counter()
+    embeddings = StyleEmbeddings.from_index(index)
+    build_s = time.perf_counter() - started
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "embeddings.npz"
+        embeddings.save(path)
+        size_kb = path.stat().st_size / 1024
+
+    timings = {1: [], 5: []}
+    for count in timings:
+        for _ in range(QUERIES):
+            styles = rng.sample(embeddings.styles, count)
+            started = time.perf_counter()
+            embeddings.similar_to(styles, 10)
+            timings[count].append((time.perf_counter() - started) * 1000)
+    print(f"{name}: {len(embeddings):,} styles x {embeddings.dimensions}, built in {build_s:6.2f} s, {size_kb:8.0f} KiB | "
+          f"top-10 query: {statistics.median(timings[1]):.3f} ms (1 style), {statistics.median(timings[5]):.3f} ms (5 styles)")
+
+
+def main():
+    rng = random.Random(0)
+    _, co_occurrence_data = load_suno_data(DATA_FILE)
+    report("bundled dataset", get_cooccurrence_index(co_occurrence_data), rng)
+    for size in SYNTHETIC_SIZES:
+        report(f"synthetic {size:,}", synthetic_index(size, np.random.default_rng(size)), rng)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: multi-hop Explorer constellations.
+
+Times `expand_neighbourhood` at depths 1-4 against a breadth-first search that
+sorts each style's association dict (how the depth-2 constellation used to be
+built), on the bundled dataset and on a synthetic 20,000-style vocabulary
+where deep expansions would otherwise explode. Run with `python bench_expansion.py`.
+"""
+
+import random
+import statistics
+import time
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+from cooccurrence import CooccurrenceIndex, get_cooccurrence_index
+from data_loader import load_suno_data
+from expansion import MAX_DEPTH, ExpansionSettings, expand_neighbourhood
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+SYNTHETIC_STYLES = 20_000
+SYNTHETIC_ASSOCIATIONS = 60
+SEEDS = 50
+FAN_OUT = (7, 4)
+MAX_NODES = 120
+
+
+def synthetic_data(rng: np.random.Generator):
+    rows = np.repeat(np.arange(SYNTHETIC_STYLES), SYNTHETIC_ASSOCIATIONS)
+    # Uniform targets rarely revisit a style, the worst case for growth with depth.
+    cols = rng.integers(0, SYNTHETIC_STYLES, len(rows))
+    weights = sparse.csr_matrix((rng.integers(1, 5000, len(rows)).astype(np.float64), (rows, cols)),
+                                shape=(SYNTHETIC_STYLES, SYNTHETIC_STYLES))
+    weights.sum_duplicates()
+    styles = [f"style {i}" for i in range(SYNTHETIC_STYLES)]
+    data = {styles[i]: {styles[j]: float(w) for j, w in zip(weights[i].indices, weights[i].data)} for i in range(SYNTHETIC_STYLES)}
+    return CooccurrenceIndex(styles, weights), data
+
+
+def dict_bfs(seed, data, depth):
+    """Unbounded BFS sorting association dicts per style."""
+    reached, frontier = {seed}, [seed]
+    for level in range(depth):
+        fan_out = FAN_OUT[min(level, len(FAN_OUT) - 1)]
+        next_frontier = []
+        for style in frontier:
+            for target, _ in sorted(data.get(style, {}).items(), key=lambda item: item[1], reverse=True)[:fan_out]:
+                if target not in reached:
+                    reached.add(target)
+                    next_frontier.append(target)
+        frontier = next_frontier
+    return reached
+
+
+def median_ms(func, seeds):
+    timings = []
+    for seed in seeds:
+        started = time.perf_counter()
+        func(seed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def report(name, index, data, seeds):
+    print(f"{name}: {len(index):,} styles (median of {len(seeds)} seeds, fan-out {FAN_OUT}, budget {MAX_NODES})")
+    for depth in range(1, MAX_DEPTH + 1):
+        settings = ExpansionSettings(depth, FAN_OUT, 0.0, MAX_NODES)
+        sizes = [len(expand_neighbourhood(index, index.ids([seed]), settings).node_ids) for seed in seeds]
+        engine = median_ms(lambda seed: expand_neighbourhood(index, index.ids([seed]), settings), seeds)
+        naive_sizes = [len(dict_bfs(seed, data, depth)) for seed in seeds]
+        naive = median_ms(lambda seed: dict_bfs(seed, data, depth), seeds)
+        print(f"  depth {depth}: engine {engine:7.3f} ms, {max(sizes):4d} nodes max | "
+              f"dict BFS {naive:8.3f} ms, {max(naive_sizes):5d} nodes max")
+
+
+def main():
+    _, co_occurrence_data = load_suno_data(DATA_FILE)
+    index = get_cooccurrence_index(co_occurrence_data)
+    rng = random.Random(0)
+    report("bundled dataset", index, co_occurrence_data, rng.sample(sorted(co_occurrence_data), SEEDS))
+
+    synthetic_index, synthetic = synthetic_data(np.random.default_rng(0))
+    report("synthetic vocabulary", synthetic_index, synthetic, rng.sample(synthetic_index.styles, SEEDS))
+
+
+if __name__ == '__main__':
+    main()
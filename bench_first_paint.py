@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark: first-paint time of the analyzer's metrics row.
+
+Times an uncached `prepare_analysis_results` call up to the values the metrics
+row shows (cohesion score and keyword counts) with the lazy `AnalysisResults`,
+against building every section up front as before. Also reports what each
+section costs when its tab is first opened. Run with `python bench_first_paint.py`.
+"""
+
+import random
+import statistics
+import time
+from pathlib import Path
+
+from analyzer import prepare_analysis_results
+from data_loader import load_suno_data
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+PROMPTS = 300
+SECTIONS = ("annotated_html", "fingerprint", "graph_data", "suggestion")
+
+
+def make_prompts(default_styles):
+    rng = random.Random(0)
+    styles = sorted(default_styles)
+    return [f"A track mixing {', '.join(rng.sample(styles, rng.randint(3, 12)))}, with a slow build." for _ in range(PROMPTS)]
+
+
+def first_paint_ms(prompt, default_styles, co_occurrence_data, eager):
+    # __wrapped__ bypasses the result cache, so every call does the work.
+    started = time.perf_counter()
+    results = prepare_analysis_results.__wrapped__(prompt, [], default_styles, co_occurrence_data)
+    if eager:
+        results = results.to_dict()
+    results["cohesion_score"], len(results["recognized_keywords"]), len(results["negative_keywords"])
+    return (time.perf_counter() - started) * 1000, results
+
+
+def main():
+    default_styles, co_occurrence_data = load_suno_data(DATA_FILE)
+    prompts = make_prompts(default_styles)
+    lazy, eager = [], []
+    section_ms = {section: [] for section in SECTIONS}
+    for prompt in prompts:
+        elapsed, _ = first_paint_ms(prompt, default_styles, co_occurrence_data, eager=True)
+        eager.append(elapsed)
+        elapsed, results = first_paint_ms(prompt, default_styles, co_occurrence_data, eager=False)
+        lazy.append(elapsed)
+        for section in SECTIONS:
+            started = time.perf_counter()
+            results[section]
+            section_ms[section].append((time.perf_counter() - started) * 1000)
+
+    print(f"metrics row, all sections built up front: {statistics.median(eager):7.3f} ms (median of {PROMPTS} prompts)")
+    print(f"metrics row, lazy results:                {statistics.median(lazy):7.3f} ms")
+    for section in SECTIONS:
+        print(f"  first access to {section:<16} {statistics.median(section_ms[section]):7.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
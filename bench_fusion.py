@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: N-way style fusion.
+
+For 2 to `MAX_FUSION_STYLES` seeds, times the vectorised `fuse_styles` scoring
+against merging per-seed association dicts in Python (the approach the
+two-style explorer used), and the whole uncached `analyze_fusion_styles` call
+(chart, graph and brief). Run with `python bench_fusion.py`.
+"""
+
+import random
+import statistics
+import time
+from pathlib import Path
+
+from analyzer import MAX_FUSION_STYLES, analyze_fusion_styles
+from cooccurrence import get_cooccurrence_index
+from data_loader import load_suno_data
+from fusion import SYNERGY_BOOST, fuse_styles
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+TRIALS = 200
+
+
+def dict_merge(seeds, co_occurrence_data):
+    combined, shared = {}, {}
+    for seed in seeds:
+        for style, weight in co_occurrence_data.get(seed, {}).items():
+            combined[style] = combined.get(style, 0) + weight
+            shared[style] = shared.get(style, 0) + 1
+    return sorted(((score * (1 + SYNERGY_BOOST * (shared[style] - 1)), style) for style, score in combined.items()), reverse=True)[:15]
+
+
+def median_ms(func, seed_sets):
+    timings = []
+    for seeds in seed_sets:
+        started = time.perf_counter()
+        func(seeds)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    _, co_occurrence_data = load_suno_data(DATA_FILE)
+    index = get_cooccurrence_index(co_occurrence_data)
+    # Seeds are drawn from the most connected styles, the worst case for a dict merge.
+    busiest = sorted(co_occurrence_data, key=lambda style: len(co_occurrence_data[style]), reverse=True)[:200]
+    rng = random.Random(0)
+    print(f"{'seeds':>5} {'fuse_styles':>12} {'dict merge':>11} {'full analysis':>14}   (median ms of {TRIALS})")
+    for count in range(2, MAX_FUSION_STYLES + 1):
+        seed_sets = [rng.sample(busiest, count) for _ in range(TRIALS)]
+        vectorised = median_ms(lambda seeds: index.top_entries(fuse_styles(index, index.ids(seeds)).combined, 15), seed_sets)
+        merged = median_ms(lambda seeds: dict_merge(seeds, co_occurrence_data), seed_sets)
+        # __wrapped__ bypasses the result cache, so every call does the work.
+        full = median_ms(lambda seeds: analyze_fusion_styles.__wrapped__(seeds, [], "", co_occurrence_data), seed_sets)
+        print(f"{count:>5} {vectorised:>12.3f} {merged:>11.3f} {full:>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark: server-side association-map layouts.
+
+Times `graph_layout` on the analyzer's real graphs and on synthetic sparse
+graphs of growing size, uncached, plus a cached lookup. The browser
+alternative is a 1000-iteration Barnes-Hut stabilisation on every page load.
+Run with `python bench_graph_layout.py`.
+"""
+
+import random
+import statistics
+import time
+from pathlib import Path
+
+from analyzer import prepare_analysis_results
+from data_loader import load_suno_data
+from graph_layout import DEFAULT_ITERATIONS, _layout, compute_layout
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+PROMPTS = 30
+SYNTHETIC_SIZES = (50, 100, 200, 400)
+
+
+def make_graph(size: int, rng: random.Random):
+    nodes = [{"id": str(i)} for i in range(size)]
+    edges = [{"from": str(i), "to": str(rng.randrange(size)), "value": rng.uniform(1, 15)} for i in range(size) for _ in range(3)]
+    return {"nodes": nodes, "edges": edges}
+
+
+def time_ms(func, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    default_styles, co_occurrence_data = load_suno_data(DATA_FILE)
+    rng = random.Random(0)
+    styles = sorted(default_styles)
+    graphs = []
+    for _ in range(PROMPTS):
+        prompt = f"A track mixing {', '.join(rng.sample(styles, rng.randint(3, 12)))}."
+        results = prepare_analysis_results(prompt, [], default_styles, co_occurrence_data)
+        if "error" not in results:
+            graphs.append(results['graph_data'])
+    sizes = [len(graph['nodes']) for graph in graphs]
+    layout_ms = [time_ms(lambda graph=graph: _layout(graph, DEFAULT_ITERATIONS), repeat=1) for graph in graphs]
+    print(f"analyzer graphs ({min(sizes)}-{max(sizes)} nodes): {statistics.median(layout_ms):8.2f} ms median, "
+          f"{max(layout_ms):8.2f} ms max")
+
+    for size in SYNTHETIC_SIZES:
+        graph = make_graph(size, rng)
+        print(f"synthetic {size:4d} nodes:              {time_ms(lambda: _layout(graph, DEFAULT_ITERATIONS)):8.2f} ms")
+
+    compute_layout(graphs[0])
+    print(f"cached lookup:                       {time_ms(lambda: compute_layout(graphs[0]), repeat=100):8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
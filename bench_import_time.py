@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Import-time regression benchmark for the analysis core.
+
+Times, in fresh interpreters, (1) `import analyzer` and (2) importing the core,
+loading the data and scoring one prompt, then checks that the Streamlit, networkx
+and google-genai backends stay out of the core import. Exits non-zero when the
+median of (2) exceeds the budget. Run with `python bench_import_time.py [budget_ms]`.
+"""
+
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+RUNS = 5
+DEFAULT_BUDGET_MS = 800
+HEAVY_BACKENDS = ("streamlit", "networkx", "google.genai")
+
+IMPORT_ONLY = "import time; t = time.perf_counter(); import analyzer; print((time.perf_counter() - t) * 1000)"
+IMPORT_AND_SCORE = (
+    "import time; t = time.perf_counter()\n"
+    "from analyzer import prepare_analysis_results\n"
+    "from data_loader import load_suno_data\n"
+    "styles, data = load_suno_data('data/suno_logic.json')\n"
+    "prepare_analysis_results('Dark cinematic rock with jazz piano and male vocals.', [], styles, data)\n"
+    "print((time.perf_counter() - t) * 1000)"
+)
+LOADED_BACKENDS = f"import sys, analyzer, data_loader; print(','.join(m for m in {HEAVY_BACKENDS!r} if m in sys.modules))"
+
+
+def run_python(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True).stdout.strip()
+
+
+def median_ms(code: str) -> float:
+    return statistics.median(float(run_python(code)) for _ in range(RUNS))
+
+
+def main():
+    budget_ms = float(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_BUDGET_MS
+    import_ms = median_ms(IMPORT_ONLY)
+    score_ms = median_ms(IMPORT_AND_SCORE)
+    leaked = run_python(LOADED_BACKENDS)
+
+    print(f"import analyzer:                {import_ms:8.1f} ms")
+    print(f"import + load + score 1 prompt: {score_ms:8.1f} ms (budget {budget_ms:.0f} ms)")
+    print(f"heavy backends imported by core: {leaked or 'none'}")
+
+    if leaked or score_ms > budget_ms:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
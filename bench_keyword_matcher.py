@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-style regex scan vs. the single-pass keyword matcher.
+
+Vocabularies of 100, 1k and 10k styles are built from the real style list
+padded with synthetic multi-word styles. The variant-aware matcher (aliases,
+spelling variants and typos compiled in) is timed alongside the exact one to
+show that recognising variants costs build time, not scan time.
+Run with `python bench_keyword_matcher.py`.
+"""
+
+import json
+import random
+import re
+import timeit
+from pathlib import Path
+
+from keyword_matcher import KeywordMatcher
+from style_variants import variant_index
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+PROMPT = (
+    "A powerful acoustic folk ballad in a minor key with a deeply reflective and intimate feel. "
+    "The primary instrumentation is a clean fingerpicked acoustic guitar with a mournful cello, "
+    "a subtle atmospheric string section, electric guitar swells and male vocals over a sparse piano. "
+    "Professional mastering with a natural reverb and a clean mix, epic and cinematic."
+)
+
+
+def regex_extract_keywords(prompt_text, valid_styles_set):
+    """The original implementation: one regex search per style."""
+    lower_prompt = prompt_text.lower()
+    found_keywords = set()
+    for style in valid_styles_set:
+        if re.search(r'\b' + re.escape(style) + r'\b', lower_prompt):
+            found_keywords.add(style)
+    return sorted(found_keywords)
+
+
+def build_vocabulary(size, base_styles):
+    rng = random.Random(size)
+    vocabulary = set(base_styles[:size])
+    syllables = ["ka", "lo", "mi", "ver", "tro", "nix", "da", "sol", "phon", "ra"]
+    while len(vocabulary) < size:
+        words = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 3))) for _ in range(rng.randint(1, 3))]
+        vocabulary.add(" ".join(words))
+    return vocabulary
+
+
+def main():
+    base_styles = json.loads(DATA_FILE.read_text(encoding='utf-8'))['default_styles']
+    print(f"{'styles':>8} | {'regex (ms)':>10} | {'matcher (ms)':>12} | {'build (ms)':>10} | {'speedup':>8} | "
+          f"{'patterns':>9} | {'variants (ms)':>13} | {'build (ms)':>10}")
+    for size in (100, 1_000, 10_000):
+        vocabulary = build_vocabulary(size, base_styles)
+        build_seconds = timeit.timeit(lambda: KeywordMatcher(vocabulary), number=1)
+        matcher = KeywordMatcher(vocabulary)
+        assert matcher.extract(PROMPT) == regex_extract_keywords(PROMPT, vocabulary)
+
+        regex_runs = max(1, 2_000 // size)
+        regex_ms = timeit.timeit(lambda: regex_extract_keywords(PROMPT, vocabulary), number=regex_runs) / regex_runs * 1000
+        matcher_ms = timeit.timeit(lambda: matcher.extract(PROMPT), number=200) / 200 * 1000
+
+        variant_build_seconds = timeit.timeit(lambda: KeywordMatcher(vocabulary, variant_index(vocabulary)), number=1)
+        variant_matcher = KeywordMatcher(vocabulary, variant_index(vocabulary))
+        variant_ms = timeit.timeit(lambda: variant_matcher.extract(PROMPT), number=200) / 200 * 1000
+        print(f"{len(vocabulary):>8} | {regex_ms:>10.3f} | {matcher_ms:>12.3f} | {build_seconds * 1000:>10.1f} | {regex_ms / matcher_ms:>7.1f}x | "
+              f"{variant_matcher.pattern_count:>9,} | {variant_ms:>13.3f} | {variant_build_seconds * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
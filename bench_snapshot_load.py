@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark: loading suno_logic.json vs. its memory-mapped binary snapshot.
+
+Builds a synthetic dataset (default: 50k styles, 2M pairs), writes it as JSON
+and as a snapshot, then times `load_suno_data` on each in fresh interpreters and
+reports peak RSS (Linux only). Run with `python bench_snapshot_load.py [styles] [pairs]`.
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from snapshot import write_snapshot
+
+ROOT = Path(__file__).parent
+RUNS = 3
+
+# Peak RSS comes from VmHWM (Linux), which unlike ru_maxrss is not inherited from the parent across fork/exec.
+LOAD = (
+    "import re, sys, time; t = time.perf_counter()\n"
+    "from data_loader import load_suno_data\n"
+    "load_suno_data(sys.argv[1])\n"
+    "elapsed = (time.perf_counter() - t) * 1000\n"
+    "peak_kb = int(re.search(r'VmHWM:\\s+(\\d+)', open('/proc/self/status').read()).group(1))\n"
+    "print(elapsed, peak_kb / 1024)"
+)
+
+
+def build_dataset(num_styles, num_pairs):
+    rng = np.random.default_rng(0)
+    styles = [f"style {i:06d}" for i in range(num_styles)]
+    # Zipf-like popularity, so a few styles carry most associations as in scraped data.
+    popularity = 1.0 / np.arange(1, num_styles + 1) ** 0.8
+    popularity /= popularity.sum()
+    rows = rng.integers(0, num_styles, num_pairs)
+    cols = rng.choice(num_styles, num_pairs, p=popularity)
+    weights = rng.integers(1, 100_000, num_pairs)
+    co_occurrence = {}
+    for row, col, weight in zip(rows.tolist(), cols.tolist(), weights.tolist()):
+        if row != col:
+            co_occurrence.setdefault(styles[row], {})[styles[col]] = weight
+    return set(styles), co_occurrence
+
+
+def measure(path):
+    samples = [subprocess.run([sys.executable, "-c", LOAD, str(path)], cwd=ROOT, check=True, capture_output=True, text=True).stdout.split()
+               for _ in range(RUNS)]
+    return statistics.median(float(ms) for ms, _ in samples), statistics.median(float(mb) for _, mb in samples)
+
+
+def main():
+    num_styles = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    num_pairs = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000_000
+    default_styles, co_occurrence = build_dataset(num_styles, num_pairs)
+    nnz = sum(len(row) for row in co_occurrence.values())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path, snapshot_path = Path(tmp) / "suno_logic.json", Path(tmp) / "suno_logic.snap"
+        json_path.write_text(json.dumps({"default_styles": sorted(default_styles), "co_existing_styles_dict": co_occurrence}))
+        write_snapshot(snapshot_path, default_styles, co_occurrence)
+
+        print(f"{num_styles:,} styles, {nnz:,} pairs")
+        print(f"{'format':<10}{'size MB':>10}{'load ms':>12}{'peak RSS MB':>14}")
+        for name, path in (("json", json_path), ("snapshot", snapshot_path)):
+            load_ms, rss_mb = measure(path)
+            print(f"{name:<10}{path.stat().st_size / 2**20:>10.1f}{load_ms:>12.1f}{rss_mb:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: low-cohesion suggestion latency for prompts with 20+ keywords.
+
+Compares the previous per-request computation (faction affinity vectors from
+sparse matrix-vector products, reinforcements from the full affinity dict) with
+`generate_suggestions` on the precomputed `BridgeIndex`, on the real dataset and
+on a synthetic 5k-style one. Run with `python bench_suggestions.py`.
+"""
+
+import random
+import statistics
+import time
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+
+from analyzer import calculate_cohesion, calculate_influence_scores, generate_suggestions
+from bridges import BridgeIndex
+from cooccurrence import get_cooccurrence_index
+from data_loader import load_suno_data
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+PROMPTS = 200
+KEYWORDS_PER_PROMPT = (20, 40)
+
+
+def previous_suggestions(cohesion_score, recognized_keywords, sorted_influences, co_occurrence_data):
+    """The per-request implementation the bridge index replaces."""
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_nodes_from(recognized_keywords)
+    for kw1, kw2 in combinations(recognized_keywords, 2):
+        if co_occurrence_data.get(kw1, {}).get(kw2): G.add_edge(kw1, kw2)
+    factions = sorted(list(nx.connected_components(G)), key=len, reverse=True)
+    if len(factions) < 2:
+        return None
+    faction_a, faction_b = factions[0], factions[1]
+    index = get_cooccurrence_index(co_occurrence_data)
+    affinity_a = index.influence(index.ids(faction_a))
+    affinity_b = index.influence(index.ids(faction_b))
+    candidate_ids = index.ids(style for style, score in sorted_influences[:50])
+    bridge_vector = np.zeros(len(index))
+    bridge_vector[candidate_ids] = affinity_a[candidate_ids] * affinity_b[candidate_ids]
+    top_bridges = index.top_entries(bridge_vector, 3)
+    replacement_suggestions = sorted(set(index.to_style_dict(affinity_a)) - set(recognized_keywords))[:3]
+    return top_bridges, replacement_suggestions
+
+
+def synthetic_dataset(num_styles=5000, associations_per_style=60):
+    rng = np.random.default_rng(0)
+    styles = [f"style {i:05d}" for i in range(num_styles)]
+    popularity = 1.0 / np.arange(1, num_styles + 1) ** 0.7
+    popularity /= popularity.sum()
+    data = {}
+    for i, style in enumerate(styles):
+        targets = rng.choice(num_styles, associations_per_style, replace=False, p=popularity)
+        data[style] = {styles[t]: int(w) for t, w in zip(targets, rng.integers(1, 10**6, len(targets))) if t != i}
+    return set(styles), data
+
+
+def low_cohesion_cases(default_styles, co_occurrence_data):
+    rng = random.Random(0)
+    styles = sorted(default_styles)
+    cases = []
+    while len(cases) < PROMPTS:
+        keywords = sorted(rng.sample(styles, rng.randint(*KEYWORDS_PER_PROMPT)))
+        cohesion = calculate_cohesion(keywords, co_occurrence_data)
+        if cohesion < 40:
+            influences = sorted(calculate_influence_scores(keywords, co_occurrence_data).items(), key=lambda x: x[1], reverse=True)
+            cases.append((cohesion, keywords, influences))
+    return cases
+
+
+def median_ms(func, cases, co_occurrence_data):
+    samples = []
+    for cohesion, keywords, influences in cases:
+        started = time.perf_counter()
+        func(cohesion, keywords, influences, co_occurrence_data)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    datasets = [("suno_logic.json", load_suno_data(DATA_FILE)), ("synthetic 5k styles", synthetic_dataset())]
+    print(f"{'dataset':<22}{'index build ms':>16}{'previous ms':>14}{'bridge index ms':>17}")
+    for name, (default_styles, co_occurrence_data) in datasets:
+        index = get_cooccurrence_index(co_occurrence_data)
+        started = time.perf_counter()
+        BridgeIndex.from_index(index)
+        build_ms = (time.perf_counter() - started) * 1000
+        cases = low_cohesion_cases(default_styles, co_occurrence_data)
+        previous = median_ms(previous_suggestions, cases, co_occurrence_data)
+        current = median_ms(generate_suggestions, cases, co_occurrence_data)
+        print(f"{name:<22}{build_ms:>16.1f}{previous:>14.3f}{current:>17.3f}")
+
+
+if __name__ == '__main__':
+    main()
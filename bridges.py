@@ -0,0 +1,191 @@
+# suno-prompt-analyzer/bridges.py
+
+"""
+Precomputed bridge candidates for the low-cohesion suggestion engine.
+
+A style `c` bridges two styles `x` and `y` when both associate with it; its
+strength for that pair is `weight(x, c) * weight(y, c)`. The `BridgeIndex`
+stores, for every pair of styles with shared neighbours, its strongest linking
+styles, built once per dataset from the transposed co-occurrence matrix. The
+bridge score of a style between two factions is the sum of its strengths over
+all cross-faction pairs, which equals the product of its affinities to the two
+factions, so a request only gathers the stored links of its keyword pairs and
+sums them.
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from cooccurrence import CooccurrenceIndex, get_cooccurrence_index
+from derived_cache import get_derived
+
+# Strongest linking styles stored per pair of styles.
+DEFAULT_LINKS_PER_PAIR = 16
+# Upper bound on candidate links generated while building. Datasets within it
+# are indexed exactly; larger ones only pair up each linking style's strongest
+# incoming associations, with the cap chosen to fit the budget.
+DEFAULT_MAX_CANDIDATE_LINKS = 5_000_000
+# Datasets with at most this many stored associations score bridges directly:
+# two sparse matrix-vector products then cost less than gathering pair links.
+DIRECT_SCORING_MAX_ENTRIES = 10_000
+
+
+class BridgeIndex:
+    """
+    Best linking styles for every pair of styles, in CSR form keyed by pair.
+
+    Attributes:
+        pair_codes: Sorted `low id * styles + high id` code of each stored pair.
+        offsets: `pair_codes[i]`'s links are `link_ids[offsets[i]:offsets[i + 1]]`.
+        link_ids: Linking style ids of each pair (its `links_per_pair` strongest).
+        link_scores: `weight(x, c) * weight(y, c)` for each stored link.
+        fan_in: Incoming associations paired up per linking style, or None if uncapped.
+    """
+
+    def __init__(self, num_styles: int, pair_codes: np.ndarray, offsets: np.ndarray, link_ids: np.ndarray,
+                 link_scores: np.ndarray, fan_in: Optional[int] = None):
+        self.num_styles = num_styles
+        self.pair_codes = pair_codes
+        self.offsets = offsets
+        self.link_ids = link_ids
+        self.link_scores = link_scores
+        self.fan_in = fan_in
+
+    @classmethod
+    def from_index(cls, index: CooccurrenceIndex, links_per_pair: int = DEFAULT_LINKS_PER_PAIR,
+                   max_candidate_links: int = DEFAULT_MAX_CANDIDATE_LINKS) -> "BridgeIndex":
+        """Builds the index from the transposed co-occurrence matrix of a `CooccurrenceIndex`."""
+        num_styles = len(index)
+        fan_in = _fan_in_for_budget(np.diff(index.weights_t.indptr), max_candidate_links)
+        codes, links, scores = _candidate_links(index, fan_in)
+
+        # Group the links by pair; only pairs with more than `links_per_pair`
+        # links need ranking, and those keep their strongest (ties: lowest style id).
+        order = np.argsort(codes)
+        codes, links, scores = codes[order], links[order], scores[order]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.empty(0, dtype=np.int64)
+        sizes = np.diff(np.r_[starts, len(codes)])
+        keep = np.ones(len(codes), dtype=bool)
+        if len(sizes) and sizes.max() > links_per_pair:
+            group = np.repeat(np.arange(len(starts)), sizes)
+            crowded = np.flatnonzero(sizes[group] > links_per_pair)
+            ranked = crowded[np.lexsort((links[crowded], -scores[crowded], group[crowded]))]
+            first = np.flatnonzero(np.r_[True, group[ranked][1:] != group[ranked][:-1]])
+            rank = np.arange(len(ranked)) - np.repeat(first, np.diff(np.r_[first, len(ranked)]))
+            keep[ranked[rank >= links_per_pair]] = False
+
+        offsets = np.r_[0, np.cumsum(np.minimum(sizes, links_per_pair))].astype(np.int64)
+        return cls(num_styles, codes[starts], offsets, links[keep], scores[keep], fan_in)
+
+    def __len__(self) -> int:
+        return len(self.pair_codes)
+
+    def bridge_scores(self, faction_a: Sequence[int], faction_b: Sequence[int]) -> np.ndarray:
+        """
+        Dense vector of each style's bridge score between two factions (style ids).
+
+        Sums the stored links of every cross-faction pair; with untruncated links
+        this is `affinity(faction_a, c) * affinity(faction_b, c)` for every style `c`.
+        """
+        faction_a = np.asarray(faction_a, dtype=np.int64)
+        faction_b = np.asarray(faction_b, dtype=np.int64)
+        a, b = np.repeat(faction_a, len(faction_b)), np.tile(faction_b, len(faction_a))
+        distinct = a != b
+        a, b = a[distinct], b[distinct]
+        codes = np.minimum(a, b) * self.num_styles + np.maximum(a, b)
+
+        if not len(self.pair_codes):
+            return np.zeros(self.num_styles)
+        positions = np.minimum(np.searchsorted(self.pair_codes, codes), len(self.pair_codes) - 1)
+        positions = positions[self.pair_codes[positions] == codes]
+        starts = self.offsets[positions]
+        lengths = self.offsets[positions + 1] - starts
+        # Concatenated `range(start, start + length)` for every matched pair.
+        entries = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+        return np.bincount(self.link_ids[entries], weights=self.link_scores[entries], minlength=self.num_styles)
+
+
+def _candidate_links(index: CooccurrenceIndex, fan_in: Optional[int]):
+    """
+    Every `(pair code, linking style, strength)` triple. Linking styles with the
+    same number of incoming associations are paired up together, as one
+    `(styles, degree)` block, so the work is vectorised per distinct degree.
+    """
+    incoming = index.weights_t
+    sources, weights, indptr = incoming.indices, incoming.data, incoming.indptr
+    degrees = np.diff(indptr)
+    if fan_in is not None and degrees.max(initial=0) > fan_in:
+        # Keep each linking style's `fan_in` strongest incoming associations (ties: lowest position).
+        rows = np.repeat(np.arange(len(degrees)), degrees)
+        order = np.lexsort((np.arange(len(rows)), -weights, rows))
+        rank = np.arange(len(order)) - np.repeat(indptr[:-1], degrees)
+        kept = np.sort(order[rank < fan_in])
+        sources, weights = sources[kept], weights[kept]
+        degrees = np.minimum(degrees, fan_in)
+        indptr = np.r_[0, np.cumsum(degrees)]
+
+    codes, links, scores = [], [], []
+    for degree in np.unique(degrees[degrees >= 2]).tolist():
+        linking = np.flatnonzero(degrees == degree)
+        block = indptr[linking][:, None] + np.arange(degree)
+        # Rows of the sorted CSR matrix list their sources in ascending order, so
+        # every pair `(first, second)` of a row is already `(low, high)`.
+        block_sources, block_weights = sources[block].astype(np.int64), weights[block]
+        first, second = np.triu_indices(degree, 1)
+        pair_codes = block_sources[:, first]
+        pair_codes *= len(index)
+        pair_codes += block_sources[:, second]
+        codes.append(pair_codes.ravel())
+        links.append(np.repeat(linking.astype(np.int32), len(first)))
+        scores.append((block_weights[:, first] * block_weights[:, second]).ravel())
+    if not codes:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+    return np.concatenate(codes), np.concatenate(links), np.concatenate(scores)
+
+
+def _fan_in_for_budget(in_degrees: np.ndarray, max_candidate_links: int) -> Optional[int]:
+    """The largest per-style fan-in keeping the candidate links within budget, or None if no cap is needed."""
+    def links(cap: Optional[int]) -> int:
+        degrees = in_degrees if cap is None else np.minimum(in_degrees, cap)
+        return int((degrees.astype(np.int64) * (degrees - 1) // 2).sum())
+
+    if links(None) <= max_candidate_links:
+        return None
+    low, high = 2, int(in_degrees.max())
+    while low < high:
+        middle = (low + high + 1) // 2
+        if links(middle) <= max_candidate_links:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def faction_bridge_scores(co_occurrence_data: Dict, faction_a: Sequence[int], faction_b: Sequence[int]) -> np.ndarray:
+    """
+    Dense vector of each style's bridge score between two factions (style ids),
+    computed directly as the product of the factions' affinities on small
+    datasets, and from the bridge index otherwise.
+    """
+    index = get_cooccurrence_index(co_occurrence_data)
+    if index.weights.nnz <= DIRECT_SCORING_MAX_ENTRIES:
+        return index.influence(faction_a) * index.influence(faction_b)
+    return get_bridge_index(co_occurrence_data).bridge_scores(faction_a, faction_b)
+
+
+def get_bridge_index(co_occurrence_data: Dict) -> BridgeIndex:
+    """
+    Returns the bridge index for a loaded dataset, building it on first use
+    (the first low-cohesion suggestion), not at load time.
+
+    Snapshot-backed data (see `snapshot.py`) already carries its index, which is
+    returned as-is.
+    """
+    def build() -> BridgeIndex:
+        prebuilt = getattr(co_occurrence_data, "bridge_index", None)
+        if isinstance(prebuilt, BridgeIndex):
+            return prebuilt
+        return BridgeIndex.from_index(get_cooccurrence_index(co_occurrence_data))
+
+    return get_derived(co_occurrence_data, "bridge_index", build)
@@ -0,0 +1,243 @@
+# suno-prompt-analyzer/cooccurrence.py
+
+"""
+Compiled, matrix-backed view of the style co-occurrence data.
+
+`co_existing_styles_dict` maps each style to `{associated style: weight}`. The
+`CooccurrenceIndex` interns every style to an integer id and stores the weights
+as a CSR sparse matrix (row = style, column = associated style), together with
+its transpose and the log10 weights used for display. The analyses in
+`analyzer.py` then become matrix-vector products and submatrix lookups instead
+of repeated nested dict walks.
+"""
+
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from derived_cache import get_derived
+
+# Number of strongest associations precomputed per style. Call sites ask for at
+# most 15, so the default leaves headroom without storing every row in sorted form.
+DEFAULT_TOP_K = 32
+
+
+class CooccurrenceIndex:
+    """
+    Interned style table plus CSR weight matrices for one loaded dataset.
+
+    Attributes:
+        styles: Style string for each id.
+        style_ids: Reverse lookup from style string to id.
+        weights: CSR matrix of raw weights; row `a`, column `b` holds `data[a][b]`.
+        weights_t: CSR transpose of `weights` (incoming associations per style).
+        log_weights: CSR matrix holding `log10(weight + 1)` for every stored pair (lazy).
+        top_k_ids: `(styles, K)` array of each style's strongest associations, padded with -1.
+        top_k_weights: Weights matching `top_k_ids`, padded with 0.
+    """
+
+    def __init__(self, styles: Sequence[str], weights: sparse.csr_matrix, top_k: int = DEFAULT_TOP_K,
+                 weights_t: Optional[sparse.csr_matrix] = None,
+                 top_k_arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None):
+        """
+        `weights_t` and `top_k_arrays` may be passed in precomputed (as a loaded
+        snapshot does); they are then used as-is instead of being derived from
+        `weights`, so read-only memory-mapped arrays are never copied.
+        """
+        self.styles: List[str] = list(styles)
+        self.style_ids: Dict[str, int] = {style: i for i, style in enumerate(self.styles)}
+        self.weights = _sorted_csr(weights)
+        self.weights_t = _sorted_csr(weights_t if weights_t is not None else self.weights.T)
+        if top_k_arrays is not None:
+            self.top_k_size = top_k_arrays[0].shape[1]
+            self.top_k_ids, self.top_k_weights = top_k_arrays
+        else:
+            self.top_k_size = top_k
+            self.top_k_ids, self.top_k_weights = self._build_top_k(top_k)
+
+    @cached_property
+    def log_weights(self) -> sparse.csr_matrix:
+        """CSR matrix holding `log10(weight + 1)` for every stored pair, built on first use."""
+        log_weights = self.weights.copy()
+        log_weights.data = np.log10(log_weights.data + 1.0)
+        return log_weights
+
+    @cached_property
+    def max_weight(self) -> float:
+        """Largest stored weight, 0.0 for an empty index."""
+        return float(self.weights.data.max()) if self.weights.nnz else 0.0
+
+    @classmethod
+    def from_dict(cls, co_occurrence_data: Dict[str, Dict[str, float]], top_k: int = DEFAULT_TOP_K) -> "CooccurrenceIndex":
+        """Builds the index from the nested `co_existing_styles_dict` structure."""
+        styles = sorted(set(co_occurrence_data) | {assoc for assocs in co_occurrence_data.values() for assoc in assocs})
+        style_ids = {style: i for i, style in enumerate(styles)}
+
+        indptr = np.zeros(len(styles) + 1, dtype=np.int64)
+        rows = [co_occurrence_data.get(style, {}) for style in styles]
+        indptr[1:] = np.cumsum([len(assocs) for assocs in rows])
+        indices = np.fromiter((style_ids[assoc] for assocs in rows for assoc in assocs), dtype=np.int32, count=indptr[-1])
+        data = np.fromiter((weight for assocs in rows for weight in assocs.values()), dtype=np.float64, count=indptr[-1])
+
+        weights = sparse.csr_matrix((data, indices, indptr), shape=(len(styles), len(styles)))
+        return cls(styles, weights, top_k=top_k)
+
+    def _build_top_k(self, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorts every row once (weight descending, then style id) and keeps its first `k` entries."""
+        row_lengths = np.diff(self.weights.indptr)
+        row_of_entry = np.repeat(np.arange(len(self.styles)), row_lengths)
+        order = np.lexsort((self.weights.indices, -self.weights.data, row_of_entry))
+        rank = np.arange(len(order)) - self.weights.indptr[row_of_entry[order]]
+        keep = order[rank < k]
+
+        top_ids = np.full((len(self.styles), k), -1, dtype=np.int32)
+        top_weights = np.zeros((len(self.styles), k), dtype=np.float64)
+        rows, slots = row_of_entry[keep], rank[rank < k]
+        top_ids[rows, slots] = self.weights.indices[keep]
+        top_weights[rows, slots] = self.weights.data[keep]
+        return top_ids, top_weights
+
+    def __len__(self) -> int:
+        return len(self.styles)
+
+    def __contains__(self, style: str) -> bool:
+        return style in self.style_ids
+
+    def ids(self, styles: Iterable[str]) -> np.ndarray:
+        """Maps styles to ids, silently skipping styles the dataset does not know."""
+        style_ids = self.style_ids
+        return np.array([style_ids[s] for s in styles if s in style_ids], dtype=np.int64)
+
+    def influence(self, keyword_ids: Sequence[int]) -> np.ndarray:
+        """
+        Summed outgoing weights of the given styles, as a dense vector over all styles.
+
+        Computed as one sparse matrix-vector product with the transpose.
+        """
+        selector = np.bincount(np.asarray(keyword_ids, dtype=np.int64), minlength=len(self.styles)).astype(np.float64)
+        return self.weights_t @ selector
+
+    def row_entries(self, keyword_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every stored entry in the given styles' rows as `(row, column id, weight)`
+        arrays, where `row` is the position in `keyword_ids`. Gathered straight
+        from the CSR arrays, so the cost depends only on the rows' lengths.
+        """
+        keyword_ids = np.asarray(keyword_ids, dtype=np.int64)
+        indptr = self.weights.indptr
+        starts, lengths = indptr[keyword_ids], indptr[keyword_ids + 1] - indptr[keyword_ids]
+        # Position of each gathered entry: its row's start plus its offset within the row.
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        rows = np.repeat(np.arange(len(keyword_ids)), lengths)
+        return rows, self.weights.indices[positions], self.weights.data[positions]
+
+    def successors(self, keyword_ids: Sequence[int]) -> np.ndarray:
+        """Sorted ids of every style at least one of the given styles associates with."""
+        indptr, indices = self.weights.indptr, self.weights.indices
+        return np.unique(np.concatenate([indices[indptr[i]:indptr[i + 1]] for i in keyword_ids] or [np.empty(0, dtype=indices.dtype)]))
+
+    def link_weights(self, keyword_ids: Sequence[int]) -> np.ndarray:
+        """
+        Dense symmetric `(k, k)` matrix of the weights between the given styles,
+        summed over both directions, with a zero diagonal.
+
+        This is the keyword-pair adjacency shared by cohesion and faction detection.
+        """
+        keyword_ids = np.asarray(keyword_ids, dtype=np.int64)
+        submatrix = self.weights[keyword_ids][:, keyword_ids].toarray()
+        links = submatrix + submatrix.T
+        np.fill_diagonal(links, 0.0)
+        return links
+
+    def cohesion(self, keyword_ids: Sequence[int], keyword_count: Optional[int] = None) -> float:
+        """
+        Percentage of keyword pairs linked in either direction (0-100).
+
+        `keyword_count` is the total number of keywords when some of them are
+        unknown to the dataset; such keywords count as unconnected.
+        """
+        total = len(keyword_ids) if keyword_count is None else keyword_count
+        if total < 2:
+            return 100.0
+        return cohesion_from_links(self.link_weights(keyword_ids), total)
+
+    def pair_weight(self, a: int, b: int) -> float:
+        """Weight stored for style `a` -> style `b`, or 0.0 if the pair is absent."""
+        start, end = self.weights.indptr[a], self.weights.indptr[a + 1]
+        position = start + np.searchsorted(self.weights.indices[start:end], b)
+        if position < end and self.weights.indices[position] == b:
+            return float(self.weights.data[position])
+        return 0.0
+
+    def top_k(self, style: str, k: int) -> List[Tuple[str, float]]:
+        """
+        The `k` strongest associations of a style as `(style, weight)` pairs, strongest first.
+
+        Served from the precomputed arrays, so the cost does not depend on how many
+        associations the style has. Integral weights are returned as ints.
+        """
+        style_id = self.style_ids.get(style)
+        if style_id is None:
+            return []
+        if k > self.top_k_size and self.weights.indptr[style_id + 1] - self.weights.indptr[style_id] > self.top_k_size:
+            row = self.weights.getrow(style_id)
+            order = np.lexsort((row.indices, -row.data))[:k]
+            ids, weights = row.indices[order], row.data[order]
+        else:
+            ids, weights = self.top_k_ids[style_id, :k], self.top_k_weights[style_id, :k]
+        return [(self.styles[i], _as_weight(w)) for i, w in zip(ids.tolist(), weights.tolist()) if i >= 0]
+
+    def to_style_dict(self, vector: np.ndarray) -> Dict[str, float]:
+        """Converts a dense score vector to `{style: score}` for its non-zero entries."""
+        return {self.styles[i]: float(vector[i]) for i in np.flatnonzero(vector)}
+
+    def top_entries(self, vector: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """The `k` highest positive entries of a score vector, in descending order."""
+        if k <= 0:
+            return []
+        candidates = np.flatnonzero(vector > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-vector[candidates], k - 1)[:k]]
+        order = candidates[np.argsort(-vector[candidates], kind="stable")]
+        return [(self.styles[i], float(vector[i])) for i in order]
+
+
+def cohesion_from_links(links: np.ndarray, keyword_count: int) -> float:
+    """Cohesion (0-100) from a `link_weights` matrix over `keyword_count` keywords, some possibly absent from it."""
+    if keyword_count < 2:
+        return 100.0
+    connected_pairs = int(np.count_nonzero(np.triu(links > 0, 1)))
+    return (connected_pairs / (keyword_count * (keyword_count - 1) // 2)) * 100.0
+
+
+def _sorted_csr(matrix: sparse.spmatrix) -> sparse.csr_matrix:
+    matrix = matrix.tocsr()
+    # Checking the flag only reads the indices; already-sorted read-only arrays are left untouched.
+    if not matrix.has_sorted_indices:
+        matrix = matrix.copy()
+        matrix.sort_indices()
+    return matrix
+
+
+def _as_weight(value: float) -> float:
+    # Co-occurrence weights are counts; keep them ints so they format as "1,234".
+    return int(value) if value.is_integer() else value
+
+
+def get_cooccurrence_index(co_occurrence_data: Dict, top_k: int = DEFAULT_TOP_K) -> CooccurrenceIndex:
+    """
+    Returns the compiled index for a loaded dataset, building it on first use.
+
+    `top_k` only applies to that first build, which normally happens in the loader.
+    Snapshot-backed data (see `snapshot.py`) already carries its index, which is
+    returned as-is.
+    """
+    def build() -> CooccurrenceIndex:
+        prebuilt = getattr(co_occurrence_data, "index", None)
+        if isinstance(prebuilt, CooccurrenceIndex):
+            return prebuilt
+        return CooccurrenceIndex.from_dict(co_occurrence_data, top_k=top_k)
+
+    return get_derived(co_occurrence_data, "cooccurrence_index", build)
@@ -2,45 +2,80 @@
 
 import json
 from typing import Tuple, Set, Dict, Any
-import streamlit as st
+from keyword_matcher import get_keyword_matcher
+from cooccurrence import DEFAULT_TOP_K, get_cooccurrence_index
+from result_cache import dataset_version
+from snapshot import SnapshotFormatError, is_snapshot, load_snapshot
 
-# Use Streamlit's caching to load the data only once.
-@st.cache_data
-def load_suno_data(path: str) -> Tuple[Set[str], Dict[str, Any]]:
+
+class DataLoadError(Exception):
+    """Base class for errors raised while loading the Suno style data."""
+
+
+class DataFileNotFoundError(DataLoadError, FileNotFoundError):
+    """The data file does not exist."""
+
+
+class DataFormatError(DataLoadError, ValueError):
+    """The data file is not valid JSON or lacks the expected keys."""
+
+
+def load_suno_data(path: str, top_k: int = DEFAULT_TOP_K) -> Tuple[Set[str], Dict[str, Any]]:
     """
-    Loads, parses, and prepares the Suno style data from a JSON file.
+    Loads, parses, and prepares the Suno style data from a JSON file or a binary snapshot.
 
-    This function is cached, so the data is loaded from disk only once per
-    session, ensuring optimal performance.
+    Snapshots (compiled with `snapshot.py`, recognised by their magic bytes) are
+    memory-mapped rather than parsed: the co-occurrence data comes back as a
+    read-only `CooccurrenceSnapshot` mapping whose index shares the mapped arrays,
+    so every process loading the same file shares one page-cache copy.
+
+    The keyword matcher and the `CooccurrenceIndex` (with its per-style top-K
+    association arrays) for the dataset are compiled here as well; the
+    `BridgeIndex` is built on first use. This function does no caching of its
+    own; the Streamlit app wraps it in `streamlit_adapters.load_app_data`, and
+    batch callers load once per process.
 
     Args:
-        path: The file path to the suno_logic.json file.
+        path: The file path to the suno_logic.json file or a snapshot of it.
+        top_k: How many of each style's strongest associations to presort
+            (snapshots use the value they were compiled with).
 
     Returns:
         A tuple containing:
         - A set of all default style strings for fast lookups.
-        - A dictionary of the co-occurrence data.
-    
+        - A mapping of the co-occurrence data (a dict for JSON input).
+
     Raises:
-        FileNotFoundError: If the file at the specified path does not exist.
-        ValueError: If the file is not a valid JSON or lacks expected keys.
+        DataFileNotFoundError: If the file at the specified path does not exist.
+        DataFormatError: If the file is not a valid JSON or snapshot, or lacks expected keys.
     """
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # For fast keyword checking (O(1) average time complexity)
-        default_styles_set = set(data["default_styles"])
-        co_occurrence_dict = data["co_existing_styles_dict"]
-
-        if not default_styles_set or not co_occurrence_dict:
-            raise ValueError("JSON file is missing 'default_styles' or 'co_existing_styles_dict' keys.")
-
-        return default_styles_set, co_occurrence_dict
-
-    except FileNotFoundError:
-        st.error(f"FATAL: Data file not found at '{path}'. Please make sure 'suno_logic.json' is in the 'data' subfolder.")
-        st.stop()
-    except (json.JSONDecodeError, KeyError) as e:
-        st.error(f"FATAL: Error parsing the data file '{path}'. It may be corrupted or not valid JSON. Details: {e}")
-        st.stop()
\ No newline at end of file
+        if is_snapshot(path):
+            default_styles_set, co_occurrence_dict = load_snapshot(path)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            # For fast keyword checking (O(1) average time complexity)
+            default_styles_set = set(data["default_styles"])
+            co_occurrence_dict = data["co_existing_styles_dict"]
+    except FileNotFoundError as e:
+        raise DataFileNotFoundError(f"Data file not found at '{path}'.") from e
+    except SnapshotFormatError as e:
+        raise DataFormatError(f"Error reading the data snapshot '{path}': {e}") from e
+    except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError) as e:
+        raise DataFormatError(f"Error parsing the data file '{path}'. It may be corrupted or not valid JSON. Details: {e}") from e
+
+    if not default_styles_set or not co_occurrence_dict:
+        raise DataFormatError("JSON file is missing 'default_styles' or 'co_existing_styles_dict' keys.")
+
+    # Compile the keyword automaton and the sparse co-occurrence index once for this dataset.
+    get_keyword_matcher(default_styles_set)
+    get_cooccurrence_index(co_occurrence_dict, top_k=top_k)
+    # The bridge index is left to the first low-cohesion suggestion (see bridges.py):
+    # it is the slowest index to build, and CLIs and batch workers rarely need it.
+    # Fingerprint both objects up front; result-cache keys reuse these versions.
+    dataset_version(default_styles_set)
+    dataset_version(co_occurrence_dict)
+
+    return default_styles_set, co_occurrence_dict
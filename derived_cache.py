@@ -0,0 +1,44 @@
+# suno-prompt-analyzer/derived_cache.py
+
+"""
+Memoisation of structures derived from a loaded dataset.
+
+The style vocabulary and co-occurrence data are loaded once and treated as
+read-only, so anything computed from them (keyword automata, tooltip text,
+indexes) can be cached against the identity of the source object instead of
+re-hashing its contents on every call.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+# Only a handful of datasets are ever alive at once (the app's, plus test fixtures).
+MAX_CACHED_SOURCES = 8
+
+_DERIVED: "OrderedDict[int, Tuple[Any, Dict[Hashable, Any]]]" = OrderedDict()
+
+
+def get_derived(source: Any, key: Hashable, factory: Callable[[], T]) -> T:
+    """
+    Returns the value derived from `source` under `key`, building it with
+    `factory()` on first use.
+
+    The source object is kept alive while its entry is cached, so its id cannot
+    be reused by another object.
+    """
+    source_id = id(source)
+    entry = _DERIVED.get(source_id)
+    if entry is None or entry[0] is not source:
+        entry = (source, {})
+        _DERIVED[source_id] = entry
+        while len(_DERIVED) > MAX_CACHED_SOURCES:
+            _DERIVED.popitem(last=False)
+    else:
+        _DERIVED.move_to_end(source_id)
+
+    values = entry[1]
+    if key not in values:
+        values[key] = factory()
+    return values[key]
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# suno-prompt-analyzer/embeddings.py
+
+"""
+Dense style embeddings and similar-style search.
+
+Each style gets a short float32 vector from its co-occurrence profile: the
+symmetric co-occurrence counts are turned into positive pointwise mutual
+information (PPMI, with the usual 0.75 context smoothing), factorised with a
+truncated SVD, and the rows of `U * sqrt(S)` are L2-normalised. Styles that
+appear in similar company end up close together even when they never
+co-occur directly. Search is a brute-force cosine scan, one matrix-vector
+product over the whole vocabulary, which stays under a millisecond up to
+about 50,000 styles.
+
+Embeddings are built on first use, or offline with this script and loaded
+from the `SUNO_EMBEDDINGS_PATH` file when it matches the loaded dataset. The
+API server and the Streamlit app get them at startup, alongside the data, so
+no Explorer request pays for the build.
+
+Usage:
+    python embeddings.py data/suno_logic.json data/style_embeddings.npz --dimensions 32
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+from cooccurrence import CooccurrenceIndex, get_cooccurrence_index
+from derived_cache import get_derived
+from result_cache import dataset_version
+
+DEFAULT_DIMENSIONS = 32
+# Exponent applied to context counts before computing PMI; damps the pull of very common styles.
+CONTEXT_SMOOTHING = 0.75
+# Below this many styles a dense SVD is cheaper than ARPACK.
+DENSE_SVD_LIMIT = 500
+
+
+class StyleEmbeddings:
+    """
+    Unit-length float32 vectors for a style vocabulary, with cosine search.
+
+    Attributes:
+        styles: Style string for each row.
+        style_ids: Reverse lookup from style string to row.
+        vectors: `(styles, dimensions)` float32 array; styles without associations are all zero.
+        dataset_version: Version of the dataset the vectors were built from.
+    """
+
+    def __init__(self, styles: Sequence[str], vectors: np.ndarray, dataset_version: str = ""):
+        self.styles: List[str] = list(styles)
+        self.style_ids: Dict[str, int] = {style: i for i, style in enumerate(self.styles)}
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.dataset_version = dataset_version
+
+    @classmethod
+    def from_index(cls, index: CooccurrenceIndex, dimensions: int = DEFAULT_DIMENSIONS,
+                   dataset_version: str = "") -> "StyleEmbeddings":
+        """Builds embeddings from a `CooccurrenceIndex` (PPMI + truncated SVD)."""
+        ppmi = _ppmi(index.weights + index.weights_t)
+        rank = max(min(dimensions, len(index) - 1), 1)
+        if len(index) <= DENSE_SVD_LIMIT:
+            left, singular, _ = np.linalg.svd(ppmi.toarray())
+            left, singular = left[:, :rank], singular[:rank]
+        else:
+            from scipy.sparse.linalg import svds  # Only large vocabularies need ARPACK; keep it off the import path.
+
+            # A fixed start vector keeps ARPACK, and so the saved vectors, deterministic.
+            left, singular, _ = svds(ppmi, k=rank, v0=np.ones(len(index)) / np.sqrt(len(index)))
+            order = np.argsort(-singular)
+            left, singular = left[:, order], singular[order]
+        # Singular vectors have arbitrary signs; fix them so rebuilds give identical files.
+        signs = np.sign(left[np.abs(left).argmax(axis=0), np.arange(left.shape[1])])
+        vectors = left * (signs * np.sqrt(singular))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+        return cls(index.styles, vectors, dataset_version)
+
+    def __len__(self) -> int:
+        return len(self.styles)
+
+    @property
+    def dimensions(self) -> int:
+        return self.vectors.shape[1]
+
+    def query_vector(self, styles: Iterable[str]) -> Optional[np.ndarray]:
+        """Normalised mean vector of the given styles, or None if none of them has a vector."""
+        ids = [self.style_ids[style] for style in styles if style in self.style_ids]
+        if not ids:
+            return None
+        vector = self.vectors[ids].sum(axis=0)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def nearest(self, vector: np.ndarray, k: int, exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """The `k` styles most cosine-similar to `vector`, as `(style, similarity)` pairs, best first."""
+        if k <= 0:
+            return []
+        similarities = self.vectors @ vector.astype(np.float32, copy=False)
+        excluded = [self.style_ids[style] for style in exclude if style in self.style_ids]
+        similarities[excluded] = -np.inf
+        candidates = np.argpartition(-similarities, k - 1)[:k] if len(similarities) > k else np.arange(len(similarities))
+        candidates = candidates[similarities[candidates] > 0]
+        order = candidates[np.argsort(-similarities[candidates], kind="stable")]
+        return [(self.styles[i], float(similarities[i])) for i in order]
+
+    def similar_to(self, styles: Sequence[str], k: int) -> List[Tuple[str, float]]:
+        """The `k` styles closest to the given styles' mean vector, leaving out the styles themselves."""
+        vector = self.query_vector(styles)
+        return [] if vector is None else self.nearest(vector, k, exclude=styles)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Writes the vectors (float32), styles and dataset version to an uncompressed `.npz` file."""
+        with open(path, "wb") as f:
+            np.savez(f, styles=np.array(self.styles), vectors=self.vectors, dataset_version=np.array(self.dataset_version))
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "StyleEmbeddings":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data["styles"].tolist(), data["vectors"], str(data["dataset_version"]))
+
+
+def _ppmi(counts: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Positive PMI of a symmetric count matrix, over its stored entries only."""
+    counts = sparse.csr_matrix(counts, dtype=np.float64)
+    counts.eliminate_zeros()
+    totals = np.asarray(counts.sum(axis=1)).ravel()
+    context = totals ** CONTEXT_SMOOTHING
+    rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+    pmi = np.log(counts.data * context.sum() / (totals[rows] * context[counts.indices]))
+    ppmi = sparse.csr_matrix((np.maximum(pmi, 0.0), counts.indices, counts.indptr), shape=counts.shape)
+    ppmi.eliminate_zeros()
+    return ppmi
+
+
+def get_style_embeddings(co_occurrence_data: Dict, dimensions: int = DEFAULT_DIMENSIONS) -> StyleEmbeddings:
+    """
+    Returns the embeddings for a loaded dataset, on first use loading them from
+    `SUNO_EMBEDDINGS_PATH` if that file was built from the same dataset, and
+    building them otherwise. `dimensions` only applies to a fresh build.
+    """
+    def build() -> StyleEmbeddings:
+        version = dataset_version(co_occurrence_data)
+        path = os.getenv("SUNO_EMBEDDINGS_PATH")
+        if path and Path(path).exists():
+            embeddings = StyleEmbeddings.load(path)
+            if embeddings.dataset_version == version:
+                return embeddings
+            logging.warning(f"Ignoring embeddings at '{path}': they were built from a different dataset.")
+        return StyleEmbeddings.from_index(get_cooccurrence_index(co_occurrence_data), dimensions, version)
+
+    return get_derived(co_occurrence_data, "style_embeddings", build)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build dense style embeddings from suno_logic.json (or a snapshot of it).")
+    parser.add_argument("source", help="Path to suno_logic.json or a snapshot.")
+    parser.add_argument("output", help="Embeddings file to write (.npz).")
+    parser.add_argument("--dimensions", type=int, default=DEFAULT_DIMENSIONS, help="Vector length.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    from data_loader import DataLoadError, load_suno_data
+
+    started = time.perf_counter()
+    try:
+        _, co_occurrence_data = load_suno_data(args.source)
+    except DataLoadError as e:
+        logging.error(f"FATAL: {e}")
+        return 1
+    embeddings = StyleEmbeddings.from_index(get_cooccurrence_index(co_occurrence_data), args.dimensions,
+                                            dataset_version(co_occurrence_data))
+    embeddings.save(args.output)
+    logging.info(f"Wrote {len(embeddings):,} x {embeddings.dimensions} embeddings to '{args.output}' "
+                 f"({Path(args.output).stat().st_size:,} bytes) in {time.perf_counter() - started:.2f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
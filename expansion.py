@@ -0,0 +1,98 @@
+# suno-prompt-analyzer/expansion.py
+
+"""
+Multi-hop neighbourhood expansion over the co-occurrence graph.
+
+A breadth-first beam search from one or more seed styles: each level follows
+the strongest associations of the previous level's new styles, read straight
+from the index's precomputed top-k arrays, so a whole level is one array
+lookup. Styles are deduplicated as they are reached, and a node budget keeps
+deep expansions bounded: when a level would exceed it, only its strongest new
+styles are kept.
+"""
+
+from typing import List, NamedTuple, Sequence, Tuple, Union
+
+import numpy as np
+
+from cooccurrence import CooccurrenceIndex
+
+# Deepest expansion the Explorer offers.
+MAX_DEPTH = 4
+
+
+class ExpansionSettings(NamedTuple):
+    """
+    How far to expand from the seeds.
+
+    Attributes:
+        depth: Number of hops from the seeds.
+        fan_out: Associations followed per style at each level; the last entry
+            applies to any deeper levels. Capped at the index's precomputed top-k size.
+        min_weight: Associations weaker than this are not followed.
+        max_nodes: Most styles in the result, seeds included.
+    """
+    depth: int = 2
+    fan_out: Union[int, Tuple[int, ...]] = (7, 2)
+    min_weight: float = 0.0
+    max_nodes: int = 60
+
+    def level_fan_out(self, level: int) -> int:
+        """Fan-out from styles at `level` (0 = the seeds) to the next level."""
+        if isinstance(self.fan_out, int):
+            return self.fan_out
+        return self.fan_out[min(level, len(self.fan_out) - 1)]
+
+
+class Neighbourhood(NamedTuple):
+    """
+    Result of an expansion.
+
+    Attributes:
+        node_ids: Style ids in the order they were reached, seeds first.
+        levels: Hop distance of each entry of `node_ids`.
+        edges: `(source id, target id, weight)` for every followed association
+            whose target is in the result, in the order they were followed.
+    """
+    node_ids: List[int]
+    levels: List[int]
+    edges: List[Tuple[int, int, float]]
+
+
+def expand_neighbourhood(index: CooccurrenceIndex, seed_ids: Sequence[int],
+                         settings: ExpansionSettings = ExpansionSettings()) -> Neighbourhood:
+    """Expands from the given seed style ids, level by level."""
+    seeds = list(dict.fromkeys(int(i) for i in seed_ids))[:max(settings.max_nodes, 0)]
+    reached = np.zeros(len(index), dtype=bool)
+    reached[seeds] = True
+    node_ids, levels, edges = list(seeds), [0] * len(seeds), []
+    frontier = np.array(seeds, dtype=np.int64)
+
+    for level in range(1, settings.depth + 1):
+        fan_out = min(settings.level_fan_out(level - 1), index.top_k_size)
+        if not len(frontier) or fan_out <= 0:
+            break
+        # Every followed association of the level, in frontier order then strength order.
+        parents = np.repeat(frontier, fan_out)
+        targets = index.top_k_ids[frontier, :fan_out].ravel()
+        weights = index.top_k_weights[frontier, :fan_out].ravel()
+        followed = (targets >= 0) & (weights >= settings.min_weight) & (weights > 0)
+        parents, targets, weights = parents[followed], targets[followed], weights[followed]
+
+        # New styles are the first sighting of each not-yet-reached target.
+        _, first_sighting = np.unique(targets, return_index=True)
+        first_sighting = np.sort(first_sighting)
+        new = first_sighting[~reached[targets[first_sighting]]]
+        budget = settings.max_nodes - len(node_ids)
+        if len(new) > budget:
+            # Beam: keep the strongest new styles, still in the order they were reached.
+            new = np.sort(new[np.argsort(-weights[new], kind="stable")[:max(budget, 0)]])
+        frontier = targets[new]
+        reached[frontier] = True
+        node_ids.extend(frontier.tolist())
+        levels.extend([level] * len(frontier))
+
+        kept = reached[targets]
+        edges.extend(zip(parents[kept].tolist(), targets[kept].tolist(), weights[kept].tolist()))
+
+    return Neighbourhood(node_ids, levels, edges)
@@ -0,0 +1,177 @@
+# suno-prompt-analyzer/factions.py
+
+"""
+Keyword-pair structure of a prompt: cohesion, factions and faction statistics.
+
+The link matrix of the prompt's keywords (`CooccurrenceIndex.link_weights`) is
+computed once and shared: cohesion counts its linked pairs (or, in weighted
+mode, scores their strength), and factions are the connected components of the
+same links, found with a small disjoint-set over keyword positions.
+"""
+
+from functools import cached_property
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from cooccurrence import CooccurrenceIndex, cohesion_from_links, get_cooccurrence_index
+
+
+class DisjointSet:
+    """Union-find over the integers `0..size-1`, with path halving and union by size."""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+        self.sizes = [1] * size
+
+    def find(self, item: int) -> int:
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, first: int, second: int) -> bool:
+        """Merges the sets of two items; returns False if they were already joined."""
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return False
+        if self.sizes[first] < self.sizes[second]:
+            first, second = second, first
+        self.parent[second] = first
+        self.sizes[first] += self.sizes[second]
+        return True
+
+    def groups(self) -> List[List[int]]:
+        """Every set as a sorted list of items, ordered by their smallest item."""
+        members: Dict[int, List[int]] = {}
+        for item in range(len(self.parent)):
+            members.setdefault(self.find(item), []).append(item)
+        return list(members.values())
+
+
+class FactionStats(NamedTuple):
+    """
+    Summary of one faction for display.
+
+    Attributes:
+        keywords: The faction's keywords, in input order.
+        internal_density: Share of the faction's keyword pairs that are linked (1.0 for one keyword).
+        internal_weight: Summed co-occurrence weight of those links, both directions.
+        cross_affinity: Cosine similarity (0-1) of the faction's associations with
+            those of the other factions. Factions share no direct links, so this is
+            how strongly they meet through common neighbouring styles.
+    """
+    keywords: List[str]
+    internal_density: float
+    internal_weight: float
+    cross_affinity: float
+
+
+class CohesionScores(NamedTuple):
+    """
+    Binary and weight-aware cohesion of a keyword set, each 0-100.
+
+    Pair strengths are `log10(link weight + 1)`, normalised by the strongest
+    possible link in the dataset.
+
+    Attributes:
+        binary: Percentage of keyword pairs linked at all (the default cohesion score).
+        mean_log_weight: Mean normalised strength over all keyword pairs.
+        spanning_connectivity: Mean normalised strength of the `k - 1` links of the
+            strongest spanning tree, i.e. how firmly every keyword can be chained to
+            the others; missing links count as 0.
+    """
+    binary: float
+    mean_log_weight: float
+    spanning_connectivity: float
+
+
+class KeywordLinks:
+    """
+    Pairwise links between a prompt's keywords, computed in one pass.
+
+    Keywords unknown to the dataset stay in the matrix as unconnected rows, so
+    they count against cohesion and form single-keyword factions.
+    """
+
+    def __init__(self, keywords: Sequence[str], index: CooccurrenceIndex):
+        self.keywords = list(keywords)
+        self.index = index
+        self.links = np.zeros((len(self.keywords), len(self.keywords)))
+        known = [(i, index.style_ids[keyword]) for i, keyword in enumerate(self.keywords) if keyword in index.style_ids]
+        self.positions = np.array([i for i, _ in known], dtype=np.int64)
+        self.keyword_ids = np.array([style_id for _, style_id in known], dtype=np.int64)
+        self.links[np.ix_(self.positions, self.positions)] = index.link_weights(self.keyword_ids)
+
+    @property
+    def cohesion(self) -> float:
+        """Percentage of keyword pairs linked in either direction (0-100)."""
+        return cohesion_from_links(self.links, len(self.keywords))
+
+    @cached_property
+    def cohesion_scores(self) -> CohesionScores:
+        """Binary and weight-aware cohesion, all from the shared link matrix."""
+        count = len(self.keywords)
+        if count < 2:
+            return CohesionScores(100.0, 100.0, 100.0)
+        strengths = np.log10(self.links + 1.0) / np.log10(2 * self.index.max_weight + 1.0) if self.index.max_weight else self.links
+        mean_strength = np.triu(strengths, 1).sum() / (count * (count - 1) // 2)
+
+        # Prim's algorithm on the dense matrix, growing the maximum spanning tree.
+        in_tree = np.zeros(count, dtype=bool)
+        in_tree[0] = True
+        best = strengths[0].copy()
+        tree_strength = 0.0
+        for _ in range(count - 1):
+            nearest = int(np.argmax(np.where(in_tree, -1.0, best)))
+            tree_strength += best[nearest]
+            in_tree[nearest] = True
+            np.maximum(best, strengths[nearest], out=best)
+        return CohesionScores(self.cohesion, float(mean_strength) * 100.0, float(tree_strength) / (count - 1) * 100.0)
+
+    @cached_property
+    def groups(self) -> List[List[int]]:
+        """Keyword positions of each faction, largest first (ties: earliest keyword), each in input order."""
+        disjoint_set = DisjointSet(len(self.keywords))
+        for first, second in zip(*np.nonzero(np.triu(self.links, 1))):
+            disjoint_set.union(int(first), int(second))
+        return sorted(disjoint_set.groups(), key=lambda members: (-len(members), members[0]))
+
+    @property
+    def factions(self) -> List[List[str]]:
+        """Connected groups of keywords, largest first, each in input order."""
+        return [[self.keywords[i] for i in group] for group in self.groups]
+
+    def faction_stats(self, limit: Optional[int] = None) -> List[FactionStats]:
+        """`FactionStats` for the first `limit` of `factions` (all by default), in the same order."""
+        groups = self.groups[:limit]
+        # Summed association vectors, over the columns the keywords' rows actually use.
+        rows, columns, weights = self.index.row_entries(self.keyword_ids)
+        _, columns = np.unique(columns, return_inverse=True)
+        total = np.bincount(columns, weights=weights)
+        faction_of_position = np.full(len(self.keywords), -1, dtype=np.int64)
+        for number, group in enumerate(groups):
+            faction_of_position[group] = number
+        entry_factions = faction_of_position[self.positions][rows]
+
+        stats = []
+        for number, group in enumerate(groups):
+            in_faction = entry_factions == number
+            own = np.bincount(columns[in_faction], weights=weights[in_faction], minlength=len(total))
+            rest = total - own
+            denominator = np.sqrt((own @ own) * (rest @ rest))
+            internal = np.triu(self.links[np.ix_(group, group)], 1)
+            pairs = len(group) * (len(group) - 1) // 2
+            stats.append(FactionStats(
+                keywords=[self.keywords[i] for i in group],
+                internal_density=np.count_nonzero(internal) / pairs if pairs else 1.0,
+                internal_weight=float(internal.sum()),
+                cross_affinity=float(min(max((own @ rest) / denominator, 0.0), 1.0)) if denominator else 0.0,
+            ))
+        return stats
+
+
+def analyse_keyword_links(keywords: Sequence[str], co_occurrence_data: Dict) -> KeywordLinks:
+    """The `KeywordLinks` of a prompt's keywords over a loaded dataset."""
+    return KeywordLinks(keywords, get_cooccurrence_index(co_occurrence_data))
@@ -0,0 +1,152 @@
+# suno-prompt-analyzer/fake_gemini_server.py
+
+"""
+A local stand-in for the Gemini REST endpoint, for tests and load tests.
+
+It answers `models/<model>:generateContent` with a canned candidate and
+`models/<model>:streamGenerateContent` with the same reply split into
+server-sent-event chunks. It can add
+latency, fail the first N requests with a server error, and records request
+counts and peak concurrency. Point a client at it with
+`GeminiService(base_url=server.base_url)`.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Union
+
+
+def _echo_reply(brief: str) -> str:
+    return f"A generated prompt for: {brief.strip()[:60]}"
+
+
+class FakeGeminiServer:
+    """
+    Args:
+        reply: Reply text, or a function from the request's brief to the reply text.
+        latency: Seconds to wait before answering each request.
+        fail_first: Number of initial requests answered with `fail_status`.
+        fail_status: HTTP status used for the failing requests.
+        finish_reason: Finish reason reported on the candidate (on the last chunk when streaming).
+        stream_chunk_size: Characters of reply text per streamed chunk.
+        stream_chunk_delay: Seconds to wait between streamed chunks.
+    """
+
+    def __init__(self, reply: Union[str, Callable[[str], str]] = _echo_reply, latency: float = 0.0,
+                 fail_first: int = 0, fail_status: int = 500, finish_reason: str = "STOP",
+                 stream_chunk_size: int = 16, stream_chunk_delay: float = 0.0):
+        self.reply = reply
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.finish_reason = finish_reason
+        self.stream_chunk_size = stream_chunk_size
+        self.stream_chunk_delay = stream_chunk_delay
+        self.request_count = 0
+        self.peak_concurrency = 0
+        self.briefs: List[str] = []
+        self._active = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "FakeGeminiServer":
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("content-length", 0))) or b"{}")
+                brief = "".join(part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", []))
+                status, payload = server._handle(brief)
+                if status == 200 and ":streamGenerateContent" in self.path:
+                    self._send_stream(server._stream_chunks(payload))
+                else:
+                    self._send_json(status, payload)
+
+            def _send_stream(self, chunks):
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("transfer-encoding", "chunked")
+                self.end_headers()
+                for index, chunk in enumerate(chunks):
+                    if index and server.stream_chunk_delay:
+                        time.sleep(server.stream_chunk_delay)
+                    event = f"data: {json.dumps(chunk)}\r\n\r\n".encode("utf-8")
+                    self.wfile.write(f"{len(event):x}\r\n".encode("ascii") + event + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _send_json(self, status, payload):
+                encoded = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeGeminiServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reply_text(self, brief: str) -> str:
+        return self.reply(brief) if callable(self.reply) else self.reply
+
+    def _handle(self, brief: str):
+        with self._lock:
+            self.request_count += 1
+            request_number = self.request_count
+            self.briefs.append(brief)
+            self._active += 1
+            self.peak_concurrency = max(self.peak_concurrency, self._active)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if request_number <= self.fail_first:
+                return self.fail_status, {"error": {"code": self.fail_status, "message": "Simulated failure", "status": "INTERNAL"}}
+            return 200, {
+                "candidates": [{
+                    "content": {"parts": [{"text": self.reply_text(brief)}], "role": "model"},
+                    "finishReason": self.finish_reason,
+                }]
+            }
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _stream_chunks(self, payload):
+        """Splits a complete response into streamed chunks; only the last one carries the finish reason."""
+        candidate = payload["candidates"][0]
+        text = candidate["content"]["parts"][0]["text"]
+        pieces = [text[i:i + self.stream_chunk_size] for i in range(0, len(text), self.stream_chunk_size)] or [""]
+        return [
+            {"candidates": [{
+                "content": {"parts": [{"text": piece}], "role": "model"},
+                **({"finishReason": candidate["finishReason"]} if index == len(pieces) - 1 else {}),
+            }]}
+            for index, piece in enumerate(pieces)
+        ]
@@ -0,0 +1,57 @@
+# suno-prompt-analyzer/fusion.py
+
+"""
+Combined association scores for fusing any number of seed styles.
+
+The seeds' rows of the co-occurrence matrix are gathered together, so the
+combined scores, how many seeds share each association, and which styles sit
+in the strongest associations of several seeds are each one reduction over
+that `(seeds, styles)` block, not a Python merge of per-seed dicts.
+"""
+
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from cooccurrence import CooccurrenceIndex
+
+# Extra score for each additional seed sharing an association; two seeds give the
+# 1.5x boost the two-style explorer always applied.
+SYNERGY_BOOST = 0.5
+# A style bridges the fusion when it is among this many strongest associations of two or more seeds.
+BRIDGE_TOP_K = 15
+
+
+class StyleFusion(NamedTuple):
+    """
+    Fusion of several seed styles.
+
+    Attributes:
+        combined: Dense score per style: the seeds' summed weights, boosted by synergy.
+        shared_by: Number of seeds associating with each style at all.
+        bridge_counts: Number of seeds with each style among their `BRIDGE_TOP_K` strongest associations.
+        bridge_ids: Style ids in at least two seeds' strongest associations (seeds excluded),
+            most widely shared first, then by combined score.
+    """
+    combined: np.ndarray
+    shared_by: np.ndarray
+    bridge_counts: np.ndarray
+    bridge_ids: np.ndarray
+
+
+def fuse_styles(index: CooccurrenceIndex, seed_ids: Sequence[int], bridge_top_k: int = BRIDGE_TOP_K) -> StyleFusion:
+    """Scores the fusion of the given seed style ids."""
+    seed_ids = np.asarray(seed_ids, dtype=np.int64)
+    num_styles = len(index)
+    _, columns, weights = index.row_entries(seed_ids)
+    combined = np.bincount(columns, weights=weights, minlength=num_styles)
+    shared_by = np.bincount(columns[weights > 0], minlength=num_styles)
+    combined *= 1.0 + SYNERGY_BOOST * np.maximum(shared_by - 1, 0)
+
+    strongest = index.top_k_ids[seed_ids, :bridge_top_k]
+    bridge_counts = np.bincount(strongest[strongest >= 0], minlength=num_styles)
+    candidates = np.flatnonzero(bridge_counts >= 2)
+    candidates = candidates[~np.isin(candidates, seed_ids)]
+    bridge_ids = candidates[np.lexsort((candidates, -combined[candidates], -bridge_counts[candidates]))]
+    return StyleFusion(combined, shared_by, bridge_counts, bridge_ids)
+
@@ -0,0 +1,151 @@
+# suno-prompt-analyzer/gemini_cache.py
+
+"""
+Content-addressed, persistent cache of Gemini responses.
+
+Responses are keyed on a hash of everything that determines the output: the
+creative brief, the system instruction, the model and the temperature. Several
+variants can be stored per key, so callers can ask for "N cached variants" and
+get them instantly on repeat requests. The store is a single SQLite file with a
+size cap, least-recently-used eviction and an optional TTL.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_VARIANTS = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT NOT NULL,
+    variant INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    latency REAL NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (key, variant)
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def make_cache_key(creative_brief: str, system_instruction: Optional[str], model: str, temperature: float) -> str:
+    """Hash of every input that determines a Gemini response."""
+    payload = json.dumps([creative_brief, system_instruction, model, temperature], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class GeminiResponseCache:
+    """
+    A thread-safe SQLite store of generated prompts.
+
+    Args:
+        path: SQLite file, created if missing (":memory:" for a throwaway cache).
+        max_bytes: Cap on the total size of stored response text.
+        ttl_seconds: Lifetime of a stored response, or None to keep it until evicted.
+        max_variants: Maximum number of variants kept per key.
+        clock: Wall-clock time source in seconds; injectable for tests.
+    """
+
+    def __init__(self, path: Union[str, Path] = ":memory:", max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl_seconds: Optional[float] = None, max_variants: int = DEFAULT_MAX_VARIANTS,
+                 clock: Callable[[], float] = time.time):
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_variants = max_variants
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._connection.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.saved_latency = 0.0
+
+    def get_variants(self, key: str, limit: int) -> List[str]:
+        """Returns up to `limit` stored variants for a key, oldest first, and marks them as used."""
+        now = self._clock()
+        with self._lock:
+            if self.ttl_seconds is not None:
+                self._connection.execute("DELETE FROM responses WHERE key = ? AND created_at <= ?", (key, now - self.ttl_seconds))
+            rows = self._connection.execute(
+                "SELECT variant, text, latency FROM responses WHERE key = ? ORDER BY variant LIMIT ?", (key, limit)
+            ).fetchall()
+            if rows:
+                self._connection.executemany("UPDATE responses SET last_used = ? WHERE key = ? AND variant = ?",
+                                             [(now, key, variant) for variant, _, _ in rows])
+                self.hits += len(rows)
+                self.saved_latency += sum(latency for _, _, latency in rows)
+            self.misses += limit - len(rows)
+        return [text for _, text, _ in rows]
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the first stored variant for a key, or None."""
+        variants = self.get_variants(key, 1)
+        return variants[0] if variants else None
+
+    def add(self, key: str, text: str, latency: float) -> None:
+        """Stores a new variant for a key, then evicts least recently used responses over the size cap."""
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        now = self._clock()
+        with self._lock:
+            connection = self._connection
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                next_variant = connection.execute("SELECT COALESCE(MAX(variant), -1) + 1 FROM responses WHERE key = ?", (key,)).fetchone()[0]
+                connection.execute("INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)", (key, next_variant, text, size, latency, now, now))
+                connection.execute(
+                    "DELETE FROM responses WHERE key = ? AND variant NOT IN "
+                    "(SELECT variant FROM responses WHERE key = ? ORDER BY variant DESC LIMIT ?)",
+                    (key, key, self.max_variants),
+                )
+                self._evict_over_cap()
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def _evict_over_cap(self) -> None:
+        total = self._connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, variant, size in self._connection.execute(
+            "SELECT key, variant, size FROM responses ORDER BY last_used, created_at"
+        ).fetchall():
+            self._connection.execute("DELETE FROM responses WHERE key = ? AND variant = ?", (key, variant))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    def stats(self) -> Dict[str, float]:
+        """Hit rate, saved latency (seconds of API time avoided) and current occupancy."""
+        with self._lock:
+            entries, total_bytes = self._connection.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "saved_latency_seconds": self.saved_latency,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
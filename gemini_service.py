@@ -0,0 +1,435 @@
+# suno-prompt-analyzer/gemini_service.py
+
+"""
+Asynchronous Gemini generation service.
+
+One `GeminiService` owns a background event loop, keeps a single pooled
+`genai.Client` per API key and runs many creative briefs concurrently, up to a
+configurable in-flight limit. Failed calls are retried with jittered
+exponential backoff on the event loop, so a retrying request never blocks the
+others. Both coroutine (`*_async`) and blocking APIs are provided; the blocking
+ones are safe to call from the Streamlit script thread. `stream` and
+`stream_async` return a `GenerationStream` that yields text chunks as the model
+produces them.
+
+Results follow the app's existing contract: the generated text, or a string
+starting with "ERROR:" describing what went wrong. With a `GeminiResponseCache`
+attached, successful responses are stored and identical briefs are answered
+from the cache without an API call.
+"""
+
+import asyncio
+import logging
+import queue
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Coroutine, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from gemini_cache import GeminiResponseCache, make_cache_key
+
+DEFAULT_MODEL = "gemini-2.5-pro"
+DEFAULT_TEMPERATURE = 0.7
+DEFAULT_MAX_IN_FLIGHT = 8
+DEFAULT_MAX_RETRIES = 3
+# Backoff before retry n is drawn uniformly from [0, min(MAX_DELAY, BASE_DELAY * 2**n)].
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 16.0
+
+
+def build_generation_config(system_instruction: Optional[str], temperature: float) -> Any:
+    """
+    Builds the `GenerateContentConfig` used for every prompt generation call,
+    with all adjustable safety filters disabled as per the application's design.
+    """
+    from google.genai import types
+
+    safety_settings = [
+        types.SafetySetting(category=category, threshold=types.HarmBlockThreshold.BLOCK_NONE)
+        for category in (
+            types.HarmCategory.HARM_CATEGORY_HARASSMENT,
+            types.HarmCategory.HARM_CATEGORY_HATE_SPEECH,
+            types.HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT,
+            types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+            types.HarmCategory.HARM_CATEGORY_CIVIC_INTEGRITY,
+        )
+    ]
+    return types.GenerateContentConfig(
+        system_instruction=system_instruction,
+        temperature=temperature,
+        safety_settings=safety_settings,
+        # Tool use is disabled, as we only need text generation.
+        automatic_function_calling=types.AutomaticFunctionCallingConfig(disable=True),
+    )
+
+
+def _response_error(response: Any) -> Optional[str]:
+    """Returns an "ERROR:" message if a response was blocked or incomplete, else None."""
+    if not response.candidates:
+        feedback = getattr(response, "prompt_feedback", None)
+        block_reason = getattr(feedback, "block_reason", None)
+        if block_reason:
+            logging.error(f"Gemini API call failed: Prompt was blocked. Reason: {block_reason}")
+            return f"ERROR: Your prompt was blocked for violating core safety policies which cannot be disabled. Reason: {block_reason}"
+        logging.error("No candidates in response - unexpected with safety filters disabled")
+        return "ERROR: No response candidates generated. Please try modifying your creative brief."
+
+    candidate = response.candidates[0]
+    finish_reason = getattr(candidate.finish_reason, "name", candidate.finish_reason)
+    if finish_reason != "STOP":
+        logging.warning(f"Gemini response finished with reason: {finish_reason}")
+        return f"ERROR: The AI response was incomplete. Finish Reason: {finish_reason}. Please try again."
+    return None
+
+
+def response_to_text(response: Any) -> str:
+    """Extracts the generated text, or an "ERROR:" message for blocked or incomplete responses."""
+    error = _response_error(response)
+    if error:
+        return error
+    try:
+        return response.text
+    except Exception as e:
+        logging.error(f"Failed to access response.text: {e}", exc_info=True)
+        return f"ERROR: Failed to retrieve response content: {str(e)}"
+
+
+def _is_retriable(error: Exception) -> bool:
+    from google.genai import errors
+
+    if isinstance(error, errors.ServerError):
+        return True
+    # Rate limiting is transient as well.
+    return isinstance(error, errors.ClientError) and getattr(error, "code", None) == 429
+
+
+_END_OF_STREAM = object()
+
+
+class GenerationStream:
+    """
+    The text chunks of one streamed generation, in arrival order.
+
+    Streams returned by `GeminiService.stream` are iterated with a plain `for`
+    loop, those from `GeminiService.stream_async` with `async for`. Once the
+    iteration ends, `result` holds the full text or an "ERROR:" message (the same
+    contract as `GeminiService.generate`), and the timings are filled in. Chunks
+    already yielded before an error are not retracted, so callers should check
+    `result` rather than the concatenated chunks.
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.result: Optional[str] = None
+        self.time_to_first_token: Optional[float] = None
+        self.total_latency: Optional[float] = None
+        self._loop = loop
+        self._queue = asyncio.Queue() if loop is not None else queue.Queue()
+
+    @classmethod
+    def finished(cls, result: str) -> "GenerationStream":
+        """A stream that yields nothing and already holds `result`, e.g. for validation errors."""
+        stream = cls()
+        stream.result = result
+        stream._put(_END_OF_STREAM)
+        return stream
+
+    def _put(self, item: Any) -> None:
+        # Called from the service loop; hands the item to the consumer's side.
+        if self._loop is None:
+            self._queue.put(item)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, item)
+
+    def __iter__(self) -> Iterator[str]:
+        while (item := self._queue.get()) is not _END_OF_STREAM:
+            yield item
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        while (item := await self._queue.get()) is not _END_OF_STREAM:
+            yield item
+
+
+class GeminiService:
+    """
+    Concurrent Gemini prompt generation with pooled clients.
+
+    Args:
+        model: Gemini model name.
+        system_instruction: System instruction sent with every brief.
+        temperature: Sampling temperature.
+        max_in_flight: Maximum number of concurrent API calls across all callers.
+        max_retries: Attempts per brief before giving up; at least 1.
+        base_delay: Base of the jittered exponential backoff, in seconds.
+        max_delay: Upper bound of a single backoff, in seconds.
+        base_url: Overrides the API endpoint, e.g. to target a local fake server.
+        response_cache: Optional persistent cache of successful responses.
+    """
+
+    def __init__(self, model: str = DEFAULT_MODEL, system_instruction: Optional[str] = None,
+                 temperature: float = DEFAULT_TEMPERATURE, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 max_retries: int = DEFAULT_MAX_RETRIES, base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY, base_url: Optional[str] = None,
+                 response_cache: Optional[GeminiResponseCache] = None):
+        if max_retries < 1:
+            raise ValueError(f"max_retries must be at least 1 (one attempt), got {max_retries}.")
+        self.model = model
+        self.system_instruction = system_instruction
+        self.temperature = temperature
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.base_url = base_url
+        self.response_cache = response_cache
+        self._clients: Dict[str, Any] = {}
+        self._config = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    # --- Event loop plumbing ---
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+
+                def run():
+                    asyncio.set_event_loop(loop)
+                    self._semaphore = asyncio.Semaphore(self.max_in_flight)
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target=run, name="gemini-service", daemon=True)
+                self._thread.start()
+                started.wait()
+                self._loop = loop
+            return self._loop
+
+    def _submit(self, coroutine: Coroutine) -> Future:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop())
+
+    def _client(self, api_key: str) -> Any:
+        # Runs on the service loop only, so no locking is needed.
+        client = self._clients.get(api_key)
+        if client is None:
+            from google import genai
+            from google.genai import types
+
+            http_options = types.HttpOptions(base_url=self.base_url) if self.base_url else None
+            client = genai.Client(api_key=api_key, http_options=http_options)
+            self._clients[api_key] = client
+        return client
+
+    def _generation_config(self) -> Any:
+        if self._config is None:
+            self._config = build_generation_config(self.system_instruction, self.temperature)
+        return self._config
+
+    # --- Generation ---
+
+    def cache_key(self, creative_brief: str) -> str:
+        """Content address of a brief under this service's model settings."""
+        return make_cache_key(creative_brief, self.system_instruction, self.model, self.temperature)
+
+    # The response cache does blocking SQLite I/O, so its calls run in worker
+    # threads and never stall the briefs in flight on the service loop.
+
+    async def _cached(self, creative_brief: str) -> Optional[str]:
+        if self.response_cache is None:
+            return None
+        return await asyncio.to_thread(self.response_cache.get, self.cache_key(creative_brief))
+
+    async def _store(self, creative_brief: str, results: Sequence[Tuple[str, float]]) -> None:
+        """Stores the successful `(text, latency)` results for a brief, in the given order."""
+        if self.response_cache is None:
+            return
+        key, cache = self.cache_key(creative_brief), self.response_cache
+
+        def add_all() -> None:
+            for text, latency in results:
+                if not text.startswith("ERROR:"):
+                    cache.add(key, text, latency)
+
+        await asyncio.to_thread(add_all)
+
+    async def _generate(self, creative_brief: str, api_key: str) -> str:
+        cached_text = await self._cached(creative_brief)
+        if cached_text is not None:
+            logging.info("Gemini response served from the response cache.")
+            return cached_text
+        started = time.perf_counter()
+        text = await self._call_api(creative_brief, api_key)
+        await self._store(creative_brief, [(text, time.perf_counter() - started)])
+        return text
+
+    async def _generate_variants(self, creative_brief: str, api_key: str, count: int) -> List[str]:
+        cached_variants = []
+        if self.response_cache is not None:
+            cached_variants = await asyncio.to_thread(self.response_cache.get_variants, self.cache_key(creative_brief), count)
+
+        async def fresh_variant() -> Tuple[str, float]:
+            started = time.perf_counter()
+            text = await self._call_api(creative_brief, api_key)
+            return text, time.perf_counter() - started
+
+        fresh = await asyncio.gather(*(fresh_variant() for _ in range(count - len(cached_variants))))
+        # Stored in request order rather than completion order, so repeat calls return the same list.
+        await self._store(creative_brief, fresh)
+        return cached_variants + [text for text, _ in fresh]
+
+    async def _call_api(self, creative_brief: str, api_key: str) -> str:
+        try:
+            client = self._client(api_key)
+            config = self._generation_config()
+        except Exception as e:
+            logging.error(f"An unexpected error occurred during Gemini client setup: {e}", exc_info=True)
+            return f"ERROR: An unexpected application error occurred: {str(e)}"
+
+        started = time.perf_counter()
+        for attempt in range(self.max_retries):
+            try:
+                async with self._semaphore:
+                    response = await client.aio.models.generate_content(model=self.model, contents=creative_brief, config=config)
+                break
+            except Exception as e:
+                error = await self._back_off(e, attempt)
+                if error:
+                    return error
+
+        logging.info(f"Gemini API response received in {time.perf_counter() - started:.2f}s")
+        return response_to_text(response)
+
+    async def _back_off(self, error: Exception, attempt: int) -> Optional[str]:
+        """Sleeps before the next attempt, or returns the "ERROR:" message if the call should give up."""
+        if not _is_retriable(error):
+            logging.error(f"A non-retriable Gemini API error occurred: {error}", exc_info=True)
+            return f"ERROR: A Gemini API error occurred: {str(error)}"
+        if attempt == self.max_retries - 1:
+            logging.error(f"Gemini API failed after {self.max_retries} attempts: {error}")
+            return f"ERROR: Gemini API server error after {self.max_retries} attempts. The service may be temporarily unavailable."
+        wait_time = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        logging.warning(f"Gemini API error (attempt {attempt + 1}/{self.max_retries}). Retrying in {wait_time:.2f}s...")
+        # The semaphore is released while waiting, so other briefs keep flowing.
+        await asyncio.sleep(wait_time)
+        return None
+
+    async def _stream(self, creative_brief: str, api_key: str, stream: GenerationStream) -> None:
+        started = time.perf_counter()
+        try:
+            stream.result = await self._stream_text(creative_brief, api_key, stream, started)
+        except Exception as e:
+            logging.error(f"An unexpected error occurred while streaming from Gemini: {e}", exc_info=True)
+            stream.result = f"ERROR: An unexpected application error occurred: {str(e)}"
+        finally:
+            stream.total_latency = time.perf_counter() - started
+            stream._put(_END_OF_STREAM)
+        first_token = f"{stream.time_to_first_token:.2f}s" if stream.time_to_first_token is not None else "n/a"
+        logging.info(f"Gemini stream finished: time to first token {first_token}, total latency {stream.total_latency:.2f}s")
+
+    async def _stream_text(self, creative_brief: str, api_key: str, stream: GenerationStream, started: float) -> str:
+        def emit(text: str) -> None:
+            if stream.time_to_first_token is None:
+                stream.time_to_first_token = time.perf_counter() - started
+            stream._put(text)
+
+        cached_text = await self._cached(creative_brief)
+        if cached_text is not None:
+            logging.info("Gemini response served from the response cache.")
+            emit(cached_text)
+            return cached_text
+
+        try:
+            client = self._client(api_key)
+            config = self._generation_config()
+        except Exception as e:
+            logging.error(f"An unexpected error occurred during Gemini client setup: {e}", exc_info=True)
+            return f"ERROR: An unexpected application error occurred: {str(e)}"
+
+        chunks: List[str] = []
+        last_chunk = None
+        for attempt in range(self.max_retries):
+            try:
+                async with self._semaphore:
+                    async for chunk in await client.aio.models.generate_content_stream(model=self.model, contents=creative_brief, config=config):
+                        last_chunk = chunk
+                        text = chunk.text if chunk.candidates else None
+                        if text:
+                            chunks.append(text)
+                            emit(text)
+                break
+            except Exception as e:
+                if chunks:
+                    # Text has already reached the caller, so a retry would repeat it.
+                    logging.error(f"The Gemini stream was interrupted: {e}", exc_info=True)
+                    return f"ERROR: The Gemini response stream was interrupted: {str(e)}"
+                error = await self._back_off(e, attempt)
+                if error:
+                    return error
+
+        if last_chunk is None:
+            logging.error("Gemini stream ended without any response chunks")
+            return "ERROR: No response candidates generated. Please try modifying your creative brief."
+        # The finish reason (or block reason) is reported on the final chunk.
+        text = _response_error(last_chunk) or "".join(chunks)
+        await self._store(creative_brief, [(text, time.perf_counter() - started)])
+        return text
+
+    async def generate_async(self, creative_brief: str, api_key: str) -> str:
+        """Generates a prompt for one brief. Awaitable from any event loop."""
+        return await asyncio.wrap_future(self._submit(self._generate(creative_brief, api_key)))
+
+    async def generate_many_async(self, creative_briefs: Sequence[str], api_key: str) -> List[str]:
+        """Generates prompts for many briefs concurrently; results keep the input order."""
+        return list(await asyncio.gather(*(self.generate_async(brief, api_key) for brief in creative_briefs)))
+
+    def generate(self, creative_brief: str, api_key: str) -> str:
+        """Blocking wrapper around `generate_async`."""
+        return self._submit(self._generate(creative_brief, api_key)).result()
+
+    def generate_many(self, creative_briefs: Sequence[str], api_key: str) -> List[str]:
+        """Blocking wrapper around `generate_many_async`."""
+        futures = [self._submit(self._generate(brief, api_key)) for brief in creative_briefs]
+        return [future.result() for future in futures]
+
+    async def generate_variants_async(self, creative_brief: str, api_key: str, count: int) -> List[str]:
+        """
+        Returns `count` prompts for one brief: cached variants first, then as many
+        fresh generations (run concurrently) as are needed to make up the number.
+        """
+        return await asyncio.wrap_future(self._submit(self._generate_variants(creative_brief, api_key, count)))
+
+    def generate_variants(self, creative_brief: str, api_key: str, count: int) -> List[str]:
+        """Blocking wrapper around `generate_variants_async`."""
+        return self._submit(self._generate_variants(creative_brief, api_key, count)).result()
+
+    def stream(self, creative_brief: str, api_key: str) -> GenerationStream:
+        """Starts a streamed generation and returns a stream to iterate with `for`."""
+        stream = GenerationStream()
+        self._submit(self._stream(creative_brief, api_key, stream))
+        return stream
+
+    async def stream_async(self, creative_brief: str, api_key: str) -> GenerationStream:
+        """Starts a streamed generation and returns a stream to iterate with `async for` on the calling loop."""
+        stream = GenerationStream(asyncio.get_running_loop())
+        self._submit(self._stream(creative_brief, api_key, stream))
+        return stream
+
+    def close(self) -> None:
+        """Closes the pooled clients and stops the background event loop."""
+        if self._loop is None:
+            return
+
+        async def close_clients():
+            for client in self._clients.values():
+                await client.aio.aclose()
+            self._clients.clear()
+
+        self._submit(close_clients()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
@@ -0,0 +1,116 @@
+# suno-prompt-analyzer/graph_layout.py
+
+"""
+Server-side layouts for the association maps.
+
+Instead of letting vis-network stabilise a force simulation in the browser,
+node coordinates can be computed here: a spectral embedding of the weighted
+graph seeds a vectorised Fruchterman-Reingold refinement, and the result is
+scaled to the spring length the browser simulation used. Layouts are
+deterministic and cached per graph content hash, so the same input always
+draws the same picture and maps can be sent with physics disabled.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from result_cache import ResultCache
+
+DEFAULT_ITERATIONS = 200
+# Target median edge length in pixels; matches the browser's barnesHut springLength.
+SPRING_LENGTH = 150.0
+
+# Layouts by graph content hash.
+LAYOUT_CACHE = ResultCache(max_entries=256)
+
+
+def graph_hash(graph_data: Dict[str, Any]) -> str:
+    """Content hash of a graph's nodes and edges."""
+    payload = json.dumps(graph_data, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def compute_layout(graph_data: Dict[str, Any], iterations: int = DEFAULT_ITERATIONS) -> Dict[str, Tuple[float, float]]:
+    """
+    `{node id: (x, y)}` pixel coordinates for a graph's 'nodes' and 'edges'
+    (edges weighted by their 'value'), cached per graph content hash.
+    """
+    key = (graph_hash(graph_data), iterations)
+    return LAYOUT_CACHE.get_or_compute(key, lambda: _layout(graph_data, iterations))
+
+
+def _layout(graph_data: Dict[str, Any], iterations: int) -> Dict[str, Tuple[float, float]]:
+    node_ids = list(dict.fromkeys(node['id'] for node in graph_data['nodes']))
+    if not node_ids:
+        return {}
+    position_of = {node_id: i for i, node_id in enumerate(node_ids)}
+    weights = np.zeros((len(node_ids), len(node_ids)))
+    for edge in graph_data['edges']:
+        source, target = position_of.get(edge['from']), position_of.get(edge['to'])
+        if source is not None and target is not None and source != target:
+            weights[source, target] += max(float(edge['value']), 0.0)
+    weights = weights + weights.T
+    if weights.max() > 0:
+        weights /= weights.max()
+
+    positions = _force_directed(weights, _spectral(weights), iterations)
+    return {node_id: (float(x), float(y)) for node_id, (x, y) in zip(node_ids, _scale(positions, weights))}
+
+
+def _spectral(weights: np.ndarray) -> np.ndarray:
+    """Initial positions from the two smallest non-trivial Laplacian eigenvectors."""
+    count = len(weights)
+    if count < 3:
+        return np.array([[0.0, 0.0], [1.0, 0.0]])[:count]
+    # A weak all-pairs term keeps disconnected components from collapsing onto each other.
+    connected = weights + 1e-3
+    np.fill_diagonal(connected, 0.0)
+    laplacian = np.diag(connected.sum(axis=1)) - connected
+    _, vectors = np.linalg.eigh(laplacian)
+    positions = vectors[:, 1:3].copy()
+    # Eigenvector signs are arbitrary; fix them so equal inputs give equal pictures.
+    for axis in range(2):
+        if positions[np.argmax(np.abs(positions[:, axis])), axis] < 0:
+            positions[:, axis] *= -1
+    # Break exact ties (symmetric graphs) deterministically.
+    positions += 1e-3 * np.column_stack([np.cos(np.arange(count)), np.sin(np.arange(count))])
+    return positions
+
+
+def _force_directed(weights: np.ndarray, positions: np.ndarray, iterations: int) -> np.ndarray:
+    """Fruchterman-Reingold refinement, with every pairwise force computed at once per step."""
+    count = len(positions)
+    if count < 2:
+        return positions
+    positions = positions - positions.mean(axis=0)
+    spread = np.abs(positions).max()
+    positions = positions / spread if spread > 0 else positions
+    ideal = np.sqrt(1.0 / count)
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+    attraction = weights / ideal
+    for _ in range(iterations):
+        dx = positions[:, 0, None] - positions[None, :, 0]
+        dy = positions[:, 1, None] - positions[None, :, 1]
+        squared = np.maximum(dx * dx + dy * dy, 1e-6)
+        # Repulsion between every pair, attraction along weighted edges.
+        force = ideal ** 2 / squared - attraction * np.sqrt(squared)
+        displacement = np.column_stack([(dx * force).sum(axis=1), (dy * force).sum(axis=1)])
+        length = np.maximum(np.hypot(displacement[:, 0], displacement[:, 1]), 1e-9)
+        positions = positions + displacement * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+    return positions
+
+
+def _scale(positions: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Centres the layout and scales it so the median edge is `SPRING_LENGTH` pixels long."""
+    positions = positions - positions.mean(axis=0)
+    rows, cols = np.nonzero(np.triu(weights, 1))
+    if len(rows):
+        reference = np.median(np.linalg.norm(positions[rows] - positions[cols], axis=1))
+    else:
+        reference = np.median(np.linalg.norm(positions, axis=1)) if len(positions) > 1 else 0.0
+    return positions * (SPRING_LENGTH / reference) if reference > 0 else positions
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# suno-prompt-analyzer/ingest_corpus.py
+
+"""
+Recomputes style co-occurrence weights from a corpus of Suno prompts.
+
+Prompts are streamed from JSONL or CSV files (the same record formats as
+`batch_analyze.py`) and matched with `extract_keywords`, so a style counts as
+present exactly when the analyzer would recognise it. Worker processes turn
+chunks of prompts into partial pair counts; the parent merges them into a
+sorted in-memory table and spills that table to disk as a sorted run whenever
+it grows past `max_pairs_in_memory`. The runs are finally merged block by block
+and written out as a `suno_logic.json`-compatible file, one style row at a
+time, so memory stays bounded however large the corpus is.
+
+With `--base`, the counts are added on top of an existing dataset (JSON or
+snapshot), which makes ingestion incremental: apply each new batch of prompts
+to the previous output.
+
+Usage:
+    python ingest_corpus.py prompts.jsonl more_prompts.csv -o data/suno_logic.json --base data/suno_logic.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, TextIO, Tuple
+
+import numpy as np
+
+from analyzer import extract_keywords
+from batch_analyze import InvalidRecord, _batches, _open_input, read_csv, read_jsonl
+from cooccurrence import _as_weight, get_cooccurrence_index
+from data_loader import DataLoadError, load_suno_data
+
+DEFAULT_CHUNK_SIZE = 2048
+DEFAULT_MAX_PAIRS_IN_MEMORY = 20_000_000
+# Chunks queued per worker; bounds memory while keeping every worker busy.
+IN_FLIGHT_CHUNKS_PER_WORKER = 4
+
+# A partial count: sorted unique pair codes (`row * vocabulary size + column`) and their weights.
+PairCounts = Tuple[np.ndarray, np.ndarray]
+
+# Set once per worker process by `_init_worker`.
+_WORKER_STYLES: Set[str] = set()
+_WORKER_STYLE_IDS: Dict[str, int] = {}
+
+
+def _init_worker(default_styles: Sequence[str], vocabulary: Sequence[str]) -> None:
+    global _WORKER_STYLES, _WORKER_STYLE_IDS
+    _WORKER_STYLES = set(default_styles)
+    _WORKER_STYLE_IDS = {style: i for i, style in enumerate(vocabulary)}
+
+
+def _empty_counts() -> PairCounts:
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+
+def merge_counts(partials: Iterable[PairCounts]) -> PairCounts:
+    """Sums any number of partial counts into one sorted, duplicate-free count."""
+    partials = [partial for partial in partials if len(partial[0])]
+    if not partials:
+        return _empty_counts()
+    codes = np.concatenate([codes for codes, _ in partials])
+    weights = np.concatenate([weights for _, weights in partials])
+    order = np.argsort(codes, kind="stable")
+    codes, weights = codes[order], weights[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    return codes[starts], np.add.reduceat(weights, starts)
+
+
+def count_chunk(prompts: Sequence[str]) -> PairCounts:
+    """
+    Counts ordered style pairs in a chunk of prompts (in the current worker).
+
+    Each prompt adds 1 to `(a, b)` and `(b, a)` for every two distinct styles it contains.
+    """
+    num_styles = len(_WORKER_STYLE_IDS)
+    codes = []
+    for prompt in prompts:
+        ids = np.array([_WORKER_STYLE_IDS[style] for style in extract_keywords(prompt, _WORKER_STYLES)], dtype=np.int64)
+        if len(ids) < 2:
+            continue
+        rows, cols = np.repeat(ids, len(ids)), np.tile(ids, len(ids))
+        off_diagonal = rows != cols
+        codes.append(rows[off_diagonal] * num_styles + cols[off_diagonal])
+    if not codes:
+        return _empty_counts()
+    codes, counts = np.unique(np.concatenate(codes), return_counts=True)
+    return codes, counts.astype(np.float64)
+
+
+class PairCounter:
+    """
+    Accumulates partial counts in a sorted table, spilling sorted runs to disk.
+
+    Partials are buffered and merged into the table in batches, so the table is
+    not re-sorted for every chunk. `runs()` yields the spilled runs (memory-mapped)
+    plus the in-memory table, each sorted by pair code.
+    """
+
+    def __init__(self, spill_dir: str, max_pairs_in_memory: int = DEFAULT_MAX_PAIRS_IN_MEMORY):
+        self.spill_dir = spill_dir
+        self.max_pairs_in_memory = max_pairs_in_memory
+        self.spilled_runs: List[Tuple[Path, Path]] = []
+        self._table = _empty_counts()
+        self._pending: List[PairCounts] = []
+        self._pending_size = 0
+
+    def add(self, partial: PairCounts) -> None:
+        self._pending.append(partial)
+        self._pending_size += len(partial[0])
+        if self._pending_size >= max(len(self._table[0]), self.max_pairs_in_memory // 4):
+            self._flush()
+
+    def _flush(self) -> None:
+        self._table = merge_counts([self._table] + self._pending)
+        self._pending, self._pending_size = [], 0
+        if len(self._table[0]) > self.max_pairs_in_memory:
+            run = len(self.spilled_runs)
+            paths = Path(self.spill_dir) / f"run{run}.codes.npy", Path(self.spill_dir) / f"run{run}.weights.npy"
+            np.save(paths[0], self._table[0])
+            np.save(paths[1], self._table[1])
+            self.spilled_runs.append(paths)
+            self._table = _empty_counts()
+
+    def runs(self) -> List[PairCounts]:
+        self._flush()
+        spilled = [(np.load(codes, mmap_mode="r"), np.load(weights, mmap_mode="r")) for codes, weights in self.spilled_runs]
+        return spilled + [self._table]
+
+
+def iter_merged_rows(runs: Sequence[PairCounts], num_styles: int, max_pairs_per_block: int) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Merges sorted runs into `(row id, column ids, weights)` rows, in row order.
+
+    Rows are processed in blocks sized so that roughly `max_pairs_per_block`
+    entries are read from the runs at a time.
+    """
+    total = sum(len(codes) for codes, _ in runs)
+    if not total:
+        return
+    rows_per_block = max(1, int(num_styles * max_pairs_per_block / total))
+    for first_row in range(0, num_styles, rows_per_block):
+        low, high = first_row * num_styles, min(first_row + rows_per_block, num_styles) * num_styles
+        block = []
+        for codes, weights in runs:
+            start, end = np.searchsorted(codes, [low, high])
+            block.append((np.asarray(codes[start:end]), np.asarray(weights[start:end])))
+        codes, weights = merge_counts(block)
+        if not len(codes):
+            continue
+        rows = codes // num_styles
+        boundaries = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1], True])
+        for start, end in zip(boundaries[:-1], boundaries[1:]):
+            yield int(rows[start]), codes[start:end] % num_styles, weights[start:end]
+
+
+def write_dataset_json(output: TextIO, default_styles: Iterable[str], vocabulary: Sequence[str],
+                       rows: Iterable[Tuple[int, np.ndarray, np.ndarray]], min_count: float = 1,
+                       top_n: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Streams a `suno_logic.json`-compatible document and returns the number of
+    styles (rows) and pairs written.
+
+    Each row lists its associations strongest first, keeping pairs with at least
+    `min_count` weight and, if given, only the `top_n` strongest.
+    """
+    output.write('{"default_styles": ')
+    output.write(json.dumps(sorted(default_styles), ensure_ascii=False))
+    output.write(', "co_existing_styles_dict": {')
+    styles_written = pairs_written = 0
+    separator = "\n"
+    for row, cols, weights in rows:
+        keep = weights >= min_count
+        cols, weights = cols[keep], weights[keep]
+        order = np.lexsort((cols, -weights))[:top_n]
+        if not len(order):
+            continue
+        row_dict = {vocabulary[col]: _as_weight(weight) for col, weight in zip(cols[order].tolist(), weights[order].tolist())}
+        output.write(f"{separator}{json.dumps(vocabulary[row], ensure_ascii=False)}: {json.dumps(row_dict, ensure_ascii=False)}")
+        separator = ",\n"
+        styles_written += 1
+        pairs_written += len(row_dict)
+    output.write("\n}}\n")
+    return styles_written, pairs_written
+
+
+def base_counts(co_occurrence_data, style_ids: Dict[str, int]) -> PairCounts:
+    """The pairs of an existing dataset as a sorted partial count over `style_ids`."""
+    index = get_cooccurrence_index(co_occurrence_data)
+    remap = np.array([style_ids[style] for style in index.styles], dtype=np.int64)
+    weights = index.weights.tocoo()
+    codes = remap[weights.row] * len(style_ids) + remap[weights.col]
+    return merge_counts([(codes, weights.data.astype(np.float64))])
+
+
+def iter_prompts(paths: Sequence[str], input_format: Optional[str] = None) -> Iterator[str]:
+    for path in paths:
+        reader = read_csv if (input_format or ("csv" if path.lower().endswith(".csv") else "jsonl")) == "csv" else read_jsonl
+        with _open_input(path) as source:
+            for record in reader(source):
+                if isinstance(record, InvalidRecord):
+                    logging.warning(f"Skipped in {path}: {record.error}")
+                    continue
+                yield record[1]
+
+
+def ingest_corpus(prompts: Iterable[str], default_styles: Set[str], output_path: str, base_data=None,
+                  workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  max_pairs_in_memory: int = DEFAULT_MAX_PAIRS_IN_MEMORY, min_count: float = 1,
+                  top_n: Optional[int] = None) -> Dict[str, int]:
+    """
+    Counts style co-occurrences in `prompts` (added to `base_data` if given) and
+    writes the resulting dataset to `output_path`.
+
+    Returns counts of prompts read, styles with associations and pairs written.
+    """
+    base_styles = set(get_cooccurrence_index(base_data).styles) if base_data is not None else set()
+    vocabulary = sorted(set(default_styles) | base_styles)
+    style_ids = {style: i for i, style in enumerate(vocabulary)}
+    default_list = sorted(default_styles)
+    prompt_count = 0
+
+    def counted(chunks: Iterable[List[str]]) -> Iterator[List[str]]:
+        nonlocal prompt_count
+        for chunk in chunks:
+            prompt_count += len(chunk)
+            yield chunk
+
+    with tempfile.TemporaryDirectory(prefix="suno-ingest-") as spill_dir:
+        counter = PairCounter(spill_dir, max_pairs_in_memory)
+        if base_data is not None:
+            counter.add(base_counts(base_data, style_ids))
+
+        chunks = counted(_batches(prompts, chunk_size))
+        if workers <= 1:
+            _init_worker(default_list, vocabulary)
+            for chunk in chunks:
+                counter.add(count_chunk(chunk))
+        else:
+            max_in_flight = workers * IN_FLIGHT_CHUNKS_PER_WORKER
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(default_list, vocabulary)) as pool:
+                pending = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(count_chunk, chunk))
+                    if len(pending) >= max_in_flight:
+                        counter.add(pending.popleft().result())
+                while pending:
+                    counter.add(pending.popleft().result())
+
+        rows = iter_merged_rows(counter.runs(), len(vocabulary), max_pairs_in_memory)
+        # Written next to the target and renamed, so readers never see a partial file.
+        temporary_path = Path(str(output_path) + ".tmp")
+        with open(temporary_path, "w", encoding="utf-8") as output:
+            styles_written, pairs_written = write_dataset_json(output, default_styles, vocabulary, rows, min_count, top_n)
+        temporary_path.replace(output_path)
+
+    return {"prompts": prompt_count, "styles": styles_written, "pairs": pairs_written, "spilled_runs": len(counter.spilled_runs)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Recompute style co-occurrence weights from a corpus of Suno prompts.")
+    parser.add_argument("inputs", nargs="+", help="Corpus files (.jsonl or .csv), or '-' for stdin.")
+    parser.add_argument("-o", "--output", required=True, help="Dataset JSON file to write.")
+    parser.add_argument("--base", help="Existing suno_logic.json or snapshot to add the new counts to.")
+    parser.add_argument("--styles", help="Dataset (JSON or snapshot) whose default styles form the vocabulary (default: --base).")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="Input format (default: from each file's extension, else jsonl).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (1 = in-process).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Prompts counted by a worker at a time.")
+    parser.add_argument("--max-pairs-in-memory", type=int, default=DEFAULT_MAX_PAIRS_IN_MEMORY,
+                        help="Distinct pairs held in memory before spilling a sorted run to disk.")
+    parser.add_argument("--min-count", type=float, default=1, help="Drop pairs weighing less than this.")
+    parser.add_argument("--top-n", type=int, help="Keep only each style's N strongest associations.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if not (args.styles or args.base):
+        parser.error("the style vocabulary comes from --styles or --base; give at least one")
+
+    try:
+        base_styles, base_data = load_suno_data(args.base) if args.base else (None, None)
+        default_styles = load_suno_data(args.styles)[0] if args.styles else base_styles
+    except DataLoadError as e:
+        logging.error(f"FATAL: {e}")
+        return 1
+
+    started = time.perf_counter()
+    stats = ingest_corpus(iter_prompts(args.inputs, args.format), default_styles, args.output, base_data=base_data,
+                          workers=args.workers, chunk_size=args.chunk_size, max_pairs_in_memory=args.max_pairs_in_memory,
+                          min_count=args.min_count, top_n=args.top_n)
+    elapsed = time.perf_counter() - started
+    rate = stats["prompts"] / elapsed if elapsed > 0 else 0.0
+    logging.info(f"Ingested {stats['prompts']} prompts in {elapsed:.2f}s ({rate:,.0f} prompts/sec) with {args.workers} worker(s); "
+                 f"wrote {stats['pairs']:,} pairs for {stats['styles']:,} styles to '{args.output}' "
+                 f"({stats['spilled_runs']} spilled run(s)).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# suno-prompt-analyzer/keyword_matcher.py
+
+"""
+Single-pass keyword recognition for Suno style vocabularies.
+
+The matcher compiles every style of a vocabulary into one Aho-Corasick
+automaton, so a prompt is scanned once regardless of how many styles are
+known. Matches follow the same rules as the original per-style regex
+(`\\b<style>\\b` against the lower-cased prompt), including multi-word
+styles such as "electric guitar" and styles with punctuation like "r&b".
+
+A matcher can also be given spelling variants of its styles (see
+`style_variants.py`); they are compiled into the same automaton, so they cost
+nothing extra per prompt, and each match reports the style it stands for.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Set, Tuple, Union
+
+from derived_cache import get_derived
+from style_variants import variant_index
+
+
+class KeywordSpan(NamedTuple):
+    """A recognised style and its [start, end) character span in the original prompt, which may hold a variant of it."""
+    start: int
+    end: int
+    style: str
+
+
+def _is_word_char(char: str) -> bool:
+    # Mirrors the Unicode definition of `\w` used by the `re` module.
+    return char.isalnum() or char == "_"
+
+
+class KeywordMatcher:
+    """
+    A precompiled, word-boundary-aware multi-pattern matcher.
+
+    Build it once per loaded vocabulary; `find_spans` and `extract` then run
+    in time linear in the prompt length plus the number of matches.
+    `variants` maps extra (lower-case) texts to the style each stands for;
+    variants of styles not in `styles` are ignored.
+    """
+
+    def __init__(self, styles: Iterable[str], variants: Optional[Mapping[str, str]] = None):
+        self.styles: Tuple[str, ...] = tuple(sorted({s for s in styles if s}))
+        known = set(self.styles)
+        variants = sorted((text, style) for text, style in (variants or {}).items()
+                          if style in known and text and text not in known)
+        # Each pattern is a style or a variant, and reports the style it stands for.
+        patterns = [(style, style) for style in self.styles] + variants
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for pattern_id, (text, _) in enumerate(patterns):
+            node = 0
+            for char in text:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                node = next_node
+            self._output[node] = (pattern_id,)
+
+        # Breadth-first pass to wire failure links and merge dictionary outputs,
+        # so each node reports every pattern that ends at it.
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+        self._lengths = [len(text) for text, _ in patterns]
+        self._pattern_styles = [style for _, style in patterns]
+
+    def __len__(self) -> int:
+        return len(self.styles)
+
+    @property
+    def pattern_count(self) -> int:
+        """Number of compiled patterns: the styles plus their variants."""
+        return len(self._pattern_styles)
+
+    def find_spans(self, prompt_text: str) -> List[KeywordSpan]:
+        """
+        Finds every occurrence of every style in a single pass.
+
+        Overlapping matches (e.g. "guitar" inside "electric guitar") are all
+        reported. Spans are sorted by start position, longest match first.
+        """
+        lowered = prompt_text.lower()
+        goto, fail, output, lengths, styles = self._goto, self._fail, self._output, self._lengths, self._pattern_styles
+        text_length = len(lowered)
+        raw_spans = []
+
+        node = 0
+        for index, char in enumerate(lowered):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not output[node]:
+                continue
+            end = index + 1
+            right_is_word = end < text_length and _is_word_char(lowered[end])
+            for pattern_id in output[node]:
+                start = end - lengths[pattern_id]
+                # Equivalent of `\b` on both sides of the match.
+                if (start > 0 and _is_word_char(lowered[start - 1])) == _is_word_char(lowered[start]):
+                    continue
+                if _is_word_char(lowered[index]) == right_is_word:
+                    continue
+                raw_spans.append((start, end, styles[pattern_id]))
+
+        if len(lowered) != len(prompt_text):
+            raw_spans = self._map_to_original(prompt_text, raw_spans)
+
+        raw_spans.sort(key=lambda span: (span[0], -span[1]))
+        return [KeywordSpan(*span) for span in raw_spans]
+
+    def extract(self, prompt_text: str) -> List[str]:
+        """Returns the sorted, de-duplicated styles found in the prompt."""
+        return sorted({span.style for span in self.find_spans(prompt_text)})
+
+    @staticmethod
+    def _map_to_original(prompt_text: str, spans: List[Tuple[int, int, str]]) -> List[Tuple[int, int, str]]:
+        # A few characters change length when lower-cased (e.g. 'İ'), so spans
+        # found in the lowered text are translated back to original offsets.
+        lowered_to_original = []
+        for original_index, char in enumerate(prompt_text):
+            lowered_to_original.extend([original_index] * len(char.lower()))
+        lowered_to_original.append(len(prompt_text))
+        mapped = []
+        for start, end, style in spans:
+            original_end = lowered_to_original[end - 1] + 1
+            mapped.append((lowered_to_original[start], original_end, style))
+        return mapped
+
+
+def get_keyword_matcher(valid_styles: Union[Set[str], KeywordMatcher]) -> KeywordMatcher:
+    """
+    Returns the compiled matcher for a vocabulary, with the vocabulary's
+    aliases and spelling variants, building it on first use.
+
+    Accepts either a style collection or an already-built `KeywordMatcher`.
+    Matchers are memoised per vocabulary object, which is treated as read-only.
+    """
+    if isinstance(valid_styles, KeywordMatcher):
+        return valid_styles
+    return get_derived(valid_styles, "keyword_matcher",
+                       lambda: KeywordMatcher(valid_styles, variant_index(valid_styles)))
@@ -0,0 +1,85 @@
+# suno-prompt-analyzer/pagerank.py
+
+"""
+Personalised PageRank ("gravitational pull") over the co-occurrence graph.
+
+A random walker starts at the prompt's keywords, follows associations with
+probability proportional to their weight, and jumps back to a keyword with
+probability `1 - DAMPING` at every step. The share of time it spends at each
+style ranks styles by how strongly the keywords pull towards them, through
+two-hop and longer paths as well as direct associations.
+
+The column-stochastic walk matrix is derived once per dataset; each keyword
+set then costs a sparse power iteration that stops as soon as the scores
+settle, and its result is cached.
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from cooccurrence import CooccurrenceIndex, get_cooccurrence_index
+from derived_cache import get_derived
+from result_cache import ResultCache, cached, dataset_version
+
+# Probability of following an association rather than restarting at a keyword.
+DAMPING = 0.75
+# The iteration stops once the scores move less than this in total (L1).
+TOLERANCE = 1e-5
+MAX_ITERATIONS = 100
+
+# Score vectors by (keyword set, damping, dataset version).
+PAGERANK_CACHE = ResultCache(max_entries=1024, max_bytes=64 * 1024 * 1024)
+
+
+def walk_matrix(index: CooccurrenceIndex) -> sparse.csr_matrix:
+    """
+    Transposed transition matrix of the weighted random walk: column `a` holds
+    the probabilities of stepping from style `a` to each of its associations.
+    Styles without associations get an empty column (the walker restarts).
+    """
+    out_weight = np.asarray(index.weights.sum(axis=1)).ravel()
+    scale = np.divide(1.0, out_weight, out=np.zeros_like(out_weight), where=out_weight > 0)
+    return (sparse.diags(scale) @ index.weights).T.tocsr()
+
+
+def get_walk_matrix(co_occurrence_data: Dict) -> sparse.csr_matrix:
+    """The walk matrix of a loaded dataset, built on first use."""
+    return get_derived(co_occurrence_data, "walk_matrix", lambda: walk_matrix(get_cooccurrence_index(co_occurrence_data)))
+
+
+def personalized_pagerank(walk_t: sparse.csr_matrix, seed_ids: Sequence[int], damping: float = DAMPING,
+                          tolerance: float = TOLERANCE, max_iterations: int = MAX_ITERATIONS) -> np.ndarray:
+    """
+    Visit probabilities of a walk restarting uniformly at the seed styles, by
+    power iteration from the restart distribution. Mass that reaches a style
+    without associations restarts too, so the result always sums to 1.
+    """
+    restart = np.zeros(walk_t.shape[0])
+    seed_ids = np.unique(np.asarray(seed_ids, dtype=np.int64))
+    if not len(seed_ids):
+        return restart
+    restart[seed_ids] = 1.0 / len(seed_ids)
+    scores = restart
+    for _ in range(max_iterations):
+        walked = damping * (walk_t @ scores)
+        updated = walked + (1.0 - walked.sum()) * restart
+        change = np.abs(updated - scores).sum()
+        scores = updated
+        if change < tolerance:
+            break
+    return scores
+
+
+def _pagerank_key(keywords: List[str], co_occurrence_data: Dict, damping: float = DAMPING) -> tuple:
+    return (tuple(sorted(set(keywords))), damping, dataset_version(co_occurrence_data))
+
+
+@cached(PAGERANK_CACHE, _pagerank_key)
+def pagerank_scores(keywords: List[str], co_occurrence_data: Dict, damping: float = DAMPING) -> np.ndarray:
+    """Personalised PageRank from the given keywords, as a dense vector over the index's styles."""
+    index = get_cooccurrence_index(co_occurrence_data)
+    scores = personalized_pagerank(get_walk_matrix(co_occurrence_data), index.ids(keywords), damping)
+    scores.setflags(write=False)  # Shared through the cache
+    return scores
@@ -0,0 +1,198 @@
+# suno-prompt-analyzer/result_cache.py
+
+"""
+Bounded, framework-independent cache for analysis results.
+
+Entries are keyed on normalised call inputs plus a dataset version fingerprint
+rather than on the dataset itself, so a lookup never hashes the co-occurrence
+data. The cache works the same inside Streamlit, worker processes and CLIs.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+
+from derived_cache import get_derived
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    expires_at: Optional[float]
+
+
+class ResultCache:
+    """
+    A thread-safe LRU cache with optional TTL, entry-count and byte limits.
+
+    Args:
+        max_entries: Maximum number of cached results.
+        max_bytes: Maximum total (pickled) size of cached results, or None for no limit.
+            Values with an `estimated_size()` method are measured by it instead; values
+            that grow after insertion (e.g. lazily built sections) can also offer
+            `add_size_listener(callback)` and call `callback(added_bytes)` as they grow.
+        ttl_seconds: Lifetime of an entry, or None to keep entries until evicted.
+        clock: Time source in seconds; injectable for tests.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the cached value for `key`, or `default` if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= self._clock():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Stores a value, evicting least recently used entries to respect the limits."""
+        size = _estimate_size(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = _Entry(value, size, expires_at)
+            self._total_bytes += size
+            self._evict()
+        add_size_listener = getattr(value, "add_size_listener", None)
+        if self.max_bytes is not None and callable(add_size_listener):
+            add_size_listener(lambda added_bytes: self._grow(key, value, added_bytes))
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Returns the cached value for `key`, computing and storing it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drops every entry; the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters and current occupancy."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _grow(self, key: Hashable, value: Any, added_bytes: int) -> None:
+        """Charges an entry's growth to it, evicting to stay within the byte limit."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.value is not value:
+                return
+            self._entries[key] = entry._replace(size=entry.size + added_bytes)
+            self._total_bytes += added_bytes
+            self._evict()
+
+    def _evict(self) -> None:
+        # Least recently used first; an entry that alone exceeds the byte limit goes too.
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self._total_bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
+
+
+def _estimate_size(value: Any) -> int:
+    # Lazily computed values report their own size; pickling them would force every section.
+    estimated_size = getattr(value, "estimated_size", None)
+    if callable(estimated_size):
+        return estimated_size()
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return 0
+
+
+def dataset_version(source: Any) -> str:
+    """
+    A content fingerprint of a loaded dataset object (style set or co-occurrence dict).
+
+    It is computed once per object and reused, so cache keys stay cheap to build.
+    """
+    return get_derived(source, "dataset_version", lambda: _fingerprint(source))
+
+
+def _fingerprint(source: Any) -> str:
+    # Snapshot-backed data carries the checksum of its file; no need to serialise it.
+    fingerprint = getattr(source, "fingerprint", None)
+    if isinstance(fingerprint, str):
+        return fingerprint
+    if isinstance(source, (set, frozenset)):
+        source = sorted(source)
+    payload = json.dumps(source, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def cached(cache: ResultCache, key_func: Callable[..., Hashable],
+           normalize: Optional[Dict[str, Callable[[Any], Any]]] = None) -> Callable:
+    """
+    Decorator memoising a function in `cache` under `key_func(*args, **kwargs)`.
+
+    `normalize` maps parameter names to functions applied to those arguments
+    before both the key and the call, so every call sharing a cache entry also
+    computes from identical inputs. The wrapped function exposes its cache as
+    `.cache`; the original stays reachable through `__wrapped__`.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func) if normalize else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if signature is not None:
+                bound = signature.bind(*args, **kwargs)
+                for name, normalise in normalize.items():
+                    if name in bound.arguments:
+                        bound.arguments[name] = normalise(bound.arguments[name])
+                args, kwargs = bound.args, bound.kwargs
+            key = (func.__qualname__, key_func(*args, **kwargs))
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs))
+        wrapper.cache = cache
+        return wrapper
+    return decorator
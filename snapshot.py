@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# suno-prompt-analyzer/snapshot.py
+
+"""
+Versioned binary snapshots of the Suno style data, loaded by memory mapping.
+
+A snapshot holds everything `load_suno_data` derives from `suno_logic.json` in
+flat little-endian arrays: a string table, the co-occurrence CSR matrix
+(offsets, column ids, weights), its transpose, the per-style top-K arrays, the
+bridge-candidate index and the default-style ids. Loading maps the file
+read-only and wraps the arrays in place, so processes opening the same snapshot
+share one page-cache copy and no nested Python dicts are built.
+
+File layout (all sections 64-byte aligned, in this order):
+    header              `_HEADER` struct: magic, version, counts, index width,
+                        BLAKE2b checksum of everything after the header
+    string offsets      int64[n_strings + 1] into the UTF-8 string blob
+    string blob         UTF-8 bytes of every style; ids < n_styles are the
+                        co-occurrence styles in sorted order, the rest are
+                        default styles without co-occurrence data
+    default style ids   int32[n_defaults]
+    row key ids         int32[n_keys], styles that are keys of `co_existing_styles_dict`
+    indptr, indices     CSR offsets and column ids (int32, or int64 for huge data)
+    weights             float64[nnz]
+    indptr_t, indices_t, weights_t
+                        the same for the transposed matrix
+    top-K ids, weights  int32 / float64 [n_styles, top_k]
+    bridge pair codes, offsets, link ids, link scores
+                        the `BridgeIndex` arrays: int64[n_pairs], int64[n_pairs + 1],
+                        int32[n_links], float64[n_links]
+
+Usage:
+    python snapshot.py data/suno_logic.json data/suno_logic.snap
+"""
+
+import argparse
+import hashlib
+import logging
+import mmap
+import struct
+import sys
+import time
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+from bridges import BridgeIndex, get_bridge_index
+from cooccurrence import DEFAULT_TOP_K, CooccurrenceIndex, _as_weight, get_cooccurrence_index
+
+SNAPSHOT_MAGIC = b"SUNOSNAP"
+SNAPSHOT_VERSION = 2
+
+# magic, version, top_k, index itemsize, n_styles, n_strings, n_defaults, n_keys, nnz, blob bytes,
+# bridge pairs, bridge links, bridge fan-in (0 = uncapped), checksum
+_HEADER = struct.Struct("<8sIIIQQQQQQQQQ16s")
+_ALIGNMENT = 64
+_CHECKSUM_BYTES = 16
+
+
+class SnapshotFormatError(ValueError):
+    """The file is not a snapshot this version can read, or its contents are inconsistent."""
+
+
+def is_snapshot(path: Union[str, Path]) -> bool:
+    """True if the file starts with the snapshot magic bytes."""
+    with open(path, "rb") as f:
+        return f.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _layout(index_dtype: np.dtype, n_styles: int, n_strings: int, n_defaults: int, n_keys: int,
+            nnz: int, blob_bytes: int, top_k: int, n_pairs: int, n_links: int) -> List[Tuple[str, np.dtype, int]]:
+    """Section names, dtypes and element counts, in file order."""
+    return [
+        ("string_offsets", np.dtype("<i8"), n_strings + 1),
+        ("string_blob", np.dtype("u1"), blob_bytes),
+        ("default_ids", np.dtype("<i4"), n_defaults),
+        ("key_ids", np.dtype("<i4"), n_keys),
+        ("indptr", index_dtype, n_styles + 1),
+        ("indices", index_dtype, nnz),
+        ("weights", np.dtype("<f8"), nnz),
+        ("indptr_t", index_dtype, n_styles + 1),
+        ("indices_t", index_dtype, nnz),
+        ("weights_t", np.dtype("<f8"), nnz),
+        ("top_k_ids", np.dtype("<i4"), n_styles * top_k),
+        ("top_k_weights", np.dtype("<f8"), n_styles * top_k),
+        ("bridge_pair_codes", np.dtype("<i8"), n_pairs),
+        ("bridge_offsets", np.dtype("<i8"), n_pairs + 1),
+        ("bridge_link_ids", np.dtype("<i4"), n_links),
+        ("bridge_link_scores", np.dtype("<f8"), n_links),
+    ]
+
+
+def _section_offsets(layout: List[Tuple[str, np.dtype, int]]) -> List[int]:
+    offsets, offset = [], _align(_HEADER.size)
+    for _, dtype, count in layout:
+        offsets.append(offset)
+        offset = _align(offset + dtype.itemsize * count)
+    return offsets
+
+
+def write_snapshot(path: Union[str, Path], default_styles: Set[str], co_occurrence_data: Dict[str, Dict[str, float]],
+                   top_k: int = DEFAULT_TOP_K) -> str:
+    """
+    Compiles a loaded dataset into a snapshot file and returns its checksum (hex).
+
+    The file is written to a temporary name and renamed into place, so readers
+    never map a half-written snapshot.
+    """
+    index = get_cooccurrence_index(co_occurrence_data, top_k=top_k)
+    if index.top_k_size != top_k:
+        index = CooccurrenceIndex.from_dict(co_occurrence_data, top_k=top_k)
+    bridges = get_bridge_index(co_occurrence_data)
+    extra_styles = sorted(set(default_styles) - set(index.style_ids))
+    strings = index.styles + extra_styles
+    string_ids = {style: i for i, style in enumerate(strings)}
+
+    encoded = [style.encode("utf-8") for style in strings]
+    string_offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+    string_offsets[1:] = np.cumsum([len(b) for b in encoded])
+    blob = np.frombuffer(b"".join(encoded), dtype="u1")
+
+    nnz = index.weights.nnz
+    index_dtype = np.dtype("<i4") if max(nnz, len(strings)) < 2 ** 31 else np.dtype("<i8")
+    arrays = {
+        "string_offsets": string_offsets,
+        "string_blob": blob,
+        "default_ids": np.array(sorted(string_ids[style] for style in default_styles), dtype="<i4"),
+        "key_ids": np.array(sorted(index.style_ids[style] for style in co_occurrence_data), dtype="<i4"),
+        "indptr": index.weights.indptr,
+        "indices": index.weights.indices,
+        "weights": index.weights.data,
+        "indptr_t": index.weights_t.indptr,
+        "indices_t": index.weights_t.indices,
+        "weights_t": index.weights_t.data,
+        "top_k_ids": index.top_k_ids.ravel(),
+        "top_k_weights": index.top_k_weights.ravel(),
+        "bridge_pair_codes": bridges.pair_codes,
+        "bridge_offsets": bridges.offsets,
+        "bridge_link_ids": bridges.link_ids,
+        "bridge_link_scores": bridges.link_scores,
+    }
+    layout = _layout(index_dtype, len(index.styles), len(strings), len(arrays["default_ids"]),
+                     len(arrays["key_ids"]), nnz, len(blob), top_k, len(bridges), len(bridges.link_ids))
+
+    path = Path(path)
+    temporary_path = path.with_name(path.name + ".tmp")
+    checksum = hashlib.blake2b(digest_size=_CHECKSUM_BYTES)
+    with open(temporary_path, "wb") as f:
+        f.write(b"\0" * _align(_HEADER.size))
+        for (name, dtype, count), offset in zip(layout, _section_offsets(layout)):
+            data = np.ascontiguousarray(arrays[name], dtype=dtype).tobytes()
+            assert len(data) == dtype.itemsize * count, name
+            padding = b"\0" * (offset - f.tell())
+            checksum.update(padding)
+            checksum.update(data)
+            f.write(padding)
+            f.write(data)
+        f.seek(0)
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, top_k, index_dtype.itemsize, len(index.styles),
+                             len(strings), len(arrays["default_ids"]), len(arrays["key_ids"]), nnz, len(blob),
+                             len(bridges), len(bridges.link_ids), bridges.fan_in or 0, checksum.digest()))
+    temporary_path.replace(path)
+    return checksum.hexdigest()
+
+
+class SnapshotRow(Mapping):
+    """Read-only `{associated style: weight}` view of one CSR row."""
+
+    __slots__ = ("_snapshot", "_ids", "_weights")
+
+    def __init__(self, snapshot: "CooccurrenceSnapshot", ids: np.ndarray, weights: np.ndarray):
+        self._snapshot = snapshot
+        self._ids = ids
+        self._weights = weights
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        styles = self._snapshot.index.styles
+        return (styles[i] for i in self._ids.tolist())
+
+    def __getitem__(self, style: str) -> float:
+        style_id = self._snapshot.index.style_ids.get(style)
+        if style_id is not None:
+            position = int(np.searchsorted(self._ids, style_id))
+            if position < len(self._ids) and self._ids[position] == style_id:
+                return _as_weight(float(self._weights[position]))
+        raise KeyError(style)
+
+    def items(self):
+        styles = self._snapshot.index.styles
+        return [(styles[i], _as_weight(w)) for i, w in zip(self._ids.tolist(), self._weights.tolist())]
+
+
+class CooccurrenceSnapshot(Mapping):
+    """
+    Read-only stand-in for `co_existing_styles_dict`, backed by a mapped snapshot.
+
+    Supports the dict operations the analysis code uses (`get`, `[]`, `in`,
+    iteration, `.items()` on rows); rows are lazy views over the CSR arrays and
+    list associated styles in style order. `index` and `bridge_index` are ready
+    built over the same arrays.
+
+    Attributes:
+        index: The `CooccurrenceIndex` sharing the mapped arrays.
+        bridge_index: The `BridgeIndex` sharing the mapped arrays.
+        fingerprint: Hex checksum of the snapshot, used as its dataset version.
+    """
+
+    def __init__(self, index: CooccurrenceIndex, bridge_index: BridgeIndex, key_ids: np.ndarray, fingerprint: str):
+        self.index = index
+        self.bridge_index = bridge_index
+        self.fingerprint = fingerprint
+        self._key_ids = key_ids
+
+    def _key_id(self, style: Any) -> Optional[int]:
+        style_id = self.index.style_ids.get(style)
+        if style_id is None:
+            return None
+        position = int(np.searchsorted(self._key_ids, style_id))
+        return style_id if position < len(self._key_ids) and self._key_ids[position] == style_id else None
+
+    def __len__(self) -> int:
+        return len(self._key_ids)
+
+    def __iter__(self) -> Iterator[str]:
+        styles = self.index.styles
+        return (styles[i] for i in self._key_ids.tolist())
+
+    def __contains__(self, style: Any) -> bool:
+        return self._key_id(style) is not None
+
+    def __getitem__(self, style: str) -> SnapshotRow:
+        style_id = self._key_id(style)
+        if style_id is None:
+            raise KeyError(style)
+        weights = self.index.weights
+        start, end = weights.indptr[style_id], weights.indptr[style_id + 1]
+        return SnapshotRow(self, weights.indices[start:end], weights.data[start:end])
+
+
+def load_snapshot(path: Union[str, Path], verify: bool = False) -> Tuple[Set[str], CooccurrenceSnapshot]:
+    """
+    Maps a snapshot read-only and returns `(default styles, co-occurrence mapping)`.
+
+    Only the string table is decoded; every numeric array is a view into the
+    mapping. The header and section sizes are always validated; `verify` also
+    recomputes the checksum, which reads the whole file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        SnapshotFormatError: If the file is not a readable snapshot or fails verification.
+    """
+    with open(path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:  # Empty file.
+            raise SnapshotFormatError(f"'{path}' is not a style data snapshot.") from e
+
+    if len(mapped) < _HEADER.size or mapped[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise SnapshotFormatError(f"'{path}' is not a style data snapshot.")
+    (_, version, top_k, index_itemsize, n_styles, n_strings, n_defaults, n_keys, nnz, blob_bytes,
+     n_pairs, n_links, fan_in, checksum) = _HEADER.unpack_from(mapped)
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotFormatError(f"Snapshot '{path}' has format version {version}; this loader reads version {SNAPSHOT_VERSION}. "
+                                  f"Recompile it with snapshot.py.")
+    if index_itemsize not in (4, 8):
+        raise SnapshotFormatError(f"Snapshot '{path}' has an invalid index width ({index_itemsize}).")
+
+    layout = _layout(np.dtype(f"<i{index_itemsize}"), n_styles, n_strings, n_defaults, n_keys, nnz, blob_bytes, top_k,
+                     n_pairs, n_links)
+    offsets = _section_offsets(layout)
+    end = offsets[-1] + layout[-1][1].itemsize * layout[-1][2]
+    if len(mapped) < end:
+        raise SnapshotFormatError(f"Snapshot '{path}' is truncated ({len(mapped)} of {end} bytes).")
+    if verify and hashlib.blake2b(memoryview(mapped)[_align(_HEADER.size):end], digest_size=_CHECKSUM_BYTES).digest() != checksum:
+        raise SnapshotFormatError(f"Snapshot '{path}' failed checksum verification.")
+
+    sections = {name: np.frombuffer(mapped, dtype=dtype, count=count, offset=offset)
+                for (name, dtype, count), offset in zip(layout, offsets)}
+
+    blob = memoryview(mapped)[offsets[1]:offsets[1] + blob_bytes]
+    bounds = sections["string_offsets"].tolist()
+    strings = [str(blob[start:stop], "utf-8") for start, stop in zip(bounds, bounds[1:])]
+
+    shape = (n_styles, n_styles)
+    weights = sparse.csr_matrix((sections["weights"], sections["indices"], sections["indptr"]), shape=shape, copy=False)
+    weights_t = sparse.csr_matrix((sections["weights_t"], sections["indices_t"], sections["indptr_t"]), shape=shape, copy=False)
+    top_k_arrays = (sections["top_k_ids"].reshape(n_styles, top_k), sections["top_k_weights"].reshape(n_styles, top_k))
+    index = CooccurrenceIndex(strings[:n_styles], weights, weights_t=weights_t, top_k_arrays=top_k_arrays)
+    bridge_index = BridgeIndex(n_styles, sections["bridge_pair_codes"], sections["bridge_offsets"],
+                               sections["bridge_link_ids"], sections["bridge_link_scores"], fan_in or None)
+
+    default_styles = {strings[i] for i in sections["default_ids"].tolist()}
+    return default_styles, CooccurrenceSnapshot(index, bridge_index, sections["key_ids"], checksum.hex())
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile suno_logic.json into a memory-mappable binary snapshot.")
+    parser.add_argument("source", help="Path to suno_logic.json.")
+    parser.add_argument("output", help="Snapshot file to write.")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K, help="Strongest associations presorted per style.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    from data_loader import DataLoadError, load_suno_data
+
+    started = time.perf_counter()
+    try:
+        default_styles, co_occurrence_data = load_suno_data(args.source, top_k=args.top_k)
+    except DataLoadError as e:
+        logging.error(f"FATAL: {e}")
+        return 1
+    checksum = write_snapshot(args.output, default_styles, co_occurrence_data, top_k=args.top_k)
+    logging.info(f"Wrote snapshot '{args.output}' ({Path(args.output).stat().st_size:,} bytes, checksum {checksum}) "
+                 f"in {time.perf_counter() - started:.2f}s.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
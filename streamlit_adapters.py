@@ -0,0 +1,42 @@
+# suno-prompt-analyzer/streamlit_adapters.py
+
+"""
+Thin Streamlit wrappers around the framework-independent analysis core.
+
+Everything that touches `st.*` for data loading lives here, so `analyzer` and
+`data_loader` stay importable from batch jobs, workers and CLIs.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Set, Tuple, Union
+
+import streamlit as st
+
+from cooccurrence import DEFAULT_TOP_K
+from data_loader import DataFileNotFoundError, DataFormatError, load_suno_data
+from embeddings import get_style_embeddings
+
+
+# Resource caching shares the same read-only objects across reruns and sessions
+# (cache_data would hand back a fresh copy, defeating the derived-structure caches).
+@st.cache_resource(show_spinner=False)
+def _load_shared_data(path: str, top_k: int) -> Tuple[Set[str], Dict[str, Any]]:
+    default_styles, co_occurrence_data = load_suno_data(path, top_k)
+    # Built with the data rather than on the first Style Explorer run, which lists similar styles.
+    get_style_embeddings(co_occurrence_data)
+    return default_styles, co_occurrence_data
+
+
+def load_app_data(path: Union[str, Path], top_k: int = DEFAULT_TOP_K) -> Tuple[Set[str], Dict[str, Any]]:
+    """
+    Loads the Suno style data once per server process and stops the script
+    with a visible error if the data file is missing or malformed.
+    """
+    try:
+        return _load_shared_data(str(path), top_k)
+    except DataFileNotFoundError:
+        st.error(f"FATAL: Data file not found at '{path}'. Please make sure 'suno_logic.json' is in the 'data' subfolder.")
+        st.stop()
+    except DataFormatError as e:
+        st.error(f"FATAL: {e}")
+        st.stop()
@@ -10,6 +10,9 @@ Each entry can contain:
 - "adjectives": A list of words describing the style's texture and feel.
 - "energy": A short phrase describing the typical mood, tempo, or dynamic arc.
 - "vocal_style": A description of the common vocal performance associated with the style.
+
+It also holds STYLE_ALIASES, the other names prompts commonly use for a style,
+which keyword recognition maps back to the style itself.
 """
 
 
@@ -511,3 +514,31 @@ STYLE_PERSONALITY_DICT = {
     },
 
 }
+
+
+# --- Alternative Names ---
+# Curated alternative names for styles, keyed by the style they stand for. Spelling
+# variants (hyphens, spacing, plurals, common typos) are derived automatically and
+# need not be listed here; see style_variants.py. Compound words are only split
+# where both parts are vocabulary words, so other splits are listed.
+STYLE_ALIASES = {
+    "r&b": ["rnb", "r and b", "r n b", "r'n'b", "rhythm and blues"],
+    "drum and bass": ["dnb", "d&b", "drum & bass", "drum n bass", "drum 'n' bass", "drum'n'bass"],
+    "edm": ["electronic dance music"],
+    "electronic": ["electronica"],
+    "80s": ["80's", "1980s", "eighties"],
+    "90s": ["90's", "1990s", "nineties"],
+    "orchestral": ["orchestra"],
+    "male vocals": ["male vocalist", "male singer"],
+    "female vocals": ["female vocalist"],
+    "alternative rock": ["alt rock", "alt-rock"],
+    "progressive": ["prog"],
+    "psychedelic": ["psych", "psychedelia"],
+    "synth": ["synthesizer", "synthesiser"],
+    "synthwave": ["retrowave", "synth wave"],
+    "lo-fi": ["low-fi"],
+    "upbeat": ["up-beat"],
+    "chill": ["chillout", "chill-out"],
+    "opera": ["operatic"],
+    "violin": ["fiddle"],
+}
@@ -0,0 +1,156 @@
+# suno-prompt-analyzer/style_variants.py
+
+"""
+Precomputed spelling variants for style recognition.
+
+`variant_index` maps every way a prompt is likely to write a style that is not
+the style itself to the style it stands for:
+
+- curated aliases from `STYLE_ALIASES` ("rnb" for "r&b", "eighties" for "80s");
+- separator variants: hyphens, spaces or nothing between words ("hip-hop",
+  "hiphop", "lofi"), and compounds split where both parts are vocabulary words
+  ("electro pop", "electro-pop");
+- singular and plural forms of a last word that names an instrument, voice or
+  part of a track ("female vocal", "beats"), from the curated `PLURAL_NOUNS`;
+- typos one edit away inside words of `MIN_FUZZY_LENGTH` letters or more: a
+  dropped letter, two swapped neighbours or a doubled letter ("agressive",
+  "atmosphreic", "accoustic"). Only these edits are generated, not every
+  edit-distance-1 string, which keeps the index a few dozen entries per style.
+
+The index is built once per vocabulary and compiled into the keyword matcher
+alongside the styles, so variants are recognised in the same single scan as
+exact matches and fuzzy matching adds nothing per prompt.
+
+When several styles claim the same variant, the strongest kind of claim wins
+(a style's own name, then an alias, then a spelling variant, then a typo); a
+variant claimed equally strongly by two styles is ambiguous and left out. So
+a style in the vocabulary is always recognised as itself: near-duplicates such
+as "male voice" and "male vocals" stay separate styles.
+"""
+
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+from style_definitions import STYLE_ALIASES
+
+# Claim strengths, strongest first.
+EXACT, ALIAS, SPELLING, TYPO = range(4)
+
+# Nouns whose plural is the noun plus "s", the only words given a singular or plural
+# variant. Genre and mood words are left out: "folks", "darks" or "smooths" are
+# either not words or mean something else ("hey folks").
+PLURAL_NOUNS = {
+    "ballad", "banjo", "beat", "bell", "cello", "chant", "choir", "chord", "drop", "drum",
+    "flute", "guitar", "harp", "hook", "horn", "keyboard", "loop", "organ", "pad", "piano",
+    "riff", "sample", "saxophone", "singer", "string", "synth", "trumpet", "ukulele",
+    "violin", "vocal", "voice",
+}
+# Shortest part of a compound word split into two ("synthwave" -> "synth wave").
+MIN_COMPOUND_PART = 2
+# Shortest word that typo variants are generated for.
+MIN_FUZZY_LENGTH = 7
+# Typo variants outnumber all others about five to one, so vocabularies larger than
+# this get aliases and spelling variants only, keeping the build to about a second.
+MAX_TYPO_VOCABULARY = 2_000
+# Real words one edit away from a style, never read as typos of it.
+FUZZY_EXCLUSIONS = {"county", "elector", "romanic"}
+
+
+def variant_index(styles: Iterable[str], aliases: Optional[Mapping[str, Iterable[str]]] = None) -> Dict[str, str]:
+    """
+    Maps each unambiguous variant of the given styles to its style. Aliases
+    default to `STYLE_ALIASES`; only those of styles in the vocabulary are used.
+    Typos are left out for vocabularies of more than `MAX_TYPO_VOCABULARY` styles.
+    """
+    styles = sorted({style for style in styles if style})
+    with_typos = len(styles) <= MAX_TYPO_VOCABULARY
+    aliases = STYLE_ALIASES if aliases is None else aliases
+    vocabulary_words = {word for style in styles for word in style.split()}
+    claims: Dict[str, Tuple[int, Set[str]]] = {}
+
+    def claim(text: str, style: str, strength: int) -> None:
+        current = claims.get(text)
+        if current is None or strength < current[0]:
+            claims[text] = (strength, {style})
+        elif strength == current[0]:
+            current[1].add(style)
+
+    for style in styles:
+        claim(style, style, EXACT)
+        names = [style]
+        for alias in aliases.get(style, ()):
+            alias = alias.lower()
+            claim(alias, style, ALIAS)
+            names.append(alias)
+        for name in names:
+            # Only the style's own name is split into compounds; aliases are taken as written.
+            for variant in spelling_variants(name, vocabulary_words if name == style else frozenset()):
+                claim(variant, style, SPELLING)
+        for variant in typo_variants(style) if with_typos else ():
+            claim(variant, style, TYPO)
+
+    return {text: next(iter(owners)) for text, (strength, owners) in claims.items()
+            if strength != EXACT and len(owners) == 1}
+
+
+def spelling_variants(text: str, vocabulary_words: Set[str] = frozenset()) -> Set[str]:
+    """
+    Separator and plural variants of a style name, excluding the name itself.
+    Single words are also split into two where both parts are in `vocabulary_words`.
+    """
+    forms = {text, *_compound_splits(text, vocabulary_words)}
+    forms.update([plural for form in forms for plural in _plural_forms(form)])
+    forms.update([variant for form in forms for variant in _separator_forms(form)])
+    forms.discard(text)
+    return forms
+
+
+def typo_variants(text: str) -> Set[str]:
+    """Every single deletion, adjacent transposition and doubled letter within the style's long words."""
+    variants = set()
+    position = 0
+    for word in text.split(" "):
+        if len(word) >= MIN_FUZZY_LENGTH and word.isalpha():
+            prefix, suffix = text[:position], text[position + len(word):]
+            variants.update(prefix + edited + suffix for edited in _word_edits(word))
+        position += len(word) + 1
+    variants.discard(text)
+    return {variant for variant in variants if not FUZZY_EXCLUSIONS.intersection(variant.split())}
+
+
+def _word_edits(word: str) -> Iterator[str]:
+    for i in range(len(word)):
+        yield word[:i] + word[i + 1:]
+        yield word[:i] + word[i] + word[i:]
+        if i + 1 < len(word) and word[i] != word[i + 1]:
+            yield word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def _plural_forms(text: str) -> List[str]:
+    head, _, last = text.rpartition(" ")
+    head = head + " " if head else ""
+    if last in PLURAL_NOUNS:
+        return [head + last + "s"]
+    if last.endswith("s") and last[:-1] in PLURAL_NOUNS:
+        return [head + last[:-1]]
+    return []
+
+
+def _separator_forms(text: str) -> Set[str]:
+    forms = set()
+    for separator in (" ", "-"):
+        parts = text.split(separator)
+        if len(parts) > 1 and all(parts):
+            forms.update(joiner.join(parts) for joiner in (" ", "-", ""))
+    return forms
+
+
+def _compound_splits(text: str, vocabulary_words: Set[str]) -> Set[str]:
+    if not text.isalpha():
+        return set()
+    splits = set()
+    for i in range(MIN_COMPOUND_PART, len(text) - MIN_COMPOUND_PART + 1):
+        left, right = text[:i], text[i:]
+        # One known half is not enough: it splits "electronic" into "electro nic".
+        if left in vocabulary_words and right in vocabulary_words:
+            splits.add(f"{left} {right}")
+    return splits
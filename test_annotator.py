@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Tests for the span-based prompt annotator."""
+
+import re
+from pathlib import Path
+
+from analyzer import create_annotated_prompt_html, extract_keyword_spans, extract_keywords, format_label
+from data_loader import load_suno_data
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_suno_data(DATA_FILE)
+
+
+def regex_annotated_prompt_html(prompt_text, recognized_keywords, co_occurrence_data):
+    """The original substitute-per-keyword implementation, kept as the reference."""
+    annotated_html = prompt_text
+    for keyword in sorted(recognized_keywords, key=len, reverse=True):
+        top_associations = co_occurrence_data.get(keyword, {})
+        if top_associations:
+            sorted_assocs = sorted(top_associations.items(), key=lambda x: x[1], reverse=True)[:4]
+            tooltip_content = "&#10;".join([f"• {format_label(style)}: {weight:,}" for style, weight in sorted_assocs])
+        else:
+            tooltip_content = "No direct associations found."
+        replacement_html = f'<span class="highlight-keyword" data-tooltip="{tooltip_content}">{keyword}</span>'
+        pattern = re.compile(r'\b(' + re.escape(keyword) + r')\b(?![^<]*>)', re.IGNORECASE)
+        annotated_html = pattern.sub(replacement_html, annotated_html)
+    return annotated_html.replace("\n", "<br>")
+
+
+def test_matches_reference_for_non_overlapping_keywords():
+    prompt = "[Verse]\nA DARK cinematic Rock anthem with a Piano intro.\n[Chorus]\nEpic rock, pop hooks and Jazz piano.\n" * 20
+    keywords = extract_keywords(prompt, DEFAULT_STYLES)
+    assert keywords
+    expected = regex_annotated_prompt_html(prompt, keywords, CO_OCCURRENCE_DATA)
+    assert create_annotated_prompt_html(prompt, keywords, CO_OCCURRENCE_DATA) == expected
+    spans = extract_keyword_spans(prompt, DEFAULT_STYLES)
+    assert create_annotated_prompt_html(prompt, keywords, CO_OCCURRENCE_DATA, spans) == expected
+
+
+def test_overlapping_keywords_resolve_longest_first():
+    prompt = "Heavy electric guitar and deep house music."
+    keywords = ["deep house", "electric guitar", "guitar", "house", "house music"]
+    html = create_annotated_prompt_html(prompt, keywords, {})
+    assert html.count('<span class="highlight-keyword"') == 2
+    assert '>electric guitar</span>' in html and '>guitar</span>' not in html
+    assert 'deep <span class="highlight-keyword" data-tooltip="No direct associations found.">house music</span>.' in html
+
+
+def test_rescans_with_the_vocabulary_matcher():
+    prompt = "Lofi hip-hop beats with dreamy pianos."
+    keywords = extract_keywords(prompt, DEFAULT_STYLES)
+    html = create_annotated_prompt_html(prompt, keywords, CO_OCCURRENCE_DATA, valid_styles_set=DEFAULT_STYLES)
+    assert html == create_annotated_prompt_html(prompt, keywords, CO_OCCURRENCE_DATA, extract_keyword_spans(prompt, DEFAULT_STYLES))
+    assert '>piano</span>' in html
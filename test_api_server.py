@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Tests for the HTTP analysis service."""
+
+from pathlib import Path
+
+from starlette.testclient import TestClient
+
+from analyzer import prepare_analysis_results, similar_styles
+from api_server import create_app
+from data_loader import load_suno_data
+from embeddings import StyleEmbeddings
+from fake_gemini_server import FakeGeminiServer
+from gemini_service import GeminiService
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_suno_data(DATA_FILE)
+PROMPT = "Dark cinematic rock with jazz piano and male vocals."
+
+
+def _client(**kwargs) -> TestClient:
+    return TestClient(create_app(str(DATA_FILE), **kwargs))
+
+
+def test_analyze_matches_the_core():
+    with _client() as client:
+        assert client.get("/health").json() == {"status": "ok", "styles": len(DEFAULT_STYLES)}
+        response = client.post("/analyze", json={"prompt": PROMPT, "negative_keywords": "pop, Metal"})
+        assert response.status_code == 200
+        expected = prepare_analysis_results(PROMPT, ["pop", "metal"], DEFAULT_STYLES, CO_OCCURRENCE_DATA)
+        assert response.json()["cohesion_score"] == expected["cohesion_score"]
+        assert response.json()["recognized_keywords"] == expected["recognized_keywords"]
+
+        summary = client.post("/analyze", json={"prompt": PROMPT, "summary": True, "id": 7, "cohesion_mode": "weighted",
+                                                 "fingerprint_mode": "pagerank"}).json()
+        assert summary["id"] == 7 and set(summary) == {"id", "keywords", "cohesion", "fingerprint", "suggestion"}
+
+
+def test_batch_and_validation():
+    with _client() as client:
+        response = client.post("/analyze/batch", json={"prompts": [PROMPT, {"id": "b", "prompt": "no styles here"}]})
+        results = response.json()["results"]
+        assert [result["id"] for result in results] == [0, "b"]
+        assert "error" in results[1]
+
+        assert client.post("/analyze", content=b"{oops").status_code == 400
+        assert client.post("/analyze", json={"prompt": ""}).status_code == 400
+        assert client.post("/analyze", json={"prompt": PROMPT, "cohesion_mode": "fuzzy"}).status_code == 400
+        assert client.post("/analyze", json={"prompt": PROMPT, "fingerprint_mode": "eigen"}).status_code == 400
+        assert client.post("/analyze/batch", json={"prompts": []}).status_code == 400
+        assert client.post("/analyze", json={"prompt": PROMPT, "negative_keywords": 5}).status_code == 400
+        assert client.post("/analyze", json={"prompt": PROMPT, "negative_keywords": [1]}).status_code == 400
+        assert client.post("/analyze/batch", json={"prompts": [{"prompt": PROMPT, "negative_keywords": {"pop": 1}}]}).status_code == 400
+        assert client.post("/explore", json={"primary_style": "rock", "negative_keywords": [None]}).status_code == 400
+        assert client.post("/explore", json={"primary_style": "not-a-style"}).status_code == 400
+
+
+def test_explore():
+    with _client() as client:
+        result = client.post("/explore", json={"primary_style": "Rock", "secondary_style": "jazz"}).json()
+        assert result["creative_brief"]
+
+
+def test_generate_and_stream_through_fake_gemini():
+    with FakeGeminiServer(stream_chunk_size=5) as server:
+        service = GeminiService(base_url=server.base_url, system_instruction="Be brief.")
+        try:
+            with _client(gemini_service=service) as client:
+                assert client.post("/generate", json={"creative_brief": "brief"}).status_code == 401
+                headers = {"X-Gemini-Api-Key": "test-key"}
+                prompt = client.post("/generate", json={"creative_brief": "a brief"}, headers=headers).json()["prompt"]
+                assert prompt == "A generated prompt for: a brief"
+                with client.stream("POST", "/generate", json={"creative_brief": "other brief", "stream": True}, headers=headers) as response:
+                    chunks = list(response.iter_text())
+                assert "".join(chunks) == "A generated prompt for: other brief"
+        finally:
+            service.close()
+
+
+def test_analyze_computes_only_requested_sections():
+    with _client() as client:
+        response = client.post("/analyze", json={"prompt": "Lo-fi jazz piano with rain sounds.", "sections": ["cohesion_score", "fingerprint"]})
+        assert set(response.json()) == {"cohesion_score", "fingerprint"}
+        assert client.post("/analyze", json={"prompt": PROMPT, "sections": ["nope"]}).status_code == 400
+
+
+def test_explore_n_way_fusion():
+    with _client() as client:
+        result = client.post("/explore", json={"primary_style": "Rock", "fusion_styles": ["jazz", "Blues"]}).json()
+        assert result["fusion_styles"] == ["rock", "jazz", "blues"]
+        too_many = ["jazz", "blues", "funk", "soul", "pop"]
+        assert client.post("/explore", json={"primary_style": "rock", "fusion_styles": too_many}).status_code == 400
+        assert client.post("/explore", json={"primary_style": "rock", "fusion_styles": "jazz"}).status_code == 400
+
+
+def test_explore_expansion_settings():
+    with _client() as client:
+        result = client.post("/explore", json={"primary_style": "rock", "expansion": {"depth": 3, "fan_out": [7, 5], "max_nodes": 25}}).json()
+        assert len(result["graph_data"]["nodes"]) == 25
+        assert client.post("/explore", json={"primary_style": "rock", "expansion": {"depth": 9}}).status_code == 400
+        assert client.post("/explore", json={"primary_style": "rock", "expansion": {"fan_out": []}}).status_code == 400
+        assert client.post("/explore", json={"primary_style": "rock", "expansion": {"width": 2}}).status_code == 400
+        fused = {"primary_style": "rock", "fusion_styles": ["jazz"]}
+        assert client.post("/explore", json={**fused, "expansion": {"depth": 9}}).status_code == 400
+        assert client.post("/explore", json={**fused, "expansion": {"depth": 2}}).status_code == 400
+
+
+def test_similar():
+    with _client() as client:
+        result = client.post("/similar", json={"query": "rock", "k": 3}).json()["similar_styles"]
+        assert [entry["style"] for entry in result] == [style for style, _ in similar_styles("rock", 3, DEFAULT_STYLES, CO_OCCURRENCE_DATA)]
+        assert client.post("/similar", json={"query": "rock", "k": 0}).status_code == 400
+
+
+def test_embeddings_are_built_at_startup(monkeypatch):
+    builds = []
+    from_index = StyleEmbeddings.from_index
+    monkeypatch.setattr(StyleEmbeddings, "from_index", lambda *args: builds.append(1) or from_index(*args))
+    with _client() as client:
+        assert len(builds) == 1
+        assert client.post("/explore", json={"primary_style": "rock"}).json()["similar_styles"]
+        assert len(builds) == 1
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Tests for the batch analysis CLI."""
+
+import io
+import json
+import sys
+from pathlib import Path
+
+from analyzer import ANALYSIS_CACHE
+from batch_analyze import InvalidRecord, main, read_csv, read_jsonl, run_batch_analysis
+
+DATA_FILE = str(Path(__file__).parent / 'data' / 'suno_logic.json')
+RECORDS = [(i, prompt, []) for i, prompt in enumerate(["rock and jazz", "no styles here", "dark ambient piano", "pop"] * 10)]
+
+
+def test_results_stream_in_input_order_across_workers():
+    in_process = list(run_batch_analysis(RECORDS, DATA_FILE, workers=1, batch_size=3))
+    pooled = list(run_batch_analysis(RECORDS, DATA_FILE, workers=2, batch_size=3))
+    assert [json.loads(line)["id"] for line in pooled] == list(range(len(RECORDS)))
+    assert [json.loads(line)["keywords"] for line in pooled] == [json.loads(line)["keywords"] for line in in_process]
+    assert "error" in json.loads(pooled[1])
+
+
+def test_batch_results_bypass_the_analysis_cache():
+    ANALYSIS_CACHE.clear()
+    assert len(list(run_batch_analysis(RECORDS[:4], DATA_FILE, workers=1))) == 4
+    assert len(ANALYSIS_CACHE) == 0
+
+
+def test_readers_parse_records():
+    jsonl = io.StringIO('{"id": "a", "prompt": "rock", "negative_keywords": ["Pop "]}\n\n"jazz"\n')
+    assert list(read_jsonl(jsonl)) == [("a", "rock", ["pop"]), (3, "jazz", [])]
+    csv_text = io.StringIO('prompt,negative_keywords\n"rock, jazz","pop, metal"\n')
+    assert list(read_csv(csv_text)) == [(1, "rock, jazz", ["pop", "metal"])]
+
+
+def test_cli_writes_jsonl(tmp_path):
+    source = tmp_path / "prompts.jsonl"
+    source.write_text("\n".join(json.dumps({"id": i, "prompt": p}) for i, p, _ in RECORDS[:4]), encoding="utf-8")
+    target = tmp_path / "results.jsonl"
+    assert main([str(source), "-o", str(target), "--workers", "1", "--data", DATA_FILE]) == 0
+    results = [json.loads(line) for line in target.read_text(encoding="utf-8").splitlines()]
+    assert [r["id"] for r in results] == [0, 1, 2, 3]
+    assert results[0]["keywords"] == ["jazz", "rock"] and 0 <= results[0]["cohesion"] <= 100
+
+
+def test_malformed_lines_become_error_results():
+    jsonl = io.StringIO('"rock"\n{"prompt": "jazz\n[1, 2]\n{"id": "x", "negative_keywords": [5]}\n'
+                        '{"prompt": 5}\n{"id": "y", "prompt": null}\n{"prompt": "rock", "negative_keywords": {"pop": 1}}\n"pop"\n')
+    records = list(read_jsonl(jsonl))
+    assert [type(record) is InvalidRecord for record in records] == [False, True, True, True, True, True, True, False]
+    results = [json.loads(line) for line in run_batch_analysis(records, DATA_FILE, workers=1)]
+    assert [r["id"] for r in results] == [1, 2, 3, "x", 5, "y", 7, 8]
+    assert [r["keywords"] for r in results] == [["rock"], [], [], [], [], [], [], ["pop"]]
+    assert all("line" in r["error"] for r in results[1:7])
+
+
+def test_cli_leaves_stdin_open(tmp_path, monkeypatch):
+    stdin = io.TextIOWrapper(io.BytesIO(b'"rock"\n"jazz"\n'), encoding="utf-8")
+    monkeypatch.setattr(sys, "stdin", stdin)
+    target = tmp_path / "results.jsonl"
+    assert main(["-", "-o", str(target), "--workers", "1", "--data", DATA_FILE]) == 0
+    assert len(target.read_text(encoding="utf-8").splitlines()) == 2
+    assert not stdin.closed and not stdin.buffer.closed
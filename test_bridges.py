@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Tests for the precomputed bridge-candidate index."""
+
+import random
+from pathlib import Path
+
+import numpy as np
+
+from analyzer import calculate_cohesion, calculate_influence_scores, generate_suggestions
+import bridges
+from bridges import BridgeIndex, faction_bridge_scores, get_bridge_index
+from cooccurrence import get_cooccurrence_index
+from data_loader import load_suno_data
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_suno_data(DATA_FILE)
+INDEX = get_cooccurrence_index(CO_OCCURRENCE_DATA)
+
+
+def test_bridge_scores_equal_affinity_products():
+    bridge_index = get_bridge_index(CO_OCCURRENCE_DATA)
+    assert bridge_index.fan_in is None
+    rng = random.Random(0)
+    for _ in range(50):
+        ids = rng.sample(range(len(INDEX)), rng.randint(2, 30))
+        split = rng.randint(1, len(ids) - 1)
+        faction_a, faction_b = ids[:split], ids[split:]
+        expected = INDEX.influence(faction_a) * INDEX.influence(faction_b)
+        assert np.allclose(bridge_index.bridge_scores(faction_a, faction_b), expected, rtol=1e-9)
+
+
+def test_truncation_keeps_each_pairs_strongest_links():
+    bridge_index = BridgeIndex.from_index(INDEX, links_per_pair=3)
+    lengths = np.diff(bridge_index.offsets)
+    assert lengths.max() <= 3 and len(bridge_index.link_ids) == lengths.sum()
+    weights = INDEX.weights.toarray()
+    for i in range(0, len(bridge_index), 97):
+        x, y = divmod(int(bridge_index.pair_codes[i]), len(INDEX))
+        strengths = weights[x] * weights[y]
+        expected = sorted(np.flatnonzero(strengths), key=lambda c: (-strengths[c], c))[:3]
+        stored = bridge_index.link_ids[bridge_index.offsets[i]:bridge_index.offsets[i + 1]]
+        assert sorted(stored.tolist()) == sorted(expected)
+
+
+def test_build_budget_caps_fan_in():
+    capped = BridgeIndex.from_index(INDEX, max_candidate_links=2000)
+    in_degrees = np.diff(INDEX.weights_t.indptr)
+    assert capped.fan_in is not None
+    assert (np.minimum(in_degrees, capped.fan_in) * (np.minimum(in_degrees, capped.fan_in) - 1) // 2).sum() <= 2000
+
+
+def test_low_cohesion_suggestion_uses_bridges():
+    rng = random.Random(3)
+    styles = sorted(DEFAULT_STYLES)
+    checked = 0
+    while checked < 20:
+        keywords = sorted(rng.sample(styles, 24))
+        cohesion = calculate_cohesion(keywords, CO_OCCURRENCE_DATA)
+        influences = sorted(calculate_influence_scores(keywords, CO_OCCURRENCE_DATA).items(), key=lambda x: x[1], reverse=True)
+        suggestion = generate_suggestions(cohesion, keywords, influences, CO_OCCURRENCE_DATA)
+        if cohesion >= 40 or not suggestion or "clusters" not in suggestion["body"]:
+            continue
+        checked += 1
+        faction_a, faction_b = suggestion["body"]["clusters"][:2]
+        candidates = [style for style, _ in influences[:50]]
+        affinity = INDEX.influence(INDEX.ids(faction_a)) * INDEX.influence(INDEX.ids(faction_b))
+        best = max(candidates, key=lambda style: affinity[INDEX.style_ids[style]])
+        assert suggestion["body"]["strategies"]["Bridge the Gap (Create a Fusion)"][0] == f"Add `{best}` to connect your ideas."
+
+
+def test_direct_and_indexed_scoring_agree(monkeypatch):
+    faction_a, faction_b = INDEX.ids(["rock", "metal", "punk"]), INDEX.ids(["jazz", "swing"])
+    direct = faction_bridge_scores(CO_OCCURRENCE_DATA, faction_a, faction_b)
+    monkeypatch.setattr(bridges, "DIRECT_SCORING_MAX_ENTRIES", 0)
+    assert np.allclose(faction_bridge_scores(CO_OCCURRENCE_DATA, faction_a, faction_b), direct, rtol=1e-9)
+
+
+def test_bridge_index_is_built_on_first_use(monkeypatch):
+    builds = []
+    from_index = BridgeIndex.from_index
+    monkeypatch.setattr(BridgeIndex, "from_index", lambda index: builds.append(index) or from_index(index))
+    _, co_occurrence_data = load_suno_data(DATA_FILE)
+    assert builds == []
+    assert get_bridge_index(co_occurrence_data) is get_bridge_index(co_occurrence_data)
+    assert len(builds) == 1
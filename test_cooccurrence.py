@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Tests for the sparse co-occurrence index against the nested-dict data it is built from."""
+
+import random
+from itertools import combinations
+from pathlib import Path
+
+from cooccurrence import CooccurrenceIndex, get_cooccurrence_index
+from analyzer import calculate_cohesion, calculate_influence_scores
+from data_loader import load_suno_data
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_suno_data(DATA_FILE)
+INDEX = get_cooccurrence_index(CO_OCCURRENCE_DATA)
+
+
+def test_index_is_built_once_per_dataset():
+    assert get_cooccurrence_index(CO_OCCURRENCE_DATA) is get_cooccurrence_index(CO_OCCURRENCE_DATA)
+    assert len(INDEX) == len(set(CO_OCCURRENCE_DATA) | {s for v in CO_OCCURRENCE_DATA.values() for s in v})
+
+
+def test_pair_weight_matches_dict():
+    for style, assocs in CO_OCCURRENCE_DATA.items():
+        for other in random.Random(style).sample(sorted(DEFAULT_STYLES), 10):
+            expected = float(assocs.get(other, 0))
+            assert INDEX.pair_weight(INDEX.style_ids[style], INDEX.style_ids[other]) == expected
+
+
+def test_influence_matches_dict_sums():
+    rng = random.Random(1)
+    for _ in range(50):
+        keywords = rng.sample(sorted(DEFAULT_STYLES), rng.randint(1, 8))
+        expected = {}
+        for keyword in keywords:
+            for style, weight in CO_OCCURRENCE_DATA.get(keyword, {}).items():
+                expected[style] = expected.get(style, 0.0) + float(weight)
+        assert calculate_influence_scores(keywords, CO_OCCURRENCE_DATA) == expected
+
+
+def test_cohesion_matches_pairwise_definition():
+    rng = random.Random(2)
+    for _ in range(50):
+        keywords = rng.sample(sorted(DEFAULT_STYLES), rng.randint(0, 10)) + ["not a style"] * rng.randint(0, 1)
+        pairs = list(combinations(keywords, 2))
+        connected = sum(1 for a, b in pairs if b in CO_OCCURRENCE_DATA.get(a, {}) or a in CO_OCCURRENCE_DATA.get(b, {}))
+        expected = (connected / len(pairs)) * 100.0 if pairs else 100.0
+        assert abs(calculate_cohesion(keywords, CO_OCCURRENCE_DATA) - expected) < 1e-9
+
+
+def test_top_entries_orders_descending():
+    index = CooccurrenceIndex.from_dict({"a": {"b": 5, "c": 9, "d": 1}})
+    scores = index.influence(index.ids(["a"]))
+    assert index.top_entries(scores, 2) == [("c", 9.0), ("b", 5.0)]
+    assert index.top_entries(scores, 0) == []
+
+
+def test_top_k_matches_sorted_rows():
+    small_index = CooccurrenceIndex.from_dict(CO_OCCURRENCE_DATA, top_k=4)
+    for style, assocs in CO_OCCURRENCE_DATA.items():
+        expected = sorted(assocs.items(), key=lambda x: (-x[1], x[0]))
+        for k in (2, 4, 7, 15):
+            assert INDEX.top_k(style, k) == expected[:k]
+            assert small_index.top_k(style, k) == expected[:k]
+    assert INDEX.top_k("not a style", 4) == []
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""Tests that the analysis core stays framework-independent."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from data_loader import DataFileNotFoundError, DataFormatError, load_suno_data
+
+ROOT = Path(__file__).parent
+
+
+def test_core_import_skips_heavy_backends():
+    code = "import sys, analyzer, data_loader; print(json.dumps(sorted(m for m in ('streamlit', 'networkx', 'google.genai') if m in sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", "import json; " + code], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    assert json.loads(output) == []
+
+
+def test_loader_raises_typed_errors(tmp_path):
+    with pytest.raises(DataFileNotFoundError):
+        load_suno_data(tmp_path / "missing.json")
+    with pytest.raises(FileNotFoundError):
+        load_suno_data(tmp_path / "missing.json")
+
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json", encoding="utf-8")
+    with pytest.raises(DataFormatError):
+        load_suno_data(broken)
+
+    empty = tmp_path / "empty.json"
+    empty.write_text(json.dumps({"default_styles": [], "co_existing_styles_dict": {}}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_suno_data(empty)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Tests for the style embeddings and similar-style search."""
+
+from pathlib import Path
+
+import numpy as np
+
+from analyzer import analyze_explorer_styles, similar_styles
+from cooccurrence import get_cooccurrence_index
+from data_loader import load_suno_data
+from embeddings import StyleEmbeddings, get_style_embeddings, main
+from result_cache import dataset_version
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_suno_data(DATA_FILE)
+INDEX = get_cooccurrence_index(CO_OCCURRENCE_DATA)
+
+
+def test_vectors_are_unit_float32_and_deterministic():
+    embeddings = get_style_embeddings(CO_OCCURRENCE_DATA)
+    assert embeddings.vectors.dtype == np.float32 and embeddings.vectors.shape == (len(INDEX), 32)
+    norms = np.linalg.norm(embeddings.vectors, axis=1)
+    assert np.allclose(norms[norms > 0], 1.0, atol=1e-5)
+    rebuilt = StyleEmbeddings.from_index(INDEX)
+    assert np.array_equal(rebuilt.vectors, embeddings.vectors)
+
+
+def test_nearest_matches_a_full_sort():
+    embeddings = get_style_embeddings(CO_OCCURRENCE_DATA)
+    for style in ("rock", "jazz", "lo-fi"):
+        similarities = embeddings.vectors @ embeddings.vectors[embeddings.style_ids[style]]
+        similarities[embeddings.style_ids[style]] = -1.0
+        nearest = embeddings.similar_to([style], 8)
+        assert np.allclose([similarity for _, similarity in nearest], np.sort(similarities)[::-1][:8], atol=1e-6)
+        assert all(abs(similarities[embeddings.style_ids[name]] - similarity) < 1e-6 for name, similarity in nearest)
+
+
+def test_similar_styles_takes_a_style_or_a_prompt():
+    by_style = similar_styles(" Rock ", 5, DEFAULT_STYLES, CO_OCCURRENCE_DATA)
+    assert len(by_style) == 5 and "rock" not in dict(by_style)
+    by_prompt = similar_styles("Lo-fi jazz piano on a rainy night", 5, DEFAULT_STYLES, CO_OCCURRENCE_DATA)
+    assert by_prompt and not {"lo-fi", "jazz", "piano"} & set(dict(by_prompt))
+    assert similar_styles("no styles here", 5, DEFAULT_STYLES, CO_OCCURRENCE_DATA) == []
+    explorer = analyze_explorer_styles("rock", None, [], "", CO_OCCURRENCE_DATA)
+    assert list(explorer["similar_styles"].items())[:5] == by_style
+
+
+def test_offline_build_is_loaded_for_the_matching_dataset(tmp_path, monkeypatch):
+    path = tmp_path / "embeddings.npz"
+    assert main([str(DATA_FILE), str(path), "--dimensions", "8"]) == 0
+    loaded = StyleEmbeddings.load(path)
+    assert loaded.dimensions == 8 and loaded.dataset_version == dataset_version(CO_OCCURRENCE_DATA)
+
+    monkeypatch.setenv("SUNO_EMBEDDINGS_PATH", str(path))
+    _, fresh_data = load_suno_data(DATA_FILE)
+    assert get_style_embeddings(fresh_data).dimensions == 8
+    other_data = {**CO_OCCURRENCE_DATA, "new style": {"rock": 3}}
+    assert get_style_embeddings(other_data).dimensions == 32
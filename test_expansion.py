@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Tests for the multi-hop neighbourhood expansion."""
+
+from pathlib import Path
+
+from analyzer import analyze_explorer_styles
+from cooccurrence import get_cooccurrence_index
+from data_loader import load_suno_data
+from expansion import ExpansionSettings, expand_neighbourhood
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_suno_data(DATA_FILE)
+INDEX = get_cooccurrence_index(CO_OCCURRENCE_DATA)
+
+
+def _reference(seed, depth, fan_out, min_weight):
+    """Plain BFS over `top_k`, deduplicating as it goes."""
+    levels, frontier, edges = {seed: 0}, [seed], []
+    for level in range(1, depth + 1):
+        next_frontier = []
+        for style in frontier:
+            for target, weight in INDEX.top_k(style, fan_out):
+                if weight < min_weight:
+                    continue
+                if target not in levels:
+                    levels[target] = level
+                    next_frontier.append(target)
+                edges.append((style, target, weight))
+        frontier = next_frontier
+    return levels, edges
+
+
+def test_unbounded_expansion_is_a_deduplicated_bfs():
+    for seed in ("rock", "jazz", "lo-fi"):
+        for depth, fan_out, min_weight in ((1, 7, 0), (3, 3, 0), (4, 4, 50)):
+            result = expand_neighbourhood(INDEX, INDEX.ids([seed]), ExpansionSettings(depth, fan_out, min_weight, max_nodes=10_000))
+            levels, edges = _reference(seed, depth, fan_out, min_weight)
+            assert dict(zip([INDEX.styles[i] for i in result.node_ids], result.levels)) == levels
+            assert [(INDEX.styles[a], INDEX.styles[b], w) for a, b, w in result.edges] == edges
+            assert len(set(result.node_ids)) == len(result.node_ids)
+
+
+def test_node_budget_keeps_the_strongest_new_styles():
+    settings = ExpansionSettings(depth=4, fan_out=(7, 5), max_nodes=20)
+    result = expand_neighbourhood(INDEX, INDEX.ids(["rock"]), settings)
+    assert len(result.node_ids) == 20
+    reached = set(result.node_ids)
+    assert all(source in reached and target in reached for source, target, _ in result.edges)
+    unbounded = expand_neighbourhood(INDEX, INDEX.ids(["rock"]), settings._replace(max_nodes=10_000))
+    assert result.node_ids[:8] == unbounded.node_ids[:8]
+
+
+def test_explorer_graph_follows_the_settings():
+    default = analyze_explorer_styles("rock", None, [], "", CO_OCCURRENCE_DATA)
+    assert analyze_explorer_styles("rock", None, [], "", CO_OCCURRENCE_DATA, ExpansionSettings()) is default
+    deep = analyze_explorer_styles("rock", None, [], "", CO_OCCURRENCE_DATA, ExpansionSettings(depth=4, fan_out=(7, 5), max_nodes=30))
+    assert len(deep["graph_data"]["nodes"]) == 30 > len(default["graph_data"]["nodes"])
+    assert any(node["title"].startswith("Third-Degree") for node in deep["graph_data"]["nodes"])
+    assert deep["creative_brief"] == default["creative_brief"]
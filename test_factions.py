@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Tests for the shared keyword-pair links: cohesion, factions and faction statistics."""
+
+import random
+from itertools import combinations
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+from analyzer import calculate_influence_scores, generate_suggestions
+from cooccurrence import get_cooccurrence_index
+from data_loader import load_suno_data
+from factions import DisjointSet, analyse_keyword_links
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_suno_data(DATA_FILE)
+INDEX = get_cooccurrence_index(CO_OCCURRENCE_DATA)
+
+
+def _linked(first, second):
+    return bool(CO_OCCURRENCE_DATA.get(first, {}).get(second) or CO_OCCURRENCE_DATA.get(second, {}).get(first))
+
+
+def test_disjoint_set_groups():
+    groups = DisjointSet(6)
+    assert groups.union(0, 3) and groups.union(4, 3) and groups.union(1, 5)
+    assert not groups.union(0, 4)
+    assert groups.groups() == [[0, 3, 4], [1, 5], [2]]
+
+
+def test_cohesion_and_factions_match_pairwise_graph():
+    rng = random.Random(7)
+    styles = sorted(DEFAULT_STYLES)
+    for _ in range(40):
+        keywords = rng.sample(styles, rng.randint(2, 25)) + ["not-a-style"]
+        links = analyse_keyword_links(keywords, CO_OCCURRENCE_DATA)
+
+        pairs = list(combinations(keywords, 2))
+        linked = [pair for pair in pairs if _linked(*pair)]
+        assert links.cohesion == len(linked) / len(pairs) * 100
+
+        graph = nx.Graph()
+        graph.add_nodes_from(keywords)
+        graph.add_edges_from(linked)
+        expected = sorted((sorted(component) for component in nx.connected_components(graph)), key=len, reverse=True)
+        assert [len(faction) for faction in links.factions] == [len(component) for component in expected]
+        assert sorted(map(sorted, links.factions)) == sorted(expected)
+        assert ["not-a-style"] in links.factions
+
+
+def test_faction_stats():
+    rng = random.Random(11)
+    styles = sorted(DEFAULT_STYLES)
+    for _ in range(20):
+        keywords = rng.sample(styles, 20)
+        links = analyse_keyword_links(keywords, CO_OCCURRENCE_DATA)
+        weights = INDEX.weights.toarray()
+        for faction, stats in zip(links.factions, links.faction_stats()):
+            assert stats.keywords == faction
+            pairs = list(combinations(faction, 2))
+            if pairs:
+                assert stats.internal_density == sum(_linked(*pair) for pair in pairs) / len(pairs)
+            ids = INDEX.ids(faction)
+            assert np.isclose(stats.internal_weight, weights[np.ix_(ids, ids)].sum() - weights[ids, ids].sum())
+            rest = INDEX.ids(keyword for keyword in keywords if keyword not in faction)
+            own, other = weights[ids].sum(axis=0), weights[rest].sum(axis=0)
+            norms = np.linalg.norm(own) * np.linalg.norm(other)
+            assert np.isclose(stats.cross_affinity, own @ other / norms if norms else 0.0)
+
+
+def test_low_cohesion_suggestion_reports_faction_stats():
+    rng = random.Random(3)
+    styles = sorted(DEFAULT_STYLES)
+    checked = 0
+    while checked < 5:
+        keywords = sorted(rng.sample(styles, 24))
+        links = analyse_keyword_links(keywords, CO_OCCURRENCE_DATA)
+        influences = sorted(calculate_influence_scores(keywords, CO_OCCURRENCE_DATA).items(), key=lambda x: x[1], reverse=True)
+        suggestion = generate_suggestions(links.cohesion, keywords, influences, CO_OCCURRENCE_DATA, links)
+        if not suggestion or "clusters" not in suggestion["body"]:
+            continue
+        checked += 1
+        body = suggestion["body"]
+        assert body["clusters"] == links.factions[:2]
+        assert [stats["keywords"] for stats in body["faction_stats"]] == body["clusters"]
+
+
+def test_weighted_cohesion_scores():
+    rng = random.Random(5)
+    styles = sorted(DEFAULT_STYLES)
+    top = np.log10(2 * INDEX.weights.data.max() + 1)
+    for _ in range(20):
+        keywords = rng.sample(styles, rng.randint(2, 30)) + ["not-a-style"]
+        scores = analyse_keyword_links(keywords, CO_OCCURRENCE_DATA).cohesion_scores
+
+        graph = nx.Graph()
+        for first, second in combinations(keywords, 2):
+            link = CO_OCCURRENCE_DATA.get(first, {}).get(second, 0) + CO_OCCURRENCE_DATA.get(second, {}).get(first, 0)
+            graph.add_edge(first, second, strength=np.log10(link + 1) / top)
+        strengths = [strength for _, _, strength in graph.edges(data="strength")]
+        tree = nx.maximum_spanning_tree(graph, weight="strength")
+
+        assert scores.binary == analyse_keyword_links(keywords, CO_OCCURRENCE_DATA).cohesion
+        assert np.isclose(scores.mean_log_weight, np.mean(strengths) * 100)
+        assert np.isclose(scores.spanning_connectivity, tree.size(weight="strength") / (len(keywords) - 1) * 100)
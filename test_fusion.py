@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Tests for N-way style fusion scoring and the fusion analysis built on it."""
+
+import math
+import random
+from pathlib import Path
+
+import numpy as np
+
+from analyzer import BRIDGE_NODE_COLOR, MAX_FUSION_STYLES, analyze_explorer_styles, analyze_fusion_styles
+from cooccurrence import get_cooccurrence_index
+from data_loader import load_suno_data
+from fusion import BRIDGE_TOP_K, SYNERGY_BOOST, fuse_styles
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_suno_data(DATA_FILE)
+INDEX = get_cooccurrence_index(CO_OCCURRENCE_DATA)
+
+
+def _reference(seeds):
+    """The scores from per-seed dicts, as the two-style explorer used to merge them."""
+    combined, shared, in_top = {}, {}, {}
+    for seed in seeds:
+        for style, weight in CO_OCCURRENCE_DATA.get(seed, {}).items():
+            combined[style] = combined.get(style, 0) + weight
+            shared[style] = shared.get(style, 0) + (weight > 0)
+        for style, _ in INDEX.top_k(seed, BRIDGE_TOP_K):
+            in_top[style] = in_top.get(style, 0) + 1
+    boosted = {style: score * (1 + SYNERGY_BOOST * max(shared[style] - 1, 0)) for style, score in combined.items()}
+    bridges = {style for style, count in in_top.items() if count >= 2 and style not in seeds}
+    return boosted, bridges
+
+
+def test_fusion_scores_match_per_seed_dict_merge():
+    rng = random.Random(3)
+    styles = sorted(CO_OCCURRENCE_DATA)
+    for _ in range(30):
+        seeds = rng.sample(styles, rng.randint(2, MAX_FUSION_STYLES))
+        fusion = fuse_styles(INDEX, INDEX.ids(seeds))
+        boosted, bridges = _reference(seeds)
+        assert INDEX.to_style_dict(fusion.combined) == {style: score for style, score in boosted.items() if score}
+        assert {INDEX.styles[i] for i in fusion.bridge_ids} == bridges
+        counts = fusion.bridge_counts[fusion.bridge_ids]
+        assert np.all(counts[:-1] >= counts[1:])
+
+
+def test_two_style_fusion_keeps_the_explorer_boost():
+    fusion = fuse_styles(INDEX, INDEX.ids(["rock", "jazz"]))
+    shared = np.flatnonzero(fusion.shared_by == 2)[0]
+    rock, jazz = INDEX.style_ids["rock"], INDEX.style_ids["jazz"]
+    assert fusion.combined[shared] == 1.5 * (INDEX.pair_weight(rock, shared) + INDEX.pair_weight(jazz, shared))
+
+
+def test_n_way_analysis_feeds_chart_graph_and_brief():
+    styles = ["rock", "jazz", "blues", "funk"]
+    result = analyze_fusion_styles(styles + ["jazz"], ["pop"], "", CO_OCCURRENCE_DATA)
+    assert result["fusion_styles"] == styles
+    top = INDEX.top_entries(fuse_styles(INDEX, INDEX.ids(styles)).combined, 15)
+    assert result["bar_chart_data"] == {style: math.log10(score + 1) for style, score in top}
+    nodes = {node["id"]: node for node in result["graph_data"]["nodes"]}
+    assert all(style in nodes for style in styles)
+    bridges = [node_id for node_id, node in nodes.items() if node["color"] == BRIDGE_NODE_COLOR]
+    assert bridges
+    for bridge in bridges:
+        sources = {edge["from"] for edge in result["graph_data"]["edges"] if edge["to"] == bridge}
+        assert len(sources) >= 2
+    assert "**Primary Style 4:** funk" in result["creative_brief"]
+    assert "fuse the four styles" in result["creative_brief"]
+
+    assert "error" in analyze_fusion_styles(["rock"], [], "", CO_OCCURRENCE_DATA)
+    assert "error" in analyze_fusion_styles(["rock", "not-a-style"], [], "", CO_OCCURRENCE_DATA)
+
+
+def test_two_style_explorer_is_the_two_way_fusion():
+    explorer = analyze_explorer_styles("rock", "jazz", [], "", CO_OCCURRENCE_DATA)
+    fusion = analyze_fusion_styles(["rock", "jazz"], [], "", CO_OCCURRENCE_DATA)
+    assert explorer == {**fusion, "secondary_style_analyzed": "jazz"}
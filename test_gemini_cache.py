@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Tests for the persistent Gemini response cache."""
+
+import threading
+
+from fake_gemini_server import FakeGeminiServer
+from gemini_cache import GeminiResponseCache, make_cache_key
+from gemini_service import GeminiService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_key_covers_every_generation_input():
+    base = make_cache_key("brief", "system", "gemini-2.5-pro", 0.7)
+    assert base == make_cache_key("brief", "system", "gemini-2.5-pro", 0.7)
+    assert len({base, make_cache_key("brief!", "system", "gemini-2.5-pro", 0.7), make_cache_key("brief", "other", "gemini-2.5-pro", 0.7),
+                make_cache_key("brief", "system", "gemini-2.5-flash", 0.7), make_cache_key("brief", "system", "gemini-2.5-pro", 0.9)}) == 5
+
+
+def test_persists_across_instances(tmp_path):
+    path = tmp_path / "responses.sqlite3"
+    cache = GeminiResponseCache(path)
+    cache.add("k", "a prompt", latency=2.5)
+    cache.close()
+    reopened = GeminiResponseCache(path)
+    assert reopened.get("k") == "a prompt"
+    assert reopened.stats()["saved_latency_seconds"] == 2.5
+
+
+def test_lru_eviction_over_size_cap():
+    clock = FakeClock()
+    cache = GeminiResponseCache(max_bytes=25, clock=clock)
+    cache.add("a", "x" * 10, 1.0)
+    clock.now += 1
+    cache.add("b", "y" * 10, 1.0)
+    clock.now += 1
+    assert cache.get("a") is not None
+    clock.now += 1
+    cache.add("c", "z" * 10, 1.0)
+    assert cache.get("b") is None
+    assert cache.get("a") and cache.get("c")
+
+
+def test_ttl_and_variant_limit():
+    clock = FakeClock()
+    cache = GeminiResponseCache(ttl_seconds=60, max_variants=2, clock=clock)
+    for text in ("one", "two", "three"):
+        cache.add("k", text, 1.0)
+    assert cache.get_variants("k", 5) == ["two", "three"]
+    clock.now += 61
+    assert cache.get_variants("k", 5) == []
+
+
+def test_service_serves_repeat_briefs_and_variants_from_cache():
+    with FakeGeminiServer(reply=lambda brief: f"variant {server.request_count}") as server:
+        cache = GeminiResponseCache()
+        service = GeminiService(base_url=server.base_url, response_cache=cache)
+        try:
+            first = service.generate("rock brief", "key")
+            assert service.generate("rock brief", "key") == first
+            assert server.request_count == 1
+            variants = service.generate_variants("rock brief", "key", 3)
+            assert variants[0] == first and len(set(variants)) == 3
+            assert server.request_count == 3
+            assert service.generate_variants("rock brief", "key", 3) == variants
+            assert server.request_count == 3
+        finally:
+            service.close()
+    stats = cache.stats()
+    assert stats["hits"] == 5 and 0 < stats["hit_rate"] < 1 and stats["saved_latency_seconds"] > 0
+
+
+def test_streamed_responses_share_the_cache():
+    with FakeGeminiServer() as server:
+        cache = GeminiResponseCache()
+        service = GeminiService(base_url=server.base_url, response_cache=cache)
+        try:
+            streamed = service.stream("synthwave", "key")
+            assert "".join(streamed) == streamed.result
+            assert service.generate("synthwave", "key") == streamed.result
+            replayed = service.stream("synthwave", "key")
+            assert list(replayed) == [streamed.result]
+            assert server.request_count == 1
+        finally:
+            service.close()
+
+
+def test_cache_io_runs_off_the_service_loop():
+    threads = []
+
+    class RecordingCache(GeminiResponseCache):
+        def get_variants(self, key, limit):
+            threads.append(threading.current_thread().name)
+            return super().get_variants(key, limit)
+
+        def add(self, key, text, latency):
+            threads.append(threading.current_thread().name)
+            super().add(key, text, latency)
+
+    with FakeGeminiServer() as server:
+        service = GeminiService(base_url=server.base_url, response_cache=RecordingCache())
+        try:
+            service.generate("folk brief", "key")
+            service.generate_variants("folk brief", "key", 2)
+            "".join(service.stream("jazz brief", "key"))
+        finally:
+            service.close()
+    assert len(threads) == 6 and "gemini-service" not in threads
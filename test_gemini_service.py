@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Tests for the asynchronous Gemini service against a local fake endpoint."""
+
+import asyncio
+import time
+
+import pytest
+
+from fake_gemini_server import FakeGeminiServer
+from gemini_service import GeminiService
+
+
+def make_service(server, **kwargs):
+    return GeminiService(base_url=server.base_url, system_instruction="Be brief.", base_delay=0.01, **kwargs)
+
+
+def test_sync_generation_reuses_one_client_per_key():
+    with FakeGeminiServer() as server:
+        service = make_service(server)
+        try:
+            assert service.generate("rock ballad", "key-a") == "A generated prompt for: rock ballad"
+            service.generate("jazz fusion", "key-a")
+            service.generate("jazz fusion", "key-b")
+            assert len(service._clients) == 2
+        finally:
+            service.close()
+
+
+def test_concurrent_briefs_respect_in_flight_limit():
+    briefs = [f"brief {i}" for i in range(12)]
+    with FakeGeminiServer(latency=0.1) as server:
+        service = make_service(server, max_in_flight=4)
+        try:
+            started = time.perf_counter()
+            results = service.generate_many(briefs, "key")
+            elapsed = time.perf_counter() - started
+        finally:
+            service.close()
+    assert results == [f"A generated prompt for: {brief}" for brief in briefs]
+    assert server.peak_concurrency <= 4
+    assert elapsed < 12 * 0.1
+
+
+def test_async_api_from_caller_loop():
+    with FakeGeminiServer() as server:
+        service = make_service(server)
+        try:
+            results = asyncio.run(service.generate_many_async(["a", "b"], "key"))
+        finally:
+            service.close()
+    assert results == ["A generated prompt for: a", "A generated prompt for: b"]
+
+
+def test_server_errors_are_retried_then_reported():
+    with FakeGeminiServer(fail_first=2) as server:
+        service = make_service(server)
+        try:
+            assert service.generate("retry me", "key") == "A generated prompt for: retry me"
+            assert server.request_count == 3
+            server.fail_first = 100
+            assert service.generate("give up", "key").startswith("ERROR: Gemini API server error after 3 attempts")
+        finally:
+            service.close()
+
+
+def test_at_least_one_attempt_is_required():
+    with pytest.raises(ValueError):
+        GeminiService(max_retries=0)
+
+
+def test_incomplete_response_is_an_error():
+    with FakeGeminiServer(finish_reason="MAX_TOKENS") as server:
+        service = make_service(server)
+        try:
+            assert service.generate("long", "key") == "ERROR: The AI response was incomplete. Finish Reason: MAX_TOKENS. Please try again."
+        finally:
+            service.close()
+
+
+def test_stream_yields_chunks_and_records_timings():
+    with FakeGeminiServer(stream_chunk_size=5, stream_chunk_delay=0.05) as server:
+        service = make_service(server)
+        try:
+            stream = service.stream("lofi beats", "key")
+            chunks = list(stream)
+        finally:
+            service.close()
+    assert len(chunks) > 1
+    assert "".join(chunks) == stream.result == "A generated prompt for: lofi beats"
+    assert 0 < stream.time_to_first_token < stream.total_latency
+
+
+def test_async_stream_from_caller_loop():
+    async def collect(service):
+        return [chunk async for chunk in await service.stream_async("ambient", "key")]
+
+    with FakeGeminiServer(stream_chunk_size=4) as server:
+        service = make_service(server)
+        try:
+            chunks = asyncio.run(collect(service))
+        finally:
+            service.close()
+    assert "".join(chunks) == "A generated prompt for: ambient"
+
+
+def test_stream_keeps_error_handling():
+    with FakeGeminiServer(finish_reason="MAX_TOKENS", fail_first=1) as server:
+        service = make_service(server)
+        try:
+            stream = service.stream("long", "key")
+            chunks = list(stream)
+        finally:
+            service.close()
+    assert server.request_count == 2
+    assert "".join(chunks) == "A generated prompt for: long"
+    assert stream.result == "ERROR: The AI response was incomplete. Finish Reason: MAX_TOKENS. Please try again."
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Tests for the server-side association-map layouts."""
+
+import json
+
+import numpy as np
+
+from graph_layout import LAYOUT_CACHE, SPRING_LENGTH, compute_layout
+
+GRAPH = {
+    "nodes": [{"id": name} for name in ("rock", "jazz", "blues", "metal", "punk", "ambient")],
+    "edges": [
+        {"from": "rock", "to": "jazz", "value": 8.0},
+        {"from": "rock", "to": "blues", "value": 6.0},
+        {"from": "jazz", "to": "blues", "value": 5.0},
+        {"from": "metal", "to": "punk", "value": 9.0},
+        {"from": "rock", "to": "metal", "value": 1.0},
+    ],
+}
+
+
+def _distance(layout, a, b):
+    return float(np.hypot(layout[a][0] - layout[b][0], layout[a][1] - layout[b][1]))
+
+
+def test_layout_is_deterministic_and_cached():
+    LAYOUT_CACHE.clear()
+    first = compute_layout(GRAPH)
+    assert set(first) == {node["id"] for node in GRAPH["nodes"]}
+    assert compute_layout(json.loads(json.dumps(GRAPH))) is first
+    LAYOUT_CACHE.clear()
+    assert compute_layout(GRAPH) == first
+
+
+def test_strong_links_draw_closer_and_nodes_do_not_overlap():
+    layout = compute_layout(GRAPH)
+    assert _distance(layout, "metal", "punk") < _distance(layout, "jazz", "punk")
+    assert _distance(layout, "rock", "jazz") < _distance(layout, "rock", "ambient")
+    distances = [_distance(layout, a, b) for a in layout for b in layout if a < b]
+    assert min(distances) > SPRING_LENGTH / 5
+
+
+def test_small_graphs():
+    assert compute_layout({"nodes": [], "edges": []}) == {}
+    assert compute_layout({"nodes": [{"id": "solo"}], "edges": []}) == {"solo": (0.0, 0.0)}
+    pair = compute_layout({"nodes": [{"id": "a"}, {"id": "b"}], "edges": [{"from": "a", "to": "b", "value": 2.0}]})
+    assert abs(_distance(pair, "a", "b") - SPRING_LENGTH) < 1e-6
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Tests for corpus ingestion: counting, spilling, parallel workers and incremental updates."""
+
+import json
+import random
+from collections import Counter
+from itertools import permutations
+from pathlib import Path
+
+from analyzer import extract_keywords
+from data_loader import load_suno_data
+from ingest_corpus import ingest_corpus, iter_prompts, main
+from snapshot import write_snapshot
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_suno_data(DATA_FILE)
+
+
+def make_corpus(size, seed):
+    rng = random.Random(seed)
+    styles = sorted(DEFAULT_STYLES)
+    fillers = ["with a", "and", "featuring", "over", "in a mellow", ""]
+    return [" ".join(f"{rng.choice(fillers)} {style}" for style in rng.sample(styles, rng.randint(0, 6))) for _ in range(size)]
+
+
+def expected_counts(prompts):
+    counts = Counter()
+    for prompt in prompts:
+        counts.update(permutations(extract_keywords(prompt, DEFAULT_STYLES), 2))
+    return counts
+
+
+def read_pairs(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data, Counter({(a, b): w for a, row in data["co_existing_styles_dict"].items() for b, w in row.items()})
+
+
+def test_counts_match_keyword_extraction(tmp_path):
+    prompts = make_corpus(500, seed=1)
+    stats = ingest_corpus(prompts, DEFAULT_STYLES, tmp_path / "out.json", chunk_size=64)
+    data, pairs = read_pairs(tmp_path / "out.json")
+    assert pairs == expected_counts(prompts)
+    assert set(data["default_styles"]) == DEFAULT_STYLES
+    assert stats["prompts"] == 500 and stats["pairs"] == len(pairs)
+    for row in data["co_existing_styles_dict"].values():
+        assert list(row.values()) == sorted(row.values(), reverse=True)
+    # The output is a loadable dataset.
+    load_suno_data(tmp_path / "out.json")
+
+
+def test_spilling_and_workers_give_identical_output(tmp_path):
+    prompts = make_corpus(800, seed=2)
+    ingest_corpus(prompts, DEFAULT_STYLES, tmp_path / "plain.json", chunk_size=100)
+    stats = ingest_corpus(prompts, DEFAULT_STYLES, tmp_path / "spilled.json", workers=2, chunk_size=50, max_pairs_in_memory=200)
+    assert stats["spilled_runs"] > 1
+    assert (tmp_path / "spilled.json").read_text() == (tmp_path / "plain.json").read_text()
+
+
+def test_incremental_update_on_snapshot(tmp_path):
+    first, second = make_corpus(300, seed=3), make_corpus(300, seed=4)
+    ingest_corpus(first + second, DEFAULT_STYLES, tmp_path / "all.json")
+
+    ingest_corpus(first, DEFAULT_STYLES, tmp_path / "first.json")
+    styles, data = load_suno_data(tmp_path / "first.json")
+    write_snapshot(tmp_path / "first.snap", styles, data)
+    snap_styles, snap_data = load_suno_data(tmp_path / "first.snap")
+    ingest_corpus(second, snap_styles, tmp_path / "updated.json", base_data=snap_data)
+
+    assert read_pairs(tmp_path / "updated.json")[1] == read_pairs(tmp_path / "all.json")[1]
+
+
+def test_cli_adds_corpus_to_base_dataset(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    prompts = make_corpus(50, seed=5)
+    corpus.write_text("\n".join(json.dumps({"prompt": p}) for p in prompts) + "\n")
+    output = tmp_path / "suno_logic.json"
+    assert main([str(corpus), "-o", str(output), "--base", str(DATA_FILE), "--workers", "1", "--top-n", "5"]) == 0
+
+    data, pairs = read_pairs(output)
+    assert all(len(row) <= 5 for row in data["co_existing_styles_dict"].values())
+    combined = Counter({(a, b): w for a, row in CO_OCCURRENCE_DATA.items() for b, w in row.items()}) + expected_counts(prompts)
+    for (a, b), weight in pairs.items():
+        assert combined[(a, b)] == weight
+
+
+def test_malformed_lines_are_skipped(tmp_path, caplog):
+    corpus = tmp_path / "corpus.jsonl"
+    corpus.write_text('{"prompt": "rock, pop"}\nnot json\n{"prompt": 5}\n"jazz"\n')
+    assert list(iter_prompts([str(corpus)])) == ["rock, pop", "jazz"]
+    assert len([r for r in caplog.records if "line 2" in r.message or "line 3" in r.message]) == 2
+    output = tmp_path / "out.json"
+    assert main([str(corpus), "-o", str(output), "--base", str(DATA_FILE), "--workers", "1"]) == 0
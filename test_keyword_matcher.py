@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Tests for the single-pass keyword matcher against the original regex rules."""
+
+import json
+import re
+from pathlib import Path
+
+from keyword_matcher import KeywordMatcher, get_keyword_matcher
+from analyzer import extract_keywords, extract_keyword_spans
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+DEFAULT_STYLES = set(json.loads(DATA_FILE.read_text(encoding='utf-8'))['default_styles'])
+
+PROMPTS = [
+    "A powerful acoustic folk ballad with a clean fingerpicked acoustic guitar and a mournful cello.",
+    "Soulful R&B meets K-Pop and lo-fi beats, male vocals over an electric guitar solo.",
+    "rockabilly is not rock, and hip-hop-ish grooves aren't hip hop.",
+    "",
+    "İstanbul pop with a dark, deep house groove.",
+]
+
+
+def regex_extract_keywords(prompt_text, valid_styles_set):
+    """The original per-style regex implementation, kept as the reference."""
+    lower_prompt = prompt_text.lower()
+    return sorted(style for style in valid_styles_set
+                  if re.search(r'\b' + re.escape(style) + r'\b', lower_prompt))
+
+
+def test_matches_regex_reference():
+    matcher = KeywordMatcher(DEFAULT_STYLES)
+    for prompt in PROMPTS:
+        assert matcher.extract(prompt) == regex_extract_keywords(prompt, DEFAULT_STYLES)
+
+
+def test_variants_only_add_to_exact_matches():
+    for prompt in PROMPTS:
+        assert set(regex_extract_keywords(prompt, DEFAULT_STYLES)) <= set(extract_keywords(prompt, DEFAULT_STYLES))
+
+
+def test_variants_report_the_canonical_style():
+    prompt = "Female vocal over HipHop, lofi synth-wave and an agressive drum n bass drop."
+    assert extract_keywords(prompt, DEFAULT_STYLES) == [
+        "aggressive", "bass", "drum", "drum and bass", "female vocals", "hip hop", "lo-fi", "synth", "synthwave",
+    ]
+    spans = [(prompt[s.start:s.end], s.style) for s in extract_keyword_spans(prompt, DEFAULT_STYLES)]
+    assert ("HipHop", "hip hop") in spans and ("synth-wave", "synthwave") in spans
+
+
+def test_variants_respect_word_boundaries():
+    matcher = KeywordMatcher({"lo-fi", "hip hop"}, {"lofi": "lo-fi", "hiphop": "hip hop", "rap": "missing"})
+    assert matcher.pattern_count == 4
+    assert matcher.extract("lofiness and hiphopping") == []
+    assert matcher.extract("(lofi) hiphop!") == ["hip hop", "lo-fi"]
+
+
+def test_spans_point_at_original_text():
+    prompt = "Heavy ELECTRIC GUITAR riffs, male vocals and r&b."
+    matcher = KeywordMatcher({"electric guitar", "guitar", "male vocals", "r&b"})
+    spans = matcher.find_spans(prompt)
+    assert [(prompt[s.start:s.end].lower(), s.style) for s in spans] == [
+        ("electric guitar", "electric guitar"),
+        ("guitar", "guitar"),
+        ("male vocals", "male vocals"),
+        ("r&b", "r&b"),
+    ]
+    assert extract_keyword_spans(prompt, matcher) == spans
+
+
+def test_word_boundaries():
+    matcher = KeywordMatcher({"rock", "pop", "lo-fi"})
+    assert matcher.extract("rockabilly pops") == []
+    assert matcher.extract("(rock)/pop, lo-fi!") == ["lo-fi", "pop", "rock"]
+
+
+def test_matcher_is_cached_per_vocabulary():
+    assert get_keyword_matcher(DEFAULT_STYLES) is get_keyword_matcher(DEFAULT_STYLES)
+    assert get_keyword_matcher(set(DEFAULT_STYLES)) is not get_keyword_matcher(DEFAULT_STYLES)
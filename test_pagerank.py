@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Tests for the personalised PageRank fingerprint."""
+
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from analyzer import calculate_pagerank_fingerprint, prepare_analysis_results
+from cooccurrence import get_cooccurrence_index
+from data_loader import load_suno_data
+from pagerank import DAMPING, PAGERANK_CACHE, get_walk_matrix, pagerank_scores, personalized_pagerank
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_suno_data(DATA_FILE)
+INDEX = get_cooccurrence_index(CO_OCCURRENCE_DATA)
+PROMPT = "Dark cinematic rock with jazz piano and male vocals."
+
+
+def test_scores_match_networkx_pagerank():
+    graph = nx.DiGraph()
+    graph.add_nodes_from(INDEX.styles)
+    graph.add_weighted_edges_from((style, assoc, weight) for style, assocs in CO_OCCURRENCE_DATA.items() for assoc, weight in assocs.items())
+    for keywords in (["rock"], ["jazz", "piano", "lo-fi"]):
+        expected = nx.pagerank(graph, alpha=DAMPING, personalization={keyword: 1 for keyword in keywords}, tol=1e-12)
+        scores = personalized_pagerank(get_walk_matrix(CO_OCCURRENCE_DATA), INDEX.ids(keywords), tolerance=1e-10)
+        assert scores.sum() == pytest.approx(1.0)
+        assert np.allclose(scores, [expected[style] for style in INDEX.styles], atol=1e-6)
+
+
+def test_scores_are_cached_per_keyword_set():
+    PAGERANK_CACHE.clear()
+    first = pagerank_scores(["rock", "jazz"], CO_OCCURRENCE_DATA)
+    assert pagerank_scores(["jazz", "rock", "jazz"], CO_OCCURRENCE_DATA) is first
+    assert not first.flags.writeable
+    assert pagerank_scores(["rock"], CO_OCCURRENCE_DATA) is not first
+
+
+def test_pagerank_fingerprint_mode():
+    influence = prepare_analysis_results(PROMPT, ["pop"], DEFAULT_STYLES, CO_OCCURRENCE_DATA)
+    pagerank = prepare_analysis_results(PROMPT, ["pop"], DEFAULT_STYLES, CO_OCCURRENCE_DATA, fingerprint_mode="pagerank")
+    assert pagerank is not influence
+    fingerprint = pagerank["fingerprint"]
+    assert fingerprint == calculate_pagerank_fingerprint(pagerank["recognized_keywords"], ["pop"], CO_OCCURRENCE_DATA)
+    assert len(fingerprint) == 10 and list(fingerprint.values()) == sorted(fingerprint.values(), reverse=True)
+    assert not set(fingerprint) & (set(pagerank["recognized_keywords"]) | {"pop"})
+    with pytest.raises(ValueError):
+        prepare_analysis_results(PROMPT, [], DEFAULT_STYLES, CO_OCCURRENCE_DATA, fingerprint_mode="eigen")
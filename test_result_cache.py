@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Tests for the bounded analysis result cache."""
+
+import pickle
+from pathlib import Path
+
+from result_cache import ResultCache, cached, dataset_version
+from analyzer import ANALYSIS_CACHE, AnalysisResults, analyze_explorer_styles, prepare_analysis_results
+from data_loader import load_suno_data
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+DEFAULT_STYLES, CO_OCCURRENCE_DATA = load_suno_data(DATA_FILE)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_and_counters():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats() == {"entries": 2, "bytes": 0, "hits": 3, "misses": 1, "evictions": 1, "expirations": 0}
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = ResultCache(ttl_seconds=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10.0
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+
+
+def test_byte_limit():
+    cache = ResultCache(max_bytes=2_000)
+    cache.put("big", "x" * 5_000)
+    assert len(cache) == 0
+    for i in range(10):
+        cache.put(i, "x" * 500)
+    assert cache.stats()["bytes"] <= 2_000
+    assert cache.get(9) is not None and cache.get(0) is None
+
+
+def test_cached_decorator_uses_key_function():
+    calls = []
+
+    @cached(ResultCache(), key_func=lambda text, tags: (text.strip(), tuple(sorted(tags))))
+    def analyse(text, tags):
+        calls.append(text)
+        return {"text": text}
+
+    assert analyse(" rock ", ["b", "a"]) is analyse("rock", tags=["a", "b"])
+    assert calls == [" rock "]
+    assert analyse.cache.hits == 1
+
+
+def test_dataset_version_tracks_content():
+    assert dataset_version(CO_OCCURRENCE_DATA) == dataset_version(dict(CO_OCCURRENCE_DATA))
+    assert dataset_version({"rock": {"pop": 1}}) != dataset_version({"rock": {"pop": 2}})
+
+
+def test_analysis_results_are_cached_without_streamlit():
+    ANALYSIS_CACHE.clear()
+    first = prepare_analysis_results("Dark rock with jazz piano.", ["pop"], DEFAULT_STYLES, CO_OCCURRENCE_DATA)
+    hits = ANALYSIS_CACHE.hits
+    assert prepare_analysis_results("Dark rock with jazz piano.", ["pop", "pop"], DEFAULT_STYLES, CO_OCCURRENCE_DATA) is first
+    assert ANALYSIS_CACHE.hits == hits + 1
+    explorer = analyze_explorer_styles("rock", "jazz", None, "  guitar solo ", CO_OCCURRENCE_DATA)
+    assert analyze_explorer_styles("rock", "jazz", [], "guitar solo", CO_OCCURRENCE_DATA) is explorer
+
+
+def test_cohesion_mode_is_part_of_the_analysis_key():
+    binary = prepare_analysis_results("Dark rock with jazz piano.", [], DEFAULT_STYLES, CO_OCCURRENCE_DATA)
+    weighted = prepare_analysis_results("Dark rock with jazz piano.", [], DEFAULT_STYLES, CO_OCCURRENCE_DATA, cohesion_mode="weighted")
+    assert "cohesion_scores" not in binary
+    assert weighted["cohesion_scores"]["binary"] == binary["cohesion_score"] == weighted["cohesion_score"]
+
+
+def test_analysis_sections_are_built_on_first_access():
+    results = prepare_analysis_results.__wrapped__("Dreamy shoegaze with jazz piano.", [], DEFAULT_STYLES, CO_OCCURRENCE_DATA)
+    assert results.computed_sections() == ["recognized_keywords", "negative_keywords", "cohesion_score"]
+    fingerprint = results["fingerprint"]
+    assert results["fingerprint"] is fingerprint
+    sections = results.computed_sections()
+    assert "graph_data" not in sections and "graph_data" in results and "missing" not in results
+    assert results.computed_sections() == sections
+
+    restored = pickle.loads(pickle.dumps(results))
+    assert type(restored) is dict and restored == results.to_dict()
+    assert set(results.computed_sections()) == set(restored)
+
+
+def test_lazy_sections_are_charged_to_the_cache():
+    cache = ResultCache(max_bytes=10_000_000)
+    results = prepare_analysis_results.__wrapped__("Epic cinematic rock with piano and strings.", [], DEFAULT_STYLES, CO_OCCURRENCE_DATA)
+    cache.put("analysis", results)
+    before = cache.stats()["bytes"]
+    assert before == results.estimated_size()
+    results["annotated_html"], results["graph_data"], results["suggestion"]
+    # Each build charges only what it added, which stays close to a full re-measure.
+    charged = cache.stats()["bytes"]
+    assert charged > before and abs(charged - results.estimated_size()) <= 0.1 * charged
+
+    fresh = AnalysisResults("rock and pop", [], [], ["pop", "rock"], CO_OCCURRENCE_DATA)
+    small = ResultCache(max_bytes=fresh.estimated_size() + 100)
+    small.put("analysis", fresh)
+    assert len(small) == 1
+    small.get("analysis")["graph_data"]
+    assert len(small) == 0 and small.evictions == 1
+
+
+def test_equivalent_calls_share_identical_results():
+    ANALYSIS_CACHE.clear()
+    first = prepare_analysis_results("Dark rock with piano.", ["pop", "metal", "pop"], DEFAULT_STYLES, CO_OCCURRENCE_DATA)
+    second = prepare_analysis_results("Dark rock with piano.", ["metal", "pop"], DEFAULT_STYLES, CO_OCCURRENCE_DATA)
+    assert second is first and first["negative_keywords"] == ["metal", "pop"]
+
+    explored = analyze_explorer_styles("rock", "jazz", ["pop", "pop"], "  moody  ", CO_OCCURRENCE_DATA)
+    assert analyze_explorer_styles("rock", "jazz", ["pop"], "moody", CO_OCCURRENCE_DATA) is explored
+    assert explored == analyze_explorer_styles.__wrapped__("rock", "jazz", ["pop"], "moody", CO_OCCURRENCE_DATA)
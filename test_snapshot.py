@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Tests for the binary snapshot compiler and its memory-mapped loader."""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from analyzer import analyze_explorer_styles, prepare_analysis_results
+from bridges import get_bridge_index
+from data_loader import DataFormatError, load_suno_data
+from result_cache import dataset_version
+from snapshot import SnapshotFormatError, load_snapshot, write_snapshot
+
+DATA_FILE = Path(__file__).parent / 'data' / 'suno_logic.json'
+PROMPT = "Dark cinematic rock with jazz piano, an electric guitar and male vocals, epic pop ballad."
+
+
+@pytest.fixture(scope="module")
+def snapshot_path(tmp_path_factory):
+    default_styles, co_occurrence_data = load_suno_data(DATA_FILE)
+    path = tmp_path_factory.mktemp("snapshot") / "suno_logic.snap"
+    write_snapshot(path, default_styles | {"style without associations"}, co_occurrence_data)
+    return path
+
+
+def test_round_trip_matches_json(snapshot_path):
+    default_styles, co_occurrence_data = load_suno_data(DATA_FILE)
+    snap_styles, snap_data = load_snapshot(snapshot_path, verify=True)
+    assert snap_styles == default_styles | {"style without associations"}
+    assert set(snap_data) == set(co_occurrence_data) and len(snap_data) == len(co_occurrence_data)
+    for style, assocs in co_occurrence_data.items():
+        assert dict(snap_data[style].items()) == assocs
+    assert "style without associations" not in snap_data
+    assert snap_data.get("style without associations", {}) == {}
+
+
+def test_index_arrays_are_read_only_views(snapshot_path):
+    _, snap_data = load_snapshot(snapshot_path)
+    index = snap_data.index
+    for array in (index.weights.data, index.weights.indices, index.weights_t.data, index.top_k_ids,
+                  snap_data.bridge_index.link_scores):
+        assert not array.flags.writeable
+    assert get_bridge_index(snap_data) is snap_data.bridge_index
+    assert dataset_version(snap_data) == snap_data.fingerprint
+
+
+def test_analysis_results_match_json(snapshot_path):
+    json_styles, json_data = load_suno_data(DATA_FILE)
+    snap_styles, snap_data = load_suno_data(snapshot_path)
+    from_json = prepare_analysis_results(PROMPT, ["pop"], json_styles, json_data)
+    from_snapshot = prepare_analysis_results(PROMPT, ["pop"], snap_styles, snap_data)
+    # Snapshot rows list associations in style order, so only edge order may differ.
+    edge_key = lambda edge: (edge["from"], edge["to"])
+    assert sorted(from_snapshot["graph_data"].pop("edges"), key=edge_key) == sorted(from_json["graph_data"].pop("edges"), key=edge_key)
+    assert from_snapshot == from_json
+    assert analyze_explorer_styles("rock", "jazz", [], "", snap_data) == analyze_explorer_styles("rock", "jazz", [], "", json_data)
+
+
+def test_corruption_and_bad_files_are_rejected(snapshot_path, tmp_path):
+    corrupted = tmp_path / "corrupted.snap"
+    data = bytearray(snapshot_path.read_bytes())
+    data[-1] ^= 0xFF
+    corrupted.write_bytes(bytes(data))
+    load_snapshot(corrupted)  # Structure is intact; only the checksum catches it.
+    with pytest.raises(SnapshotFormatError, match="checksum"):
+        load_snapshot(corrupted, verify=True)
+
+    truncated = tmp_path / "truncated.snap"
+    truncated.write_bytes(snapshot_path.read_bytes()[:1000])
+    with pytest.raises(DataFormatError, match="truncated"):
+        load_suno_data(truncated)
+
+    newer = tmp_path / "newer.snap"
+    data = bytearray(snapshot_path.read_bytes())
+    data[8:12] = np.uint32(99).tobytes()
+    newer.write_bytes(bytes(data))
+    with pytest.raises(DataFormatError, match="version 99"):
+        load_suno_data(newer)
+
+    not_json = tmp_path / "garbage.json"
+    not_json.write_bytes(b"\xff\xfe garbage")
+    with pytest.raises(DataFormatError):
+        load_suno_data(not_json)
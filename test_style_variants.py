@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Tests for the precomputed style variant index."""
+
+import style_variants
+from style_variants import spelling_variants, typo_variants, variant_index
+
+
+def test_spelling_variants():
+    assert spelling_variants("hip hop") == {"hip-hop", "hiphop"}
+    assert spelling_variants("lo-fi") == {"lo fi", "lofi"}
+    assert {"female vocal", "female-vocals", "femalevocal"} <= spelling_variants("female vocals")
+    assert spelling_variants("synthwave", {"synth", "wave"}) == {"synth wave", "synth-wave"}
+    assert spelling_variants("synthwave", {"synth"}) == set()
+    assert "electro nic" not in spelling_variants("electronic", {"electro", "electronic"})
+    assert "emo tional" not in spelling_variants("emotional", {"emo", "emotional"})
+    assert spelling_variants("acoustic guitar") == {"acoustic guitars", "acoustic-guitar", "acoustic-guitars", "acousticguitar", "acousticguitars"}
+    assert spelling_variants("blues") == set() and spelling_variants("bass") == set() and spelling_variants("80s") == set()
+
+
+def test_only_nouns_get_plurals():
+    for style in ("slow", "smooth", "folk", "dark", "deep", "fast", "intense", "heartfelt", "jazz"):
+        assert spelling_variants(style) == set()
+    assert "folks" not in variant_index({"folk", "folk rock"})
+
+
+def test_typo_variants_stay_within_long_words():
+    variants = typo_variants("acoustic guitar")
+    assert {"acoustc guitar", "acousitc guitar", "accoustic guitar"} <= variants
+    assert all(variant.endswith(" guitar") for variant in variants)
+    assert typo_variants("hip hop") == set()
+    assert "county" not in typo_variants("country")
+
+
+def test_index_prefers_exact_then_alias_then_spelling_then_typo():
+    index = variant_index({"male vocals", "male voice", "r&b", "orchestral", "progressive"},
+                          {"r&b": ["rnb"], "orchestral": ["orchestra"], "progressive": ["prog"]})
+    assert index["male vocal"] == "male vocals" and index["rnb"] == "r&b"
+    assert index["orchestra"] == "orchestral" and index["progresive"] == "progressive"
+    # Vocabulary styles are never variants of another style.
+    assert "male voice" not in index and "male vocals" not in index
+
+
+def test_ambiguous_variants_are_dropped():
+    index = variant_index({"dramatic", "drumatic"})
+    assert "dramatic" not in index and "drmatic" not in index
+    assert index["dramatc"] == "dramatic"
+
+
+def test_aliases_need_their_style_in_the_vocabulary():
+    assert "rnb" not in variant_index({"rock"})
+    assert variant_index({"r&b"})["rhythm and blues"] == "r&b"
+
+
+def test_large_vocabularies_skip_typos(monkeypatch):
+    monkeypatch.setattr(style_variants, "MAX_TYPO_VOCABULARY", 1)
+    index = variant_index({"aggressive", "hip hop"})
+    assert index["hiphop"] == "hip hop" and "agressive" not in index
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Tests for the cached association-map renderer."""
+
+import json
+import re
+
+from visualizer import ASSOCIATION_MAP_CACHE, VIS_ASSETS, ThresholdSlider, ensure_vis_assets, render_association_map
+
+GRAPH = {
+    "nodes": [
+        {"id": "rock", "label": "Rock", "size": 25, "color": "#FF6347", "title": "Your Keyword: Rock"},
+        {"id": "jazz", "label": "Jazz</script>", "size": 14, "color": "#4682B4", "title": "Influence Score: 12"},
+        {"id": "blues", "label": "Blues", "size": 12, "color": "#4682B4", "title": "Influence Score: 9"},
+    ],
+    "edges": [
+        {"from": "rock", "to": "jazz", "value": 8.5, "title": "Association Strength: 1"},
+        {"from": "rock", "to": "blues", "value": 3.0, "title": "Association Strength: 2"},
+    ],
+}
+
+
+def _graph_json(html):
+    script = re.search(r"const graph = (.*);\n", html).group(1)
+    return json.loads(script.replace("<\\/", "</"))
+
+
+def test_map_carries_only_graph_json_and_links_shared_assets():
+    html = render_association_map(GRAPH, 5.0, asset_url="assets/")
+    assert '<script src="assets/vis-network.min.js"></script>' in html
+    assert len(html) < 5000 and html.count("</script>") == 2
+    graph = _graph_json(html)
+    assert [node["shape"] for node in graph["nodes"]] == ["dot"] * 3
+    assert graph["nodes"][1]["label"] == "Jazz</script>"
+    assert 'id="edge-threshold"' not in html
+
+
+def test_every_edge_is_sent_once_for_client_side_filtering():
+    html = render_association_map(GRAPH, 5.0, slider=ThresholdSlider(maximum=10.0))
+    graph = _graph_json(html)
+    assert graph["threshold"] == 5.0
+    assert [(edge["id"], edge["to"], edge["value"]) for edge in graph["edges"]] == [(0, "jazz", 8.5), (1, "blues", 3.0)]
+    assert '<input id="edge-threshold" type="range" min="0.0" max="10.0" step="0.5" value="5.0">' in html
+
+
+def test_rendered_html_is_cached_by_content_and_threshold():
+    ASSOCIATION_MAP_CACHE.clear()
+    hits = ASSOCIATION_MAP_CACHE.hits
+    first = render_association_map(GRAPH, 5.0)
+    assert render_association_map(json.loads(json.dumps(GRAPH)), 5.0) is first
+    assert render_association_map(GRAPH, 1.0) is not first
+    assert render_association_map(GRAPH, 1.0, slider=ThresholdSlider()) is not render_association_map(GRAPH, 1.0)
+    assert ASSOCIATION_MAP_CACHE.hits == hits + 2
+
+
+def test_vis_assets_are_copied_once(tmp_path):
+    static_dir = ensure_vis_assets(tmp_path / "static")
+    for name in VIS_ASSETS:
+        assert (static_dir / name).stat().st_size > 10_000
+    (static_dir / VIS_ASSETS[0]).write_text("kept")
+    ensure_vis_assets(static_dir)
+    assert (static_dir / VIS_ASSETS[0]).read_text() == "kept"
+
+
+def test_precomputed_layout_places_nodes_and_disables_physics():
+    graph = _graph_json(render_association_map(GRAPH, precomputed_layout=True))
+    assert graph["options"]["physics"] == {"enabled": False}
+    assert all(isinstance(node["x"], float) and isinstance(node["y"], float) for node in graph["nodes"])
+    assert "x" not in _graph_json(render_association_map(GRAPH))["nodes"][0]
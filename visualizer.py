@@ -1,11 +1,107 @@
 # suno-prompt-analyzer/visualizer.py
 
-from typing import Dict, Any
+import html
+import importlib.util
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
 import plotly.graph_objects as go
-from pyvis.network import Network
+from graph_layout import compute_layout, graph_hash
+from result_cache import ResultCache
 # Match the color from the analyzer for consistency
 SECONDARY_NODE_COLOR = "#4682B4"
 
+# vis-network is served once from Streamlit's static folder (server.enableStaticServing)
+# and cached by the browser, instead of being inlined into every rendered map.
+STATIC_DIR = Path(__file__).parent / "static"
+VIS_ASSET_URL = "app/static/"  # Relative to the page, so it also works under a base URL path
+VIS_ASSETS = ("vis-network.min.js", "vis-network.css")
+VIS_VERSION = "vis-9.1.2"  # The build pyvis ships and its templates use
+
+# Same layout settings the pyvis maps used.
+VIS_OPTIONS = {
+    "physics": {
+        "barnesHut": {
+            "gravitationalConstant": -3000,
+            "centralGravity": 0.1,
+            "springLength": 150,
+            "springConstant": 0.05,
+            "damping": 0.09,
+            "avoidOverlap": 0.1
+        },
+        "maxVelocity": 50,
+        "minVelocity": 0.1,
+        "solver": "barnesHut",
+        "stabilization": {
+            "enabled": True,
+            "iterations": 1000,
+            "updateInterval": 25
+        }
+    }
+}
+
+# Maps drawn at server-computed positions (see `graph_layout`): no simulation
+# runs in the browser, and straight edges need no physics support nodes.
+PRECOMPUTED_VIS_OPTIONS = {
+    "physics": {"enabled": False},
+    "edges": {"smooth": False}
+}
+
+_MAP_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<link rel="stylesheet" href="{asset_url}vis-network.css">
+<script src="{asset_url}vis-network.min.js"></script>
+<style>
+html, body {{ margin: 0; font-family: sans-serif; font-size: 14px; }}
+#association-map {{ width: 100%; height: 600px; border: 1px solid lightgray; }}
+.edge-threshold {{ display: flex; align-items: center; gap: 8px; padding: 4px 0 8px; }}
+.edge-threshold input {{ flex: 1; }}
+</style>
+</head>
+<body>
+{controls}<div id="association-map"></div>
+<script>
+const graph = {graph_json};
+const edges = new vis.DataSet(graph.edges.map(edge => ({{...edge, hidden: edge.value < graph.threshold}})));
+const network = new vis.Network(document.getElementById("association-map"), {{nodes: new vis.DataSet(graph.nodes), edges: edges}}, graph.options);
+// Precomputed layouts skip stabilisation, which is what normally zooms the view to fit.
+if (graph.options.physics.enabled === false) network.fit();
+
+// Filtering only toggles `hidden`: hidden edges keep their physics forces, so
+// the layout does not move and nothing goes back to the server.
+const slider = document.getElementById("edge-threshold");
+if (slider) {{
+  slider.addEventListener("input", () => {{
+    const threshold = Number(slider.value);
+    document.getElementById("edge-threshold-value").textContent = threshold.toFixed(1);
+    edges.update(graph.edges.map(edge => ({{id: edge.id, hidden: edge.value < threshold}})));
+  }});
+}}
+</script>
+</body>
+</html>
+"""
+
+_SLIDER_TEMPLATE = """<label class="edge-threshold">{label}
+<input id="edge-threshold" type="range" min="{minimum}" max="{maximum}" step="{step}" value="{value}">
+<output id="edge-threshold-value">{value:.1f}</output></label>
+"""
+
+
+class ThresholdSlider(NamedTuple):
+    """An in-page slider hiding map edges whose value is below its position."""
+    label: str = "Connection Strength:"
+    minimum: float = 0.0
+    maximum: float = 15.0
+    step: float = 0.5
+
+
+# Rendered map HTML by (graph content hash, edge threshold, asset URL, slider, layout mode).
+ASSOCIATION_MAP_CACHE = ResultCache(max_entries=256)
+
 def create_ranked_bar_chart(data: Dict[str, float], title: str, xaxis_label: str) -> go.Figure:
     """
     Creates a generic horizontal bar chart for ranked data.
@@ -48,9 +144,65 @@ def create_ranked_bar_chart(data: Dict[str, float], title: str, xaxis_label: str
     return fig
 
 
-def create_association_map(graph_data: Dict[str, Any]) -> Network:
+def ensure_vis_assets(static_dir: Path = STATIC_DIR) -> Path:
+    """
+    Copies the vis-network files bundled with pyvis into the app's static folder,
+    once per installation. Returns the folder.
+    """
+    missing = [name for name in VIS_ASSETS if not (static_dir / name).exists()]
+    if missing:
+        pyvis_dir = Path(importlib.util.find_spec("pyvis").origin).parent
+        static_dir.mkdir(parents=True, exist_ok=True)
+        for name in missing:
+            temporary = static_dir / f".{name}.tmp"
+            shutil.copyfile(pyvis_dir / "templates" / "lib" / VIS_VERSION / name, temporary)
+            temporary.replace(static_dir / name)
+    return static_dir
+
+
+def render_association_map(graph_data: Dict[str, Any], edge_threshold: float = 0.0, asset_url: str = VIS_ASSET_URL,
+                           slider: Optional[ThresholdSlider] = None, precomputed_layout: bool = False) -> str:
+    """
+    HTML for an interactive force-directed map of `graph_data` ('nodes' and 'edges'
+    lists), showing edges whose value is at least `edge_threshold`.
+
+    The page carries every edge once, with its value, and loads vis-network from
+    `asset_url` (see `ensure_vis_assets`). With a `slider`, the threshold is
+    changed in the browser: edges are hidden or shown in place, with no server
+    round-trip and no new layout. With `precomputed_layout`, nodes are placed
+    at `graph_layout.compute_layout` positions and the map is sent with physics
+    disabled, so it appears without a stabilisation pass and looks the same on
+    every load. Results are cached by graph content hash and threshold, so
+    reruns with the same graph reuse the HTML.
     """
-    Creates an interactive force-directed network graph.
+    key = (graph_hash(graph_data), edge_threshold, asset_url, slider, precomputed_layout)
+    return ASSOCIATION_MAP_CACHE.get_or_compute(
+        key, lambda: _render_map_html(graph_data, edge_threshold, asset_url, slider, precomputed_layout))
+
+
+def _render_map_html(graph_data: Dict[str, Any], edge_threshold: float, asset_url: str,
+                     slider: Optional[ThresholdSlider], precomputed_layout: bool) -> str:
+    nodes = [{**node, "shape": "dot"} for node in graph_data['nodes']]
+    if precomputed_layout:
+        positions = compute_layout(graph_data)
+        nodes = [{**node, "x": round(positions[node['id']][0], 1), "y": round(positions[node['id']][1], 1)} for node in nodes]
+    graph = {
+        "nodes": nodes,
+        "edges": [{**edge, "id": i} for i, edge in enumerate(graph_data['edges'])],
+        "options": PRECOMPUTED_VIS_OPTIONS if precomputed_layout else VIS_OPTIONS,
+        "threshold": edge_threshold,
+    }
+    # "</" would end the script element early if a label contained it.
+    graph_json = json.dumps(graph, separators=(",", ":")).replace("</", "<\\/")
+    controls = _SLIDER_TEMPLATE.format(value=edge_threshold, **slider._replace(label=html.escape(slider.label))._asdict()) if slider else ""
+    return _MAP_TEMPLATE.format(asset_url=asset_url, graph_json=graph_json, controls=controls)
+
+
+def create_association_map(graph_data: Dict[str, Any]) -> "Network":
+    """
+    Creates an interactive force-directed network graph as a pyvis `Network`,
+    with vis-network inlined into its HTML. The app renders maps with
+    `render_association_map` instead.
 
     Args:
         graph_data: A dictionary containing 'nodes' and 'edges' lists.
@@ -58,6 +210,8 @@ def create_association_map(graph_data: Dict[str, Any]) -> Network:
     Returns:
         A Pyvis Network object.
     """
+    from pyvis.network import Network
+
     net = Network(height="600px", width="100%", notebook=True, cdn_resources='in_line')
     
     # Add nodes